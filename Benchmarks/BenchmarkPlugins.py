@@ -0,0 +1,30 @@
+__author__ = 'ND'
+
+import time
+
+
+class Component(object):
+
+	def __init__(self):
+		pass
+
+
+class ConfigurableComponent(Component):
+
+	def __init__(self, name, repeat=False, retries=3):
+		self.name = name
+		self.repeat = repeat
+		self.retries = retries
+
+
+class ExpensiveComponent(Component):
+
+	def __init__(self, size=20000):
+		self.table = dict((index, str(index)) for index in xrange(size))
+
+
+class SlowComponent(Component):
+
+	def __init__(self, seconds, dependency=None):
+		time.sleep(seconds)
+		self.dependency = dependency
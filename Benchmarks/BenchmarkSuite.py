@@ -0,0 +1,239 @@
+__author__ = 'ND'
+
+"""
+Benchmark suite of configuration loading and component resolution at scale.
+
+A synthetic plugin module and configuration file are generated from the following parameters:
+- declarations: number of component declarations.
+- depth: depth of the class hierarchy of the components.
+- fanout: number of components each component references.
+- singletons: ratio of singleton declarations.
+
+Components reference singletons declared before them, so that the declarations do not form cycles and constructing
+a non singleton component does not construct a chain of other non singleton components.
+
+Results are printed as JSON, or written to a file with --output. Results of another run, e.g. of another commit,
+can be compared with --compare.
+
+Example:
+	python BenchmarkSuite.py --declarations 10000 --depth 4 --fanout 2 --output after.json --compare before.json
+"""
+
+import os
+import imp
+import sys
+import json
+import time
+import shutil
+import timeit
+import platform
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+import MemoryBenchmark
+
+# number of distinct component classes in the generated module
+CLASSES = 100
+# number of components resolved by each resolution benchmark
+RESOLVED = 1000
+
+
+def is_singleton(index, ratio):
+	# spread singletons evenly over the declarations
+	return int((index + 1) * ratio) > int(index * ratio)
+
+
+def write_module(filePath, depth):
+	lines = ["class Level0(object):", "", "\tdef __init__(self, *dependencies):", "\t\tself.dependencies = dependencies",
+	         ""]
+
+	for level in range(1, depth):
+		lines.extend(["", "class Level%d(Level%d):" % (level, level - 1), "\tpass", ""])
+
+	for index in range(CLASSES):
+		lines.extend(["", "class Component%d(Level%d):" % (index, depth - 1), "\tpass", ""])
+
+	file = open(filePath, "w")
+	file.write("\n".join(lines))
+	file.close()
+
+
+def write_configuration(filePath, moduleName, declarations, fanout, singletons):
+	specifications = {}
+	singletonIdentifiers = []
+
+	for index in range(declarations):
+		identifier = "Component%d" % index
+		# reference the singletons declared last
+		references = singletonIdentifiers[-fanout:] if fanout else []
+
+		specifications[identifier] = {
+			"class": "Component%d" % (index % CLASSES),
+			"module": moduleName,
+			"initArgs": ["{%s}" % reference for reference in references] + ["{$Name}"],
+			"lifetime": "singleton" if is_singleton(index, singletons) else ""
+		}
+
+		if is_singleton(index, singletons):
+			singletonIdentifiers.append(identifier)
+
+	file = open(filePath, "w")
+	json.dump({"resources": {"Name": "benchmark"}, "component_specifications": specifications}, file)
+	file.close()
+
+
+def best(function, repeat, number=1):
+	"""
+	Get best time, in milliseconds, of calling function 'number' times.
+	"""
+	return min(timeit.repeat(function, number=number, repeat=repeat)) * 1e3
+
+
+def revision():
+	"""
+	Get git revision of Declare, or None if it is not in a git working copy.
+	"""
+	try:
+		return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+		                               cwd=os.path.dirname(os.path.abspath(Declare.__file__))).strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def run(arguments, directory):
+	moduleName = "SyntheticPlugins%d" % int(time.time() * 1e3)
+	filePath = os.path.join(directory, "configuration.json")
+
+	write_module(os.path.join(directory, moduleName + ".py"), arguments.depth)
+	write_configuration(filePath, moduleName, arguments.declarations, arguments.fanout, arguments.singletons)
+
+	sys.path.insert(0, directory)
+	module = __import__(moduleName)
+
+	results = {}
+
+	configuration = Declare.Configuration.read(filePath)
+	results["configuration_read_ms"] = best(lambda: Declare.Configuration.read(filePath), arguments.repeat)
+	results["manager_init_ms"] = best(lambda: Declare.Manager(configuration), arguments.repeat)
+
+	manager = Declare.Manager(configuration)
+	singletons = [identifier for index, identifier in
+	              enumerate("Component%d" % index for index in range(arguments.declarations))
+	              if is_singleton(index, arguments.singletons)][:RESOLVED]
+	components = [identifier for index, identifier in
+	              enumerate("Component%d" % index for index in range(arguments.declarations))
+	              if not is_singleton(index, arguments.singletons)][:RESOLVED]
+
+	def resolve(identifiers):
+		for identifier in identifiers:
+			manager.get_component(identifier)
+
+	# time per resolved component
+	if singletons:
+		results["get_singleton_us"] = best(lambda: resolve(singletons), arguments.repeat) * 1e3 / len(singletons)
+
+	if components:
+		results["get_component_us"] = best(lambda: resolve(components), arguments.repeat) * 1e3 / len(components)
+
+	results["get_components_of_base_type_ms"] = best(lambda: manager.get_components_of_type(module.Level0),
+	                                                 arguments.repeat)
+	results["get_components_of_class_ms"] = best(lambda: manager.get_components_of_type(module.Component0),
+	                                             arguments.repeat)
+
+	# the same measurements against the container compiled from the configuration
+	compiledPath = os.path.join(directory, moduleName + "Container.py")
+	manager.compile(compiledPath)
+	compiledModule = imp.load_source(moduleName + "Container", compiledPath)
+
+	results["compiled_init_ms"] = best(compiledModule.Container, arguments.repeat)
+
+	manager = compiledModule.Container()
+
+	if singletons:
+		results["compiled_get_singleton_us"] = best(lambda: resolve(singletons), arguments.repeat) * 1e3 / len(
+			singletons)
+
+	if components:
+		results["compiled_get_component_us"] = best(lambda: resolve(components), arguments.repeat) * 1e3 / len(
+			components)
+
+	results["compiled_get_components_of_base_type_ms"] = best(
+		lambda: manager.get_components_of_type(module.Level0), arguments.repeat)
+
+	configuration, configurationSize = MemoryBenchmark.measure(lambda: Declare.Configuration.read(filePath))
+	manager, managerSize = MemoryBenchmark.measure(lambda: Declare.Manager(configuration))
+
+	if MemoryBenchmark.tracemalloc is None:
+		# the manager references the configuration, which is measured separately
+		managerSize -= configurationSize
+
+	results["configuration_bytes_per_declaration"] = float(configurationSize) / arguments.declarations
+	results["manager_bytes_per_declaration"] = float(managerSize) / arguments.declarations
+
+	return results
+
+
+def compare(results, baseline):
+	print >> sys.stderr, "%-40s %14s %14s %9s" % ("metric", "baseline", "current", "change")
+
+	for name in sorted(results):
+		if name in baseline:
+			print >> sys.stderr, "%-40s %14.3f %14.3f %+8.1f%%" % (name, baseline[name], results[name],
+			                                                        (results[name] / baseline[name] - 1) * 100)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark configuration loading and component resolution.")
+	parser.add_argument("--declarations", type=int, default=10000, help="number of component declarations")
+	parser.add_argument("--depth", type=int, default=3, help="depth of the class hierarchy of the components")
+	parser.add_argument("--fanout", type=int, default=2, help="number of components each component references")
+	parser.add_argument("--singletons", type=float, default=0.2, help="ratio of singleton declarations")
+	parser.add_argument("--repeat", type=int, default=5, help="number of times each measurement is repeated")
+	parser.add_argument("--output", help="file the JSON results are written to, instead of the standard output")
+	parser.add_argument("--compare", help="file of JSON results of a previous run to compare the results with")
+	arguments = parser.parse_args()
+
+	if arguments.depth < 1 or not 0 <= arguments.singletons <= 1:
+		parser.error("depth must be at least 1 and singletons must be between 0 and 1")
+
+	directory = tempfile.mkdtemp()
+
+	try:
+		results = run(arguments, directory)
+	finally:
+		shutil.rmtree(directory)
+
+	report = {
+		"revision": revision(),
+		"python": platform.python_version(),
+		"memory": "tracemalloc" if MemoryBenchmark.tracemalloc is not None else "getsizeof",
+		"parameters": {"declarations": arguments.declarations, "depth": arguments.depth,
+		               "fanout": arguments.fanout, "singletons": arguments.singletons},
+		"results": results
+	}
+
+	if arguments.output:
+		file = open(arguments.output, "w")
+		json.dump(report, file, indent=4, sort_keys=True)
+		file.close()
+	else:
+		print json.dumps(report, indent=4, sort_keys=True)
+
+	if arguments.compare:
+		file = open(arguments.compare, "r")
+		baseline = json.load(file)
+		file.close()
+
+		if baseline["parameters"] != report["parameters"]:
+			print >> sys.stderr, "warning: baseline was measured with different parameters"
+
+		compare(results, baseline["results"])
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,71 @@
+__author__ = 'ND'
+
+"""
+Benchmark of Configuration.read parsing the JSON configuration file compared with loading its snapshot.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Declare
+
+SIZES = (1000, 10000, 100000)
+
+
+def write_configuration(filePath, size):
+	specifications = {}
+
+	for index in range(size):
+		specifications["Component%d" % index] = {
+			"class": "ConfigurableComponent",
+			"module": "BenchmarkPlugins",
+			"initArgs": ["{$Name}", index % 2 == 0, index],
+			"lifetime": "singleton" if index % 10 == 0 else "",
+			"tags": ["benchmark"]
+		}
+
+	file = open(filePath, "w")
+	json.dump({"resources": {"Name": "benchmark"}, "component_specifications": specifications}, file)
+	file.close()
+
+
+def measure(read):
+	timings = []
+
+	for repeat in range(3):
+		started = time.time()
+		read()
+		timings.append(time.time() - started)
+
+	return min(timings) * 1e3
+
+
+def main():
+	directory = tempfile.mkdtemp()
+
+	try:
+		print "%12s %14s %14s %10s" % ("declarations", "JSON (ms)", "snapshot (ms)", "speedup")
+
+		for size in SIZES:
+			filePath = os.path.join(directory, "configuration%d.json" % size)
+			snapshotPath = os.path.join(directory, "configuration%d.snapshot" % size)
+
+			write_configuration(filePath, size)
+			Declare.Configuration.read(filePath, snapshotPath)
+
+			cold = measure(lambda: Declare.Configuration.read(filePath))
+			warm = measure(lambda: Declare.Configuration.read(filePath, snapshotPath))
+
+			print "%12d %14.1f %14.1f %9.1fx" % (size, cold, warm, cold / warm)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,54 @@
+__author__ = 'ND'
+
+"""
+Micro-benchmark of transient component construction through Manager.get_component, compared with calling the
+component constructor directly.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+from BenchmarkPlugins import Component, ConfigurableComponent
+
+ITERATIONS = 100000
+
+
+def create_manager():
+	resources = {u"Name": u"benchmark", u"Repeat": True}
+	declarations = [
+		Declare.ComponentDeclaration(u"NoArguments", "BenchmarkPlugins", "Component"),
+		Declare.ComponentDeclaration(u"ListArguments", "BenchmarkPlugins", "ConfigurableComponent",
+		                             [u"{$Name}", u"{$Repeat}", 5]),
+		Declare.ComponentDeclaration(u"DictionaryArguments", "BenchmarkPlugins", "ConfigurableComponent",
+		                             {u"name": u"{$Name}", u"repeat": u"{$Repeat}"})
+	]
+
+	return Declare.Manager(Declare.Configuration(resources, declarations))
+
+
+def measure(statement):
+	return min(timeit.repeat(statement, number=ITERATIONS, repeat=3)) / ITERATIONS * 1e6
+
+
+def main():
+	manager = create_manager()
+
+	results = [
+		("direct Component()", measure(lambda: Component())),
+		("get_component NoArguments", measure(lambda: manager.get_component(u"NoArguments"))),
+		("direct ConfigurableComponent(...)", measure(lambda: ConfigurableComponent(u"benchmark", True, 5))),
+		("get_component ListArguments", measure(lambda: manager.get_component(u"ListArguments"))),
+		("get_component DictionaryArguments", measure(lambda: manager.get_component(u"DictionaryArguments")))
+	]
+
+	for name, microseconds in results:
+		print "%-40s %8.3f us" % (name, microseconds)
+
+
+if __name__ == '__main__':
+	main()
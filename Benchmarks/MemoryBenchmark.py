@@ -0,0 +1,118 @@
+__author__ = 'ND'
+
+"""
+Benchmark of the memory used per declaration by Configuration and by Manager.
+
+Memory is measured with tracemalloc where it is available (Python 3.4 or later). Otherwise the size of the objects
+reachable from the measured object is summed with sys.getsizeof, which does not account for allocator overhead.
+"""
+
+import gc
+import os
+import sys
+import json
+import types
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+import BenchmarkPlugins
+
+try:
+	import tracemalloc
+except ImportError:
+	tracemalloc = None
+
+SIZES = (1000, 10000, 100000)
+
+# objects shared with the rest of the process, which are not counted
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def write_configuration(filePath, size):
+	specifications = {}
+
+	for index in range(size):
+		specifications["Component%d" % index] = {
+			"class": "ConfigurableComponent",
+			"module": "BenchmarkPlugins",
+			"initArgs": ["{$Name}", index % 2 == 0],
+			"lifetime": "singleton" if index % 10 == 0 else "",
+			"tags": ["benchmark"]
+		}
+
+	file = open(filePath, "w")
+	json.dump({"resources": {"Name": "benchmark"}, "component_specifications": specifications}, file)
+	file.close()
+
+
+def reachable_size(root):
+	"""
+	Sum sizes of objects reachable from root.
+	"""
+	seen = set()
+	pending = [root]
+	size = 0
+
+	while pending:
+		value = pending.pop()
+
+		if id(value) in seen or isinstance(value, SHARED_TYPES):
+			continue
+
+		seen.add(id(value))
+		size += sys.getsizeof(value)
+		pending.extend(gc.get_referents(value))
+
+	return size
+
+
+def measure(create):
+	"""
+	Get object created by create and the number of bytes it retains.
+	"""
+	gc.collect()
+
+	if tracemalloc is not None:
+		tracemalloc.start()
+		started = tracemalloc.get_traced_memory()[0]
+		value = create()
+		gc.collect()
+		size = tracemalloc.get_traced_memory()[0] - started
+		tracemalloc.stop()
+	else:
+		value = create()
+		size = reachable_size(value)
+
+	return value, size
+
+
+def main():
+	directory = tempfile.mkdtemp()
+
+	try:
+		print "measured with %s" % ("tracemalloc" if tracemalloc is not None else "sys.getsizeof")
+		print "%12s %22s %22s" % ("declarations", "configuration (bytes)", "manager (bytes)")
+
+		for size in SIZES:
+			filePath = os.path.join(directory, "configuration%d.json" % size)
+
+			write_configuration(filePath, size)
+
+			configuration, configurationSize = measure(lambda: Declare.Configuration.read(filePath))
+			manager, managerSize = measure(lambda: Declare.Manager(configuration))
+
+			if tracemalloc is None:
+				# the manager references the configuration, which is measured separately
+				managerSize -= configurationSize
+
+			print "%12d %22.1f %22.1f" % (size, float(configurationSize) / size, float(managerSize) / size)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,50 @@
+__author__ = 'ND'
+
+"""
+Benchmark of Manager creation with slow singletons constructed serially and on a pool of workers.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+
+CHAINS = 8
+CHAIN_LENGTH = 2
+SECONDS = 0.1
+
+
+def create_configuration():
+	"""
+	Create configuration of independent chains of singletons, each singleton referencing the previous one.
+	"""
+	declarations = []
+
+	for chain in range(CHAINS):
+		for index in range(CHAIN_LENGTH):
+			initArgs = [SECONDS, u"{Slow%d_%d}" % (chain, index - 1)] if index > 0 else [SECONDS]
+
+			declarations.append(Declare.ComponentDeclaration(u"Slow%d_%d" % (chain, index), "BenchmarkPlugins",
+			                                                 "SlowComponent", initArgs, "singleton"))
+
+	return Declare.Configuration({}, declarations)
+
+
+def main():
+	configuration = create_configuration()
+
+	print "%d chains of %d singletons, %.2f s each" % (CHAINS, CHAIN_LENGTH, SECONDS)
+
+	for workers in (1, 2, 4, 8):
+		started = time.time()
+		Declare.Manager(configuration, workers=workers)
+
+		print "%2d workers %10.3f s" % (workers, time.time() - started)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,49 @@
+__author__ = 'ND'
+
+"""
+Benchmark of Manager creation with eagerly and lazily constructed singletons.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+
+SINGLETONS = 500
+USED = 5
+
+
+def create_configuration():
+	declarations = []
+
+	for index in range(SINGLETONS):
+		declarations.append(Declare.ComponentDeclaration(u"Expensive%d" % index, "BenchmarkPlugins",
+		                                                 "ExpensiveComponent", lifetime="singleton"))
+
+	return Declare.Configuration({}, declarations)
+
+
+def measure(configuration, lazy):
+	def start():
+		manager = Declare.Manager(configuration, lazy)
+
+		for index in range(USED):
+			manager.get_component(u"Expensive%d" % index)
+
+	return min(timeit.repeat(start, number=1, repeat=3)) * 1e3
+
+
+def main():
+	configuration = create_configuration()
+
+	print "%d singletons, %d used" % (SINGLETONS, USED)
+	print "%-10s %10.3f ms" % ("eager", measure(configuration, False))
+	print "%-10s %10.3f ms" % ("lazy", measure(configuration, True))
+
+
+if __name__ == '__main__':
+	main()
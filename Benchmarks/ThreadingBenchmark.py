@@ -0,0 +1,62 @@
+__author__ = 'ND'
+
+"""
+Benchmark of Manager.get_component throughput as the number of resolving threads grows.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Declare
+
+RESOLUTIONS = 200000
+
+
+def create_manager():
+	return Declare.Manager(Declare.Configuration({u"Name": u"benchmark"}, [
+		Declare.ComponentDeclaration(u"Singleton", "BenchmarkPlugins", "Component", lifetime="singleton"),
+		Declare.ComponentDeclaration(u"Transient", "BenchmarkPlugins", "ConfigurableComponent", [u"{$Name}"])]),
+		True)
+
+
+def measure(manager, identifier, threadCount):
+	started = threading.Event()
+	resolutions = RESOLUTIONS // threadCount
+
+	def run():
+		started.wait()
+
+		for index in xrange(resolutions):
+			manager.get_component(identifier)
+
+	threads = [threading.Thread(target=run) for index in range(threadCount)]
+
+	for thread in threads:
+		thread.start()
+
+	begin = time.time()
+	started.set()
+
+	for thread in threads:
+		thread.join()
+
+	return resolutions * threadCount / (time.time() - begin)
+
+
+def main():
+	manager = create_manager()
+
+	print "%-10s %8s %16s" % ("component", "threads", "resolutions/s")
+
+	for identifier in (u"Singleton", u"Transient"):
+		for threadCount in (1, 2, 4, 8, 16):
+			print "%-10s %8d %16.0f" % (identifier, threadCount, measure(manager, identifier, threadCount))
+
+
+if __name__ == '__main__':
+	main()
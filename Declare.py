@@ -7,11 +7,36 @@ __doc__ = "Declare is designed as, among other things, an IoC container with sim
 "PluginConfiguration object.\n\nPluginConfiguration can be configured programmatically (although it wouldn't "\
 "make much sense) or via a JSON file that can be read via the 'read' static method."
 
+import abc
+import ast
+import gc
+import os
+import struct
+import marshal
+import hashlib
 import string
 import json
-import imp
+import sys
+import Queue
 import types
 import inspect
+import keyword
+import timeit
+import importlib
+import functools
+import threading
+import collections
+import contextlib
+from multiprocessing.pool import ThreadPool
+
+# asyncio (or trollius, its backport) is only required to resolve components asynchronously
+try:
+	import asyncio
+except ImportError:
+	try:
+		import trollius as asyncio
+	except ImportError:
+		asyncio = None
 
 
 class ComponentError(StandardError):
@@ -24,23 +49,88 @@ class ComponentSpecificationError(ComponentError):
 		super(StandardError, self).__init__(args, kwargs)
 
 
+def __intern__(value, values):
+	"""
+	Get instance of string, or of tuple of strings, equal to value which is shared through the values dictionary.
+	Other values are returned unchanged.
+	"""
+	if isinstance(value, tuple):
+		if not all(isinstance(item, basestring) for item in value):
+			return value
+
+		value = tuple(__intern__(item, values) for item in value)
+	elif not isinstance(value, basestring):
+		return value
+
+	# str and unicode strings which are equal are interned separately
+	return values.setdefault((value.__class__, value), value)
+
+
+def __interned__(declarations):
+	"""
+	Share equal module, class, lifetime and asynchronous initializer strings, tags and init argument tuples which
+	consist of strings between declarations, e.g. of a configuration file. The values are only shared within the
+	declarations, so that nothing is kept once they are released. Returns declarations.
+	"""
+	values = {}
+
+	for declaration in declarations:
+		declaration.__module_name__ = __intern__(declaration.__module_name__, values)
+		declaration.__class_name__ = __intern__(declaration.__class_name__, values)
+		declaration.__init_args__ = __intern__(declaration.__init_args__, values)
+		declaration.__lifetime__ = __intern__(declaration.__lifetime__, values)
+		declaration.__tags__ = __intern__(declaration.__tags__, values)
+		declaration.__async_init__ = __intern__(declaration.__async_init__, values)
+
+	return declarations
+
+
 class ComponentDeclaration(object):
+	__slots__ = ("__module_name__", "__class_name__", "__identifier__", "__init_args__", "__lifetime__", "__lazy__",
+	             "__tags__", "__metadata__", "__async_init__", "__lifetime_options__")
 
-	def __init__(self, identifier, moduleName, className, initArgs=None, lifetime=""):
+	def __init__(self, identifier, moduleName, className, initArgs=None, lifetime="", lazy=None, tags=None,
+	             metadata=None, asyncInit=None, lifetimeOptions=None):
 		"""
 		identifier: String identifier of the component declaration.
 		moduleName: Name of the module in which the component class can be found.
 		className: Name of the component class.
 		initArgs : A list or dictionary of arguments to be passed to the __init__ function when
 		constructing a new instance of the class. This argument is optional and has default of None.
-		lifetime : This argument specifies the lifetime of the declared component.
-		This argument is only required to configure the component as a 'singleton'.
+		lifetime : This argument specifies the lifetime of the declared component, one of:
+		- singleton: a single instance is shared.
+		- pooled: instances are acquired from a pool with Manager.acquire and released to it.
+		- scoped: a single instance is shared within a scope created with Manager.scope.
+		- per_graph: a single instance is shared by the components referencing it while resolving one component.
+		- cached: a single instance is shared until its time to live expires, and then replaced in the background.
+		- per_process: a single instance is shared in each process, e.g. in each process forked by a server.
+		- <empty string>: a new instance is constructed on each resolution.
+		This argument is only required to configure the component as a 'singleton', 'pooled', 'scoped',
+		'per_graph', 'cached' or 'per_process'.
+		lazy : Whether a singleton is constructed on first use rather than when the Manager is created.
+		This argument is optional and has default of None, in which case the Manager's setting applies.
+		tags : A list of tags the component can be queried by without being instantiated. This argument is optional.
+		metadata : A dictionary of arbitrary values describing the component. This argument is optional.
+		asyncInit : Name of a method of the component which returns an awaitable completing its initialization.
+		Components with an asynchronous initializer are resolved with Manager.get_component_async.
+		This argument is optional.
+		lifetimeOptions : A dictionary of settings of the lifetime, e.g. the size of the pool of a pooled component.
+		This argument is optional.
+
+		A list of init arguments is stored as a tuple. Module, class and lifetime strings, tags and init argument
+		tuples which consist of strings are shared between the declarations read by Configuration.read.
 		"""
 		self.__module_name__ = moduleName
 		self.__class_name__ = className
 		self.__identifier__ = identifier
-		self.__init_args__ = initArgs
+		self.__init_args__ = tuple(initArgs) if isinstance(initArgs, (list, tuple)) else initArgs
 		self.__lifetime__ = lifetime
+		self.__lazy__ = lazy
+		self.__tags__ = tuple(tags) if tags is not None else ()
+		# declarations without metadata do not keep an empty dictionary each
+		self.__metadata__ = metadata if metadata else None
+		self.__async_init__ = asyncInit
+		self.__lifetime_options__ = lifetimeOptions if lifetimeOptions else None
 
 	def identifier(self):
 		return self.__identifier__
@@ -57,10 +147,298 @@ class ComponentDeclaration(object):
 	def init_args(self):
 		return self.__init_args__
 
+	def lazy(self):
+		return self.__lazy__
+
+	def tags(self):
+		return self.__tags__
+
+	def metadata(self):
+		return self.__metadata__ if self.__metadata__ is not None else {}
+
+	def async_init(self):
+		return self.__async_init__
+
+	def lifetime_options(self):
+		return self.__lifetime_options__ if self.__lifetime_options__ is not None else {}
+
+
+class ComponentDescriptor(object):
+	"""
+	Lightweight description of a declared component which can be obtained from Manager without instantiating the
+	component. The component itself can be obtained with Manager.get_component(descriptor.identifier()).
+	"""
+	__slots__ = ("__declaration__", "__plugin_class__")
+
+	def __init__(self, declaration):
+		self.__declaration__ = declaration
+		self.__plugin_class__ = None
+
+	def identifier(self):
+		return self.__declaration__.identifier()
+
+	def type(self):
+		"""
+		Get class of the component, or None if the module of a lazy declaration has not been imported yet.
+		"""
+		return self.__plugin_class__
+
+	def module_name(self):
+		return self.__declaration__.module_name()
+
+	def class_name(self):
+		return self.__declaration__.class_name()
+
+	def lifetime(self):
+		return self.__declaration__.lifetime()
+
+	def tags(self):
+		return self.__declaration__.tags()
+
+	def metadata(self):
+		return self.__declaration__.metadata()
+
+	def lifetime_options(self):
+		return self.__declaration__.lifetime_options()
+
+	def set_type(self, type):
+		self.__plugin_class__ = type
+
+
+class __ComponentStatistics__(object):
+	"""
+	Counters of the resolution of a component, kept by Instrumentation.
+	"""
+	__slots__ = ("resolutions", "singleton_hits", "constructions", "construction_time", "max_construction_time",
+	             "resolution_time", "process_time")
+
+	def __init__(self):
+		self.resolutions = 0
+		self.singleton_hits = 0
+		self.constructions = 0
+		self.construction_time = 0.0
+		self.max_construction_time = 0.0
+		self.resolution_time = 0.0
+		self.process_time = 0.0
+
+	def snapshot(self):
+		return dict((name, getattr(self, name)) for name in __ComponentStatistics__.__slots__)
+
+
+class Instrumentation(object):
+	"""
+	Instrumentation of the resolution of components by the Manager it is passed to. It keeps statistics of each
+	component and notifies subscribers of the following events, with the identifier of the component, or the name
+	of the module, and the time spent in seconds:
+	- import: a plugin module was imported.
+	- process: a declaration was processed, including the import of its module.
+	- resolve: the init arguments of a component were resolved, excluding construction of referenced components.
+	- construct: the __init__ function of a component was called, excluding construction of referenced components.
+	- dispose: a component was disposed when the Manager was closed.
+
+	A Manager created without instrumentation does not measure anything.
+	"""
+
+	__format_string__ = string.Formatter().vformat
+	__events__ = ("import", "process", "resolve", "construct", "dispose")
+
+	def __init__(self):
+		self.__lock__ = threading.Lock()
+		self.__subscribers__ = dict((event, []) for event in Instrumentation.__events__)
+		self.__statistics__ = {}
+		self.__dependencies__ = {}
+		# time spent constructing components referenced by the components being constructed by each thread
+		self.__local__ = threading.local()
+
+	def subscribe(self, event, callback):
+		"""
+		Call callback(name, seconds) on each occurrence of event.
+		"""
+		if not self.__subscribers__.has_key(event):
+			raise ComponentError(self.__format_string__("Unknown instrumentation event '{event}'", [],
+			                                            {"event": event}))
+
+		self.__subscribers__[event].append(callback)
+
+	def stats(self):
+		"""
+		Get snapshot of the statistics of components, as dictionary of identifier to dictionary with keys:
+		- resolutions: number of times the component was resolved with get_component.
+		- singleton_hits: number of those resolutions which returned an already constructed singleton.
+		- constructions: number of instances constructed.
+		- construction_time: cumulative time, in seconds, spent in __init__ of the component.
+		- max_construction_time: longest time spent in __init__ of the component.
+		- resolution_time: cumulative time spent resolving init arguments of the component.
+		- process_time: time spent processing the declaration of the component.
+		"""
+		with self.__lock__:
+			return dict((identifier, statistics.snapshot())
+			            for identifier, statistics in self.__statistics__.iteritems())
+
+	def critical_chain(self):
+		"""
+		Get chain of references along which the most time was spent constructing components, as list of
+		(identifier, seconds) pairs starting with the component which references the others.
+		"""
+		with self.__lock__:
+			spent = dict((identifier, statistics.construction_time + statistics.resolution_time)
+			             for identifier, statistics in self.__statistics__.iteritems())
+			dependencies = dict(self.__dependencies__)
+
+		# time spent along the slowest chain starting with each component, and the next component of the chain
+		totals = {}
+		successors = {}
+
+		for root in spent:
+			stack = [root]
+			visiting = set()
+
+			while stack:
+				identifier = stack[-1]
+
+				if totals.has_key(identifier):
+					stack.pop()
+					continue
+
+				visiting.add(identifier)
+				# references recorded from different configurations could form a cycle
+				pending = [dependency for dependency in dependencies.get(identifier, ())
+				           if not totals.has_key(dependency) and not dependency in visiting]
+
+				if pending:
+					stack.extend(pending)
+					continue
+
+				stack.pop()
+				visiting.discard(identifier)
+
+				successor = max([dependency for dependency in dependencies.get(identifier, ())
+				                 if totals.has_key(dependency)] or [None], key=lambda item: totals.get(item, 0.0))
+
+				totals[identifier] = spent.get(identifier, 0.0) + totals.get(successor, 0.0)
+				successors[identifier] = successor
+
+		chain = []
+		identifier = max(totals, key=totals.get) if totals else None
+
+		while identifier is not None:
+			chain.append((identifier, spent.get(identifier, 0.0)))
+			identifier = successors[identifier]
+
+		return chain
+
+	def report(self, count=10, file=None):
+		"""
+		Print the components on which the most time was spent constructing them, and the chain of references along
+		which the most time was spent constructing components.
+		"""
+		file = file if file is not None else sys.stdout
+		statistics = self.stats()
+		slowest = sorted(statistics.iteritems(), reverse=True,
+		                 key=lambda item: item[1]["construction_time"] + item[1]["resolution_time"])[:count]
+
+		file.write("%-40s %13s %14s %13s %14s\n" % ("component", "constructions", "construct (ms)", "max (ms)",
+		                                            "resolve (ms)"))
+
+		for identifier, values in slowest:
+			file.write("%-40s %13d %14.3f %13.3f %14.3f\n" % (identifier, values["constructions"],
+			                                                  values["construction_time"] * 1e3,
+			                                                  values["max_construction_time"] * 1e3,
+			                                                  values["resolution_time"] * 1e3))
+
+		chain = self.critical_chain()
+
+		file.write("\nslowest chain of references (%.3f ms):\n" % (sum(seconds for identifier, seconds in chain) * 1e3))
+		file.write(" -> ".join("%s (%.3f ms)" % (identifier, seconds * 1e3) for identifier, seconds in chain) + "\n")
+
+	def __statistics_of__(self, identifier):
+		# must be called with the lock held
+		statistics = self.__statistics__.get(identifier)
+
+		if statistics is None:
+			statistics = __ComponentStatistics__()
+			self.__statistics__[identifier] = statistics
+
+		return statistics
+
+	def __notify__(self, event, name, seconds):
+		for callback in self.__subscribers__[event]:
+			callback(name, seconds)
+
+	def __record_import__(self, moduleName, seconds):
+		self.__notify__("import", moduleName, seconds)
+
+	def __record_processing__(self, identifier, dependencies, seconds):
+		with self.__lock__:
+			self.__statistics_of__(identifier).process_time += seconds
+			self.__dependencies__[identifier] = dependencies
+
+		self.__notify__("process", identifier, seconds)
+
+	def __record_resolution__(self, identifier, singletonHit):
+		with self.__lock__:
+			statistics = self.__statistics_of__(identifier)
+			statistics.resolutions += 1
+
+			if singletonHit:
+				statistics.singleton_hits += 1
+
+	def __record_construction__(self, identifier, resolutionSeconds, constructionSeconds):
+		with self.__lock__:
+			statistics = self.__statistics_of__(identifier)
+			statistics.constructions += 1
+			statistics.construction_time += constructionSeconds
+			statistics.max_construction_time = max(statistics.max_construction_time, constructionSeconds)
+			statistics.resolution_time += resolutionSeconds
+
+		self.__notify__("resolve", identifier, resolutionSeconds)
+		self.__notify__("construct", identifier, constructionSeconds)
+
+	def __instrument_plan__(self, identifier, plan):
+		"""
+		Get function constructing component of plan which records the time spent.
+		"""
+		componentClass = plan.type()
+		local = self.__local__
+
+		def construct():
+			# time spent constructing referenced components is accumulated on top of the stack and excluded
+			stack = getattr(local, "stack", None)
+
+			if stack is None:
+				stack = local.stack = []
+
+			stack.append(0.0)
+
+			try:
+				started = timeit.default_timer()
+				arguments, keywordArguments = plan.arguments()
+				resolved = timeit.default_timer()
+				resolvedReferences = stack[-1]
+				instance = componentClass(*arguments, **keywordArguments)
+				finished = timeit.default_timer()
+			finally:
+				references = stack.pop()
+
+			if stack:
+				stack[-1] += finished - started
+
+			self.__record_construction__(identifier, resolved - started - resolvedReferences,
+			                             finished - resolved - (references - resolvedReferences))
+
+			return instance
+
+		return construct
+
 
 class Configuration(object):
 	__string_formatter__ = string.Formatter()
 
+	# snapshot header: magic, version, size, modification time and SHA-1 hash of the configuration file
+	__snapshot_header__ = struct.Struct("<8sHQd20s")
+	__snapshot_magic__ = "DECLARE\0"
+	__snapshot_version__ = 3
+
 	def __init__(self, resourceDeclarations, componentDeclarations):
 		"""
 		Configuration can be created by providing a list of ComponentDeclaration object.
@@ -86,9 +464,12 @@ class Configuration(object):
 		return self.__resource_declarations__
 
 	@staticmethod
-	def read(filePath):
+	def read(filePath, snapshotPath=None):
 		"""
 		filePath: Full path of file which contains the JSON configuration.
+		snapshotPath: Optional full path of a snapshot of the configuration. If the snapshot was written from the
+		current content of the configuration file, the configuration is loaded from the snapshot without parsing the
+		file. Otherwise the file is parsed and the snapshot is (re)written.
 
 		Example of configuration file content:
 
@@ -109,312 +490,3447 @@ class Configuration(object):
 				{
 					"class": "ListWordDefinitionsTask",
 					"module": "StandardDictionaryUserTasks",
-					"lifetime": "singleton"
+					"lifetime": "singleton",
+					"lazy": true,
+					"tags": ["read-only"],
+					"metadata": {"title": "List word definitions"},
+					"asyncInit": "load"
 				},
 				"RemoveWordDefinitionTask":
 				{
 					"class": "RemoveWordDefinitionTask",
 					"module": "StandardDictionaryUserTasks"
 					"initArgs": "{$RepeatableTaskRepeat}"
+				},
+				"DefinitionParser":
+				{
+					"class": "DefinitionParser",
+					"module": "StandardDictionaryParsers",
+					"lifetime": "pooled",
+					"lifetimeOptions": {"min": 2, "max": 8, "reset": "clear", "block": true, "timeout": 1.0}
+				}
+			},
+			"discovery":
+			[
+				{
+					"paths": ["plugins"],
+					"base": "StandardDictionaryModel.UserTask",
+					"index": "plugins.index",
+					"tags": ["discovered"]
 				}
-			}
+			]
 		}
+
+		Components of the optional "discovery" section are discovered as described by Configuration.discover. Paths
+		are relative to the directory of the configuration file, "base" is the qualified name of the base class and
+		"lifetime", "lazy" and "tags" apply to the discovered declarations. Declarations of the
+		"component_specifications" section, which can be left out, override discovered declarations of the same
+		identifier.
 		"""
-		resourceDeclarations = {}
-		pluginDeclarations = []
+		if snapshotPath is not None:
+			configuration = Configuration.__read_snapshot__(filePath, snapshotPath)
+
+			if configuration is not None:
+				return configuration
+
+			# the file is stat'ed before it is read, and the content which is parsed is hashed, so that a snapshot of
+			# a file modified meanwhile does not record the new size, modification time or hash with the old content
+			sourceKey = Configuration.__source_key__(filePath)
 
-		file = open(filePath, "r")
+		file = open(filePath, "rb")
 
 		try:
-			configurationObject = json.load(file)
-		except:
-			raise
+			content = file.read()
 		finally:
 			file.close()
 
-		if configurationObject.has_key("resources"):
-			resourceDeclarations = configurationObject["resources"]
+		configurationObject = json.loads(content)
 
-		for identifier, specification in configurationObject["component_specifications"].iteritems():
-			className = specification["class"]
-			moduleName = specification["module"]
+		resourceDeclarations = configurationObject.get("resources", {})
+		pluginDeclarations = []
 
-			if specification.has_key("lifetime"):
-				lifetime = specification["lifetime"]
-			else:
-				lifetime = ""
+		for identifier, specification in configurationObject.get("component_specifications", {}).iteritems():
+			pluginDeclarations.append(ComponentDeclaration(identifier, specification["module"], specification["class"],
+			                                               specification.get("initArgs"),
+			                                               specification.get("lifetime", ""),
+			                                               specification.get("lazy"), specification.get("tags"),
+			                                               specification.get("metadata"),
+			                                               specification.get("asyncInit"),
+			                                               specification.get("lifetimeOptions")))
 
-			if specification.has_key("initArgs"):
-				initArgs = specification["initArgs"]
-			else:
-				initArgs = None
+		directory = os.path.dirname(os.path.abspath(filePath))
+		discoveries = tuple(Configuration.__discovery_record__(discovery, directory)
+		                    for discovery in configurationObject.get("discovery", []))
 
-			pluginDeclarations.append(ComponentDeclaration(identifier, moduleName, className, initArgs, lifetime))
+		configuration = Configuration(resourceDeclarations, __interned__(pluginDeclarations))
 
-		return Configuration(resourceDeclarations, pluginDeclarations)
+		if snapshotPath is not None:
+			Configuration.__write_snapshot__(configuration, discoveries, sourceKey, hashlib.sha1(content).digest(),
+			                                 snapshotPath)
 
+		return Configuration.__with_discovered__(configuration, discoveries)
 
-class __Specification__(object):
+	@staticmethod
+	def discover(directories, baseType, indexPath=None, lifetime="", lazy=True, tags=None):
+		"""
+		Get Configuration declaring the concrete classes of the modules of plugin directories which derive from a base
+		class, directly or through other classes of the modules. Modules are analysed without being imported, and
+		declarations are lazy by default, so that only the modules of the components which are resolved are imported.
 
-	def __init__(self, type, initArgs):
-		self.__plugin_class__ = type
-		self.__init_args__ = initArgs
+		directories: Directories of the plugin modules, i.e. directories modules are imported from or package
+		directories. Modules of their packages are discovered too.
+		baseType: Base class, or its qualified name, e.g. "StandardDictionaryModel.UserTask". Abstract methods of a
+		base class specified by name are only known if the modules of directories declare it.
+		indexPath: Optional full path of the index of the analysed modules. Only modules which changed since the
+		index was written are analysed again, and the index is rewritten if any did.
+		lifetime, lazy, tags: Lifetime, laziness and tags of the declarations, see ComponentDeclaration.
 
-	def type(self):
-		return self.__plugin_class__
+		Identifier of a declaration is the name of its class, qualified with the name of its module if several modules
+		declare classes of the same name. Classes whose name starts with an underscore are not discovered.
+		"""
+		if isinstance(baseType, basestring):
+			baseName, abstractMethods = baseType, None
+		else:
+			baseName = baseType.__module__ + "." + baseType.__name__
+			abstractMethods = getattr(baseType, "__abstractmethods__", ())
 
-	def init_args(self):
-		return self.__init_args__
+		modules = __PluginDiscovery__(indexPath).scan(directories)
+		classes = __PluginDiscovery__.subclasses(modules, baseName, abstractMethods)
+		classCounts = collections.Counter(className for moduleName, className in classes)
 
+		return Configuration({}, [ComponentDeclaration(className if classCounts[className] == 1
+		                                               else moduleName + "." + className,
+		                                               moduleName, className, None, lifetime, lazy, tags)
+		                          for moduleName, className in classes])
 
-class Manager(object):
+	@staticmethod
+	def __discovery_record__(discovery, directory):
+		"""
+		Get tuple of the arguments of Configuration.discover of an entry of the discovery section.
+		"""
+		indexPath = discovery.get("index")
 
-	__format_string__ = string.Formatter().vformat
+		return (tuple(os.path.join(directory, path) for path in discovery["paths"]), discovery["base"],
+		        os.path.join(directory, indexPath) if indexPath is not None else None, discovery.get("lifetime", ""),
+		        discovery.get("lazy", True), tuple(discovery["tags"]) if discovery.get("tags") is not None else None)
 
-	def __is_reference_to_component__(self, value):
-		# component is identified by the following format: {name}
-		return value.startswith("{") and value.endswith("}")
+	@staticmethod
+	def __with_discovered__(configuration, discoveries):
+		"""
+		Get configuration with the discovered declarations it does not override.
+		"""
+		if not discoveries:
+			return configuration
 
-	def __is_reference_to_resource__(self, value):
-		# resource is identified by the following format: {$name}
-		return value.startswith("{$") and value.endswith("}")
+		declarations = []
 
-	def __resolve_init_argument__(self, value, specification):
-		# default resolved argument to 'value' as is
-		resolvedArgument = value
+		for discovery in discoveries:
+			declarations.extend(declaration for declaration in Configuration.discover(*discovery).plugins()
+			                    if configuration[declaration.identifier()] is None)
 
-		# if resource value is string, it could be just a string or reference to either resource or component
-		if type(value) == unicode:
-			if self.__is_reference_to_resource__(value):
+		declarations.extend(configuration.plugins())
 
-				resourceName = value.strip('{$}')
+		return Configuration(configuration.resources(), declarations)
 
-				if resourceName == "None":
-					# if resource value is {$None}
-					resolvedArgument = None
-				if self.__configuration__.resources().has_key(resourceName):
-					# if resource with specified identifier exists (was declared)
-					resolvedArgument = self.__configuration__.resources()[resourceName]
-				else:
-					# if specified resource not found
-					raise ComponentSpecificationError(self.__format_string__(
-								"Unable to find resource '{resourceName}'"
-								"as init argument for {specification.__class__.__name__},"
-								"{specification.__class__.__module__}.",
-								[], {"resourceName": resourceName, "specification": specification}))
+	@staticmethod
+	def __declaration_record__(declaration):
+		"""
+		Get tuple of the arguments declaration was created with.
+		"""
+		return (declaration.identifier(), declaration.module_name(), declaration.class_name(), declaration.init_args(),
+		        declaration.lifetime(), declaration.lazy(), declaration.tags(), declaration.metadata(),
+		        declaration.async_init(), declaration.lifetime_options())
 
-			elif self.__is_reference_to_component__(value):
+	@staticmethod
+	def __source_key__(filePath):
+		"""
+		Get size and modification time of configuration file.
+		"""
+		status = os.stat(filePath)
 
-				componentName = value.strip(['{}'])
+		return status.st_size, status.st_mtime
 
-				# if singleton with specified identifier exists
-				if self.__named_singleton_components__.has_key(componentName):
-					resolvedArgument = self.__named_singleton_components__[componentName]
-				elif self.__named_component_specifications__.has_key(componentName):
-					# if specification with specified identifier exists
-					resolvedArgument = self.__create_instance__(self.__named_component_specifications__[componentName])
-				else:
-					raise ComponentSpecificationError(self.__format_string__(
-						"Unable to find component '{componentName}' as"
-						"init argument for {specification.__class__.__name__}, {specification.__class__.__module__}.",
-						[], {"componentName": componentName, "specification": specification}))
+	@staticmethod
+	def __source_hash__(filePath):
+		file = open(filePath, "rb")
 
-		return resolvedArgument
+		try:
+			return hashlib.sha1(file.read()).digest()
+		finally:
+			file.close()
 
-	def __create_instance__(self, specification):
+	@staticmethod
+	def __read_snapshot__(filePath, snapshotPath):
 		"""
-		Create instance of a type based on a specification.
-		:rtype: object
+		Read configuration from snapshot of configuration file, or return None if there is no snapshot of the current
+		content of the file.
 		"""
-		#instance = None
+		if not os.path.exists(snapshotPath):
+			return None
 
-		expectedArguments = inspect.getargspec(specification.type().__init__)
+		file = open(snapshotPath, "rb")
 
-		defaultsCount = len(expectedArguments.defaults) if expectedArguments.defaults is not None else 0
-		argumentsCount = len(specification.init_args()) if specification.init_args() is not None else 0
-		requiredArgumentsCount = len(expectedArguments.args) - (defaultsCount + 1)
+		try:
+			magic, version, size, modified, sourceHash = Configuration.__snapshot_header__.unpack(
+				file.read(Configuration.__snapshot_header__.size))
 
-		# raise an error if the number of arguments declared in specification is less than the number of
-		# non optional arguments required by the __init__ function
-		if argumentsCount < requiredArgumentsCount:
-			raise StandardError("Component declaration does not have enough init arguments")
+			if magic != Configuration.__snapshot_magic__ or version != Configuration.__snapshot_version__:
+				return None
 
+			sourceKey = Configuration.__source_key__(filePath)
 
-		# Evaluate declared arguments.
-		# Each declared argument can be evaluated to one of the following:
-		# - None, which is represented by "{$None}"
-		# - Component, which is represented by "{componentDeclarationIdentifier}".
-		#   The identified component will be resolved by either referencing a singleton component or
-		#   creating a new instance of non singleton component
-		#   An error will be raised if the no declaration can be found the the specified identifier
-		# - Primitive types
+			# snapshot is stale if the file was modified, unless its content is unchanged
+			if (size, modified) != sourceKey and sourceHash != Configuration.__source_hash__(filePath):
+				return None
 
-		# if arguments are declared as list
-		if type(specification.init_args()) == list:
-			arguments = []
+			payload = file.read()
+			resourceDeclarations, records, discoveries = marshal.loads(payload)
 
-			# evaluate each declared argument
-			for index in range(argumentsCount):
-				argument = specification.init_args()[index]
+			# the size and modification time of a file whose content is unchanged are recorded, so that it is not
+			# hashed again on every start
+			if (size, modified) != sourceKey:
+				Configuration.__replace_snapshot__(snapshotPath, sourceKey, sourceHash, payload)
+		except (ValueError, EOFError, TypeError, struct.error):
+			# snapshot is corrupt or written by another version of Python
+			return None
+		finally:
+			file.close()
 
-				arguments.append(self.__resolve_init_argument__(argument, specification))
+		return Configuration.__with_discovered__(
+			Configuration(resourceDeclarations, __interned__([ComponentDeclaration(*record) for record in records])),
+			discoveries)
 
-			instance = specification.type()(*arguments)
+	@staticmethod
+	def __write_snapshot__(configuration, discoveries, sourceKey, sourceHash, snapshotPath):
+		"""
+		Write snapshot of configuration read from configuration file of specified size and modification time, and
+		hash, and of its discovery section, as discovered components are discovered again when the snapshot is read.
+		Failure to write the snapshot is ignored.
+		"""
+		records = tuple(Configuration.__declaration_record__(declaration) for declaration in configuration.plugins())
 
-		elif type(specification.init_args()) == dict:
-			# if arguments are declared as dictionary
-			arguments = {}
+		Configuration.__replace_snapshot__(snapshotPath, sourceKey, sourceHash,
+		                                   marshal.dumps((configuration.resources(), records, discoveries)))
 
-			# evaluate each declared argument
-			for name, value in specification.init_args().iteritems():
+	@staticmethod
+	def __replace_snapshot__(snapshotPath, sourceKey, sourceHash, payload):
+		"""
+		Write snapshot of marshalled payload, for a configuration file of specified size and modification time, and
+		hash. Failure to write the snapshot is ignored.
+		"""
+		size, modified = sourceKey
+		temporaryPath = snapshotPath + "." + str(os.getpid())
 
-				# if declared argument name is not in init argument list
-				if not name in expectedArguments.args:
-					raise ComponentError()
+		try:
+			file = open(temporaryPath, "wb")
 
-				arguments[name] = self.__resolve_init_argument__(value, specification)
+			try:
+				file.write(Configuration.__snapshot_header__.pack(Configuration.__snapshot_magic__,
+				                                                  Configuration.__snapshot_version__, size, modified,
+				                                                  sourceHash))
+				file.write(payload)
+			finally:
+				file.close()
 
-			instance = specification.type()(**arguments)
-		else:
-			# if (presumed) no arguments are specified
-			instance = specification.type()()
+			# replace snapshot atomically, so that concurrently starting processes never read a partial snapshot
+			if os.name == "nt" and os.path.exists(snapshotPath):
+				os.remove(snapshotPath)
 
-		return instance
+			os.rename(temporaryPath, snapshotPath)
+		except (IOError, OSError):
+			if os.path.exists(temporaryPath):
+				os.remove(temporaryPath)
 
-	def __registerSingleton__(self, type, instance):
-		# get list (object) of singletons for 'type'
-		if self.__singleton_components__.has_key(type):
-			pluginInstances = self.__singleton_components__[type]
-		else:
-			pluginInstances = []
-			self.__singleton_components__[type] = pluginInstances
 
-		pluginInstances.append(instance)
+class __PluginDiscovery__(object):
+	"""
+	Discovery of plugin classes by static analysis of the modules of plugin directories, which are not imported. The
+	classes and imported names of each module are kept in an optional index file, so that only the modules which
+	changed since the index was written are parsed again.
+	"""
 
-	def __registerSpecification__(self, type, specification):
-		# get list (object) of specifications for 'type'
-		if self.__plugin_specifications__.has_key(type):
-			specifications = self.__plugin_specifications__[type]
-		else:
-			specifications = []
-			self.__plugin_specifications__[type] = specifications
+	# index header: magic and version
+	__index_header__ = struct.Struct("<8sH")
+	__index_magic__ = b"DECLIDX\0"
+	__index_version__ = 1
 
-		# if specification is not known for type
-		if not specification in specifications:
-			specifications.append(specification)
+	__abstract_decorators__ = frozenset(["abstractmethod", "abstractproperty", "abstractclassmethod",
+	                                     "abstractstaticmethod"])
 
-	def __processSingletonDeclaration__(self, declaration, pluginClass):
+	def __init__(self, indexPath=None):
+		self.__index_path__ = indexPath
+		# records of the modules by file path: size, modification time, hash, module name, classes and imported names
+		self.__records__ = self.__read_index__() if indexPath is not None else {}
+		self.__changed__ = False
+
+	@staticmethod
+	def __is_identifier__(name):
+		return bool(name) and not name[0].isdigit() and not keyword.iskeyword(name) \
+		       and all(character.isalnum() or character == "_" for character in name)
+
+	@staticmethod
+	def __package_of__(directory):
 		"""
-		Create and register component specification for future instantiation
+		Get name of package of directory, or "" if directory is not a package.
 		"""
-		pluginInstance = self.__create_instance__(__Specification__(pluginClass, declaration.init_args()))
+		names = []
 
-		self.__named_singleton_components__[declaration.identifier()] = pluginInstance
-		self.__registerSingleton__(pluginClass, pluginInstance)
+		while os.path.exists(os.path.join(directory, "__init__.py")):
+			directory, name = os.path.split(directory)
+			names.insert(0, name)
 
-		for base in pluginClass.__bases__:
-			if base == object:
-				continue
+		return ".".join(names)
+
+	@staticmethod
+	def __module_files__(directory):
+		"""
+		Get (module name, file path, is package) tuples of the modules of directory and of its packages.
+		"""
+		directory = os.path.abspath(directory)
+		pending = [(directory, __PluginDiscovery__.__package_of__(directory))]
+		modules = []
 
-			self.__registerSingleton__(base, pluginInstance)
+		while pending:
+			directory, package = pending.pop()
 
-	def __processNonSingletonDeclaration__(self, declaration, pluginClass):
+			for name in os.listdir(directory):
+				filePath = os.path.join(directory, name)
+				prefix = package + "." if package else ""
+
+				if name == "__init__.py":
+					if package:
+						modules.append((package, filePath, True))
+				elif name.endswith(".py"):
+					if __PluginDiscovery__.__is_identifier__(name[:-3]):
+						modules.append((prefix + name[:-3], filePath, False))
+				elif __PluginDiscovery__.__is_identifier__(name) \
+						and os.path.exists(os.path.join(filePath, "__init__.py")):
+					pending.append((filePath, prefix + name))
+
+		return modules
+
+	@staticmethod
+	def __dotted_name__(expression):
 		"""
-		Create and register instance of the component
+		Get dotted name of a base class expression, or None if it is not a name or an attribute of a name.
 		"""
-		specification = __Specification__(pluginClass, declaration.init_args())
-		self.__named_component_specifications__[declaration.identifier()] = specification
+		if isinstance(expression, ast.Name):
+			return expression.id
 
-		self.__registerSpecification__(pluginClass, specification)
+		if isinstance(expression, ast.Attribute):
+			value = __PluginDiscovery__.__dotted_name__(expression.value)
 
-		for base in pluginClass.__bases__:
-			if base == object:
-				continue
+			return value + "." + expression.attr if value is not None else None
 
-			self.__registerSpecification__(base, specification)
+		return None
 
-	def __processDeclaration__(self, declaration):
+	@staticmethod
+	def __parse__(source, moduleName, isPackage):
 		"""
-		Create specification or component instance based on declaration
+		Get classes and imported names of the source of a module. Classes are (name, qualified names of the base
+		classes, names of the abstract methods, names of the attributes) tuples. Imported names are a dictionary of the
+		qualified names of the imported modules and module attributes by the names they are bound to.
 		"""
-		self.__plugin_specifications__.values()# if module has been loaded before
-		if self.__plugin_modules__.has_key(declaration.module_name()):
-			pluginModule = self.__plugin_modules__[declaration.module_name()]
-		else:
-		# otherwise load and cache module
-			moduleInfo = imp.find_module(declaration.module_name())
-			pluginModule = imp.load_module(declaration.module_name(), moduleInfo[0], moduleInfo[1], moduleInfo[2])
-			self.__plugin_modules__[declaration.module_name()] = pluginModule
+		package = moduleName if isPackage else moduleName.rpartition(".")[0]
+		aliases = {}
+		classes = []
+		classNames = set()
 
-		# check that module has attribute with name equals to declared class name
-		if not hasattr(pluginModule, declaration.class_name()):
-			raise ComponentError(
-				self.__format_string__("Unable to find class '{class}' in modules '{module}' for plugin: '{plugin}'",
-					[], {"class": declaration.class_name(), "module": declaration.module_name(),
-					     "plugin": declaration.identifier()}))
+		for node in ast.parse(source).body:
+			if isinstance(node, ast.Import):
+				for alias in node.names:
+					if alias.asname is not None:
+						aliases[alias.asname] = alias.name
+					else:
+						aliases[alias.name.partition(".")[0]] = alias.name.partition(".")[0]
+			elif isinstance(node, ast.ImportFrom):
+				if node.level:
+					# relative import, from the package of the module or from one of its parent packages
+					parts = package.split(".") if package else []
+					origin = ".".join(parts[:len(parts) - node.level + 1] + ([node.module] if node.module else []))
+				else:
+					origin = node.module
 
-		componentClass = getattr(pluginModule, declaration.class_name())
+				for alias in node.names:
+					if alias.name != "*":
+						aliases[alias.asname or alias.name] = origin + "." + alias.name
+			elif isinstance(node, ast.ClassDef):
+				bases = []
 
-		# check that the identified module attribute is a class
-		if not isinstance(componentClass, (type, types.ClassType)):
-			raise ComponentError(
-				self.__format_string__("'{class}' is not a class in modules '{module}' for plugin: '{plugin}'", [],
-				{"class": declaration.class_name(), "module": declaration.module_name(),
-					"plugin": declaration.identifier()}))
+				for expression in node.bases:
+					name = __PluginDiscovery__.__dotted_name__(expression)
 
-		if declaration.lifetime() == "singleton":
-			self.__processSingletonDeclaration__(declaration, componentClass)
-		else:
-			self.__processNonSingletonDeclaration__(declaration, componentClass)
+					if name is None:
+						continue
 
-	def __init__(self, configuration):
+					first, separator, rest = name.partition(".")
+
+					if aliases.has_key(first):
+						name = aliases[first] + separator + rest
+					elif first in classNames:
+						name = moduleName + "." + name
+
+					bases.append(name)
+
+				abstract = []
+				attributes = []
+
+				for statement in node.body:
+					if isinstance(statement, ast.FunctionDef):
+						attributes.append(statement.name)
+
+						decorators = [decorator.id if isinstance(decorator, ast.Name)
+						              else getattr(decorator, "attr", None) for decorator in statement.decorator_list]
+
+						if any(decorator in __PluginDiscovery__.__abstract_decorators__ for decorator in decorators):
+							abstract.append(statement.name)
+					elif isinstance(statement, ast.Assign):
+						attributes.extend(target.id for target in statement.targets if isinstance(target, ast.Name))
+
+				classNames.add(node.name)
+				classes.append((node.name, tuple(bases), tuple(abstract), tuple(attributes)))
+
+		return tuple(classes), aliases
+
+	def __record_of__(self, moduleName, filePath, isPackage):
 		"""
-		Initiate ComponentManager with a Configuration object
+		Get record of module from the index, or parse the module if it changed since it was indexed.
 		"""
-		self.__configuration__ = configuration
-		self.__plugin_modules__ = {}
+		status = os.stat(filePath)
+		record = self.__records__.get(filePath)
 
-		self.__singleton_components__ = {}
-		self.__named_singleton_components__ = {}
+		if record is not None and record[3] == moduleName and (record[0], record[1]) == (status.st_size,
+		                                                                                  status.st_mtime):
+			return record
 
-		self.__plugin_specifications__ = {}
-		self.__named_component_specifications__ = {}
+		file = open(filePath, "rb")
 
-		for declaration in configuration.plugins():
-			self.__processDeclaration__(declaration)
+		try:
+			source = file.read()
+		finally:
+			file.close()
 
-	def get_components_of_type(self, type, lifetime="all"):
-		"""
-		Get components which are instances of or inherits specified type.
+		sourceHash = hashlib.sha1(source).digest()
 
-		Lifetime can be one of the following:
-		- all
-		- singleton
-		- <empty string>
-		"""
-		components = []
+		# module is not parsed again if it was only touched
+		if record is not None and record[3] == moduleName and record[2] == sourceHash:
+			classes, aliases = record[4], record[5]
+		else:
+			try:
+				classes, aliases = __PluginDiscovery__.__parse__(source, moduleName, isPackage)
+			except SyntaxError:
+				# module can not be imported either
+				classes, aliases = (), {}
 
-		# if singleton is requested and identified component is singleton
-		if (lifetime == "all" or lifetime == "any" or lifetime == "singleton") \
-			and self.__singleton_components__.has_key(type):
-			# gather all instances of specified type or types inheriting specified type
-			for component in self.__singleton_components__[type]:
-				components.append(component)
+		record = (status.st_size, status.st_mtime, sourceHash, moduleName, classes, aliases)
 
-		# if non-singleton is requested and specified identifier is known
-		if (lifetime == "all" or lifetime == "any" or lifetime != "singleton") \
-				and self.__plugin_specifications__.has_key(type):
-			# create and gather instances of specified type or types inheriting specified type
-			for specification in self.__plugin_specifications__[type]:
-				components.append(self.__create_instance__(specification))
+		self.__records__[filePath] = record
+		self.__changed__ = True
 
-		return components
+		return record
 
-	def get_component(self, identifier):
+	def scan(self, directories):
 		"""
-		Get component with specified identifier
+		Get (classes, imported names) pairs of the modules of directories by module name, and update the index.
 		"""
-		component = None
+		modules = {}
+		filePaths = set()
+
+		for directory in directories:
+			for moduleName, filePath, isPackage in __PluginDiscovery__.__module_files__(directory):
+				record = self.__record_of__(moduleName, filePath, isPackage)
+
+				filePaths.add(filePath)
+				modules[moduleName] = (record[4], record[5])
+
+		if self.__index_path__ is not None:
+			# records of the modules which were removed are dropped
+			for filePath in [filePath for filePath in self.__records__ if not filePath in filePaths]:
+				del self.__records__[filePath]
+				self.__changed__ = True
+
+			if self.__changed__:
+				self.__write_index__()
+
+		return modules
+
+	@staticmethod
+	def subclasses(modules, baseName, abstractMethods=None):
+		"""
+		Get sorted (module name, class name) pairs of the concrete classes of modules which derive from base class,
+		directly or through other classes of modules.
+
+		baseName: Qualified name of base class.
+		abstractMethods: Names of the abstract methods of base class. If None, they are taken from the modules if
+		they declare base class.
+		"""
+		classes = {}
+
+		for moduleName, (moduleClasses, aliases) in modules.iteritems():
+			for name, bases, abstract, attributes in moduleClasses:
+				classes[moduleName + "." + name] = (moduleName, name, bases, abstract, attributes)
+
+		def resolve(name):
+			# follow names imported by the modules, e.g. classes exported by packages
+			for step in xrange(len(modules) + 1):
+				if classes.has_key(name):
+					break
+
+				moduleName, separator, attribute = name.rpartition(".")
+				aliases = modules[moduleName][1] if modules.has_key(moduleName) else {}
+
+				if not aliases.has_key(attribute):
+					break
+
+				name = aliases[attribute]
+
+			return name
+
+		baseName = resolve(baseName)
+
+		if abstractMethods is None:
+			abstractMethods = classes[baseName][3] if classes.has_key(baseName) else ()
+
+		# abstract methods of the classes deriving from base class, None for other classes
+		derived = {baseName: frozenset(abstractMethods)}
+
+		def derive(name):
+			if derived.has_key(name):
+				return derived[name]
+
+			# guards against cyclic declarations
+			derived[name] = None
+
+			if not classes.has_key(name):
+				return None
+
+			moduleName, className, bases, abstract, attributes = classes[name]
+			inherited = [methods for methods in (derive(resolve(base)) for base in bases) if methods is not None]
+
+			if inherited:
+				derived[name] = frozenset().union(*inherited).difference(attributes).union(abstract)
+
+			return derived[name]
+
+		return sorted(classes[name][:2] for name in classes
+		              if name != baseName and not classes[name][1].startswith("_") and derive(name) == frozenset())
+
+	def __read_index__(self):
+		"""
+		Read records of the index, or return no record if there is no index or it is corrupt.
+		"""
+		if not os.path.exists(self.__index_path__):
+			return {}
+
+		file = open(self.__index_path__, "rb")
+
+		try:
+			magic, version = __PluginDiscovery__.__index_header__.unpack(
+				file.read(__PluginDiscovery__.__index_header__.size))
+
+			if magic != __PluginDiscovery__.__index_magic__ or version != __PluginDiscovery__.__index_version__:
+				return {}
+
+			records = marshal.loads(file.read())
+
+			return records if isinstance(records, dict) else {}
+		except (ValueError, EOFError, TypeError, struct.error):
+			# index is corrupt or written by another version of Python
+			return {}
+		finally:
+			file.close()
+
+	def __write_index__(self):
+		"""
+		Write records to the index. Failure to write the index is ignored.
+		"""
+		temporaryPath = self.__index_path__ + "." + str(os.getpid())
+
+		try:
+			file = open(temporaryPath, "wb")
+
+			try:
+				file.write(__PluginDiscovery__.__index_header__.pack(__PluginDiscovery__.__index_magic__,
+				                                                     __PluginDiscovery__.__index_version__))
+				file.write(marshal.dumps(self.__records__))
+			finally:
+				file.close()
+
+			# replace index atomically, so that concurrently starting processes never read a partial index
+			if os.name == "nt" and os.path.exists(self.__index_path__):
+				os.remove(self.__index_path__)
+
+			os.rename(temporaryPath, self.__index_path__)
+		except (IOError, OSError):
+			if os.path.exists(temporaryPath):
+				os.remove(temporaryPath)
+
+
+def __abc_cache_token__():
+	"""
+	Get token which changes whenever a virtual subclass is registered with any abstract base class.
+	"""
+	if hasattr(abc, "get_cache_token"):
+		return abc.get_cache_token()
+
+	return abc.ABCMeta._abc_invalidation_counter
+
+
+def __is_awaitable__(value):
+	return isinstance(value, asyncio.Future) or asyncio.iscoroutine(value) or hasattr(value, "__await__")
+
+
+def __ensure_future__(awaitable):
+	if hasattr(asyncio, "ensure_future"):
+		return asyncio.ensure_future(awaitable)
+
+	return getattr(asyncio, "async")(awaitable)
+
+
+def __completed_future__(result):
+	future = asyncio.Future()
+	future.set_result(result)
+
+	return future
+
+
+def __async_then__(awaitable, function):
+	"""
+	Get future of the result of function called with the result of awaitable. If function returns an awaitable,
+	the future completes with the result of that awaitable.
+	"""
+	result = asyncio.Future()
+
+	def forward(future):
+		if result.done():
+			return
+
+		if future.cancelled():
+			result.cancel()
+		elif future.exception() is not None:
+			result.set_exception(future.exception())
+		else:
+			result.set_result(future.result())
+
+	def complete(future):
+		if result.done():
+			return
+
+		if future.cancelled():
+			result.cancel()
+			return
+
+		if future.exception() is not None:
+			result.set_exception(future.exception())
+			return
+
+		try:
+			value = function(future.result())
+		except Exception as exception:
+			result.set_exception(exception)
+			return
+
+		if __is_awaitable__(value):
+			__ensure_future__(value).add_done_callback(forward)
+		else:
+			result.set_result(value)
+
+	__ensure_future__(awaitable).add_done_callback(complete)
+
+	return result
+
+
+class __DependencyGraph__(object):
+	"""
+	Graph of references between component declarations, made by init arguments of the form {componentName}.
+	"""
+
+	__format_string__ = string.Formatter().vformat
+
+	def __init__(self, declarations):
+		self.__dependencies__ = {}
+		self.__dependents__ = {}
+
+		for declaration in declarations:
+			self.__dependencies__[declaration.identifier()] = __DependencyGraph__.references(declaration.init_args())
+
+		for identifier, dependencies in self.__dependencies__.iteritems():
+			for dependency in dependencies:
+				self.__dependents__.setdefault(dependency, []).append(identifier)
+
+	@staticmethod
+	def references(initArgs, resources=False):
+		"""
+		Get tuple of identifiers of components, or of resources, referenced by init arguments.
+		"""
+		if isinstance(initArgs, (list, tuple)):
+			values = initArgs
+		elif isinstance(initArgs, dict):
+			values = initArgs.values()
+		else:
+			values = ()
+
+		references = []
+
+		for value in values:
+			# component is identified by the following format: {name}, resource by: {$name}
+			if isinstance(value, basestring) and value.startswith("{") and value.endswith("}") \
+					and value.startswith("{$") == resources:
+				# component referenced through a lazy proxy is identified by: {~name}
+				name = value[2:-1] if resources or value.startswith("{~") else value[1:-1]
+
+				if not name in references:
+					references.append(name)
+
+		return tuple(references)
+
+	def identifiers(self):
+		return self.__dependencies__.keys()
+
+	def dependencies(self, identifier):
+		"""
+		Get tuple of identifiers of components referenced by specified component.
+		"""
+		return self.__dependencies__.get(identifier, ())
+
+	def dependents(self, identifier):
+		"""
+		Get tuple of identifiers of components which reference specified component.
+		"""
+		return tuple(self.__dependents__.get(identifier, ()))
+
+	def topological_order(self, external=None):
+		"""
+		Get list of component identifiers in which every component follows the components it references.
+		Raises ComponentSpecificationError if a referenced component is not declared or references are circular.
+
+		external: Optional function telling whether a component which is not in the graph is declared elsewhere,
+		e.g. by a parent container.
+		"""
+		order = []
+		# identifiers being visited are mapped to False, visited identifiers to True
+		visited = {}
+
+		for root in sorted(self.__dependencies__.iterkeys()):
+			if visited.has_key(root):
+				continue
+
+			visited[root] = False
+			stack = [(root, iter(self.__dependencies__[root]))]
+
+			while stack:
+				identifier, dependencies = stack[-1]
+
+				for dependency in dependencies:
+					if not self.__dependencies__.has_key(dependency):
+						if external is not None and external(dependency):
+							continue
+
+						raise ComponentSpecificationError(self.__format_string__(
+							"Unable to find component '{dependency}' referenced by '{identifier}'", [],
+							{"dependency": dependency, "identifier": identifier}))
+
+					if not visited.has_key(dependency):
+						visited[dependency] = False
+						stack.append((dependency, iter(self.__dependencies__[dependency])))
+						break
+
+					if visited[dependency] is False:
+						path = [node for node, nodeDependencies in stack]
+						path = path[path.index(dependency):] + [dependency]
+
+						raise ComponentSpecificationError(self.__format_string__(
+							"Circular reference between components: {path}", [], {"path": " -> ".join(path)}))
+				else:
+					stack.pop()
+					visited[identifier] = True
+					order.append(identifier)
+
+		return order
+
+
+class __ModuleLoader__(object):
+	"""
+	Loader of plugin modules. Modules which have already been imported are reused from sys.modules, so that classes
+	declared in them are not duplicated. Module names can be dotted package paths.
+	"""
+
+	def __init__(self, instrumentation=None):
+		self.__modules__ = {}
+		self.__import_times__ = {}
+		self.__instrumentation__ = instrumentation
+
+	def load(self, moduleName):
+		"""
+		Get module with specified name, importing it if it has not been imported before.
+		"""
+		if self.__modules__.has_key(moduleName):
+			return self.__modules__[moduleName]
+
+		module = sys.modules.get(moduleName)
+
+		if module is None:
+			started = timeit.default_timer()
+			module = importlib.import_module(moduleName)
+			self.__import_times__[moduleName] = timeit.default_timer() - started
+
+			if self.__instrumentation__ is not None:
+				self.__instrumentation__.__record_import__(moduleName, self.__import_times__[moduleName])
+
+		self.__modules__[moduleName] = module
+
+		return module
+
+	def import_times(self):
+		"""
+		Get dictionary of the time, in seconds, spent importing each module imported by this loader.
+		"""
+		return dict(self.__import_times__)
+
+
+class __Specification__(object):
+	__slots__ = ("__identifier__", "__plugin_class__", "__init_args__", "__async_init__", "__plan__", "__instance__",
+	             "__lock__", "__future__", "__pool__", "__previous__")
+
+	def __init__(self, identifier, type, initArgs, asyncInit=None):
+		self.__identifier__ = identifier
+		self.__plugin_class__ = type
+		self.__init_args__ = initArgs
+		self.__async_init__ = asyncInit
+		self.__plan__ = None
+		self.__instance__ = None
+		self.__lock__ = None
+		self.__future__ = None
+		self.__pool__ = None
+		# specification of the previous configuration this specification was copied from
+		self.__previous__ = None
+
+	def copy(self):
+		"""
+		Get copy of specification for the container of a new configuration, which compiles its own plan. The copy
+		shares the lock, pool and instance of this specification, a singleton constructed later by either of them is
+		shared too.
+		"""
+		specification = __Specification__(self.__identifier__, self.__plugin_class__, self.__init_args__,
+		                                  self.__async_init__)
+		specification.__instance__ = self.__instance__
+		specification.__lock__ = self.__lock__
+		specification.__pool__ = self.__pool__
+		specification.__previous__ = self
+		# specifications of older configurations are not kept
+		self.__previous__ = None
+
+		return specification
+
+	def identifier(self):
+		return self.__identifier__
+
+	def type(self):
+		return self.__plugin_class__
+
+	def init_args(self):
+		return self.__init_args__
+
+	def async_init(self):
+		return self.__async_init__
+
+	def plan(self):
+		return self.__plan__
+
+	def set_plan(self, plan):
+		self.__plan__ = plan
+
+	def instance(self):
+		"""
+		Get instance of singleton specification, or None if it has not been constructed.
+		"""
+		return self.__instance__
+
+	def shared_instance(self):
+		"""
+		Get instance of singleton specification, or of the specification it was copied from, or None if neither has
+		been constructed.
+		"""
+		if self.__instance__ is None and self.__previous__ is not None:
+			return self.__previous__.__instance__
+
+		return self.__instance__
+
+	def set_instance(self, instance):
+		self.__instance__ = instance
+
+		# the instance is shared with the container of the previous configuration
+		if self.__previous__ is not None and self.__previous__.__instance__ is None:
+			self.__previous__.__instance__ = instance
+
+	def lock(self):
+		"""
+		Get lock which guards construction of singleton or cached specification.
+		"""
+		return self.__lock__
+
+	def set_lock(self, lock):
+		self.__lock__ = lock
+
+	def future(self):
+		"""
+		Get future of asynchronous construction of singleton specification which is in progress, if any.
+		"""
+		return self.__future__
+
+	def set_future(self, future):
+		self.__future__ = future
+
+	def pool(self):
+		"""
+		Get pool of instances of pooled specification.
+		"""
+		return self.__pool__
+
+	def set_pool(self, pool):
+		self.__pool__ = pool
+
+
+class __ConstructionPlan__(object):
+	"""
+	Construction plan of a component, compiled once from its specification.
+
+	Constant and resource arguments are substituted in the argument templates at compile time. Only references to
+	non singleton components are resolved on construction, by calling the providers bound to their positions.
+	"""
+	__slots__ = ("__plugin_class__", "__arguments__", "__keyword_arguments__", "__providers__",
+	             "__keyword_providers__", "construct", "create")
+
+	def __init__(self, type, arguments, keywordArguments, providers, keywordProviders):
+		"""
+		type: Component class.
+		arguments: Tuple of positional arguments with resolved constants.
+		keywordArguments: Dictionary of keyword arguments with resolved constants.
+		providers: Tuple of (index, provider) pairs for positional arguments resolved on construction.
+		keywordProviders: Tuple of (name, provider) pairs for keyword arguments resolved on construction.
+		"""
+		self.__plugin_class__ = type
+		self.__arguments__ = arguments
+		self.__keyword_arguments__ = keywordArguments
+		self.__providers__ = providers
+		self.__keyword_providers__ = keywordProviders
+
+		# choose the cheapest way of calling the constructor
+		if providers or keywordProviders:
+			self.construct = self.__create_with_providers__
+		elif arguments or keywordArguments:
+			self.construct = functools.partial(type, *arguments, **keywordArguments)
+		else:
+			self.construct = type
+
+		# components with asynchronous initializer replace create
+		self.create = self.construct
+
+	def type(self):
+		return self.__plugin_class__
+
+	def __create_with_providers__(self):
+		arguments, keywordArguments = self.arguments()
+
+		return self.__plugin_class__(*arguments, **keywordArguments)
+
+	def arguments(self):
+		"""
+		Get positional and keyword arguments of the constructor, resolving references to non singleton components.
+		"""
+		arguments = self.__arguments__
+
+		if self.__providers__:
+			arguments = list(arguments)
+
+			for index, provider in self.__providers__:
+				arguments[index] = provider()
+
+		keywordArguments = self.__keyword_arguments__
+
+		if self.__keyword_providers__:
+			keywordArguments = keywordArguments.copy()
+
+			for name, provider in self.__keyword_providers__:
+				keywordArguments[name] = provider()
+
+		return arguments, keywordArguments
+
+	def construct_many(self, count):
+		"""
+		Construct count instances. The argument templates are copied once for all instances, references to non
+		singleton components are still resolved for each instance.
+		"""
+		construct = self.construct
+
+		# instrumented and per graph plans wrap the constructor
+		if construct != self.__create_with_providers__:
+			return [construct() for index in xrange(count)]
+
+		type = self.__plugin_class__
+		providers = self.__providers__
+		keywordProviders = self.__keyword_providers__
+		# the constructor is called with copies of the arguments, so the same arguments are filled for each instance
+		arguments = list(self.__arguments__)
+		keywordArguments = self.__keyword_arguments__.copy()
+		instances = []
+
+		for index in xrange(count):
+			for position, provider in providers:
+				arguments[position] = provider()
+
+			for name, provider in keywordProviders:
+				keywordArguments[name] = provider()
+
+			instances.append(type(*arguments, **keywordArguments))
+
+		return instances
+
+
+class __DeferredReference__(object):
+	"""
+	Provider of a component referenced before its declaration was processed. The reference is bound to the
+	component's provider on first use.
+	"""
+	__slots__ = ("__manager__", "__component_name__", "__specification__", "__provider__")
+
+	def __init__(self, manager, componentName, specification):
+		self.__manager__ = manager
+		self.__component_name__ = componentName
+		self.__specification__ = specification
+		self.__provider__ = None
+
+	def __call__(self):
+		if self.__provider__ is None:
+			self.__provider__ = self.__manager__.__reference_provider__(self.__component_name__, self.__specification__)
+
+		return self.__provider__()
+
+
+class __ContainerCompiler__(object):
+	"""
+	Generator of the source of a Python module with a CompiledContainer subclass which resolves the components of
+	processed declarations.
+	"""
+
+	__format_string__ = string.Formatter().vformat
+	__identifier_characters__ = frozenset(string.ascii_letters + string.digits + "_")
+	# lifetimes which require the Manager to keep state of the components
+	__unsupported_lifetimes__ = frozenset(["pooled", "scoped", "per_graph", "cached", "per_process"])
+
+	def __init__(self, resources, className):
+		self.__resources__ = resources
+		self.__class_name__ = className
+		# names of modules and classes in the generated module
+		self.__module_names__ = {}
+		self.__class_names__ = {}
+		self.__imports__ = []
+		self.__bindings__ = []
+		self.__methods__ = {}
+
+	def __literal__(self, value, identifier):
+		"""
+		Get Python expression of a constant init argument, resource or metadata value.
+		"""
+		if value is None or isinstance(value, (bool, int, long, basestring)):
+			return repr(value)
+		elif isinstance(value, float) and value == value and value not in (float("inf"), float("-inf")):
+			return repr(value)
+		elif isinstance(value, list):
+			return "[" + ", ".join(self.__literal__(item, identifier) for item in value) + "]"
+		elif isinstance(value, tuple):
+			return "(" + "".join(self.__literal__(item, identifier) + ", " for item in value) + ")"
+		elif isinstance(value, dict):
+			return "{" + ", ".join(self.__literal__(key, identifier) + ": " + self.__literal__(item, identifier)
+			                       for key, item in value.iteritems()) + "}"
+
+		raise ComponentSpecificationError(self.__format_string__(
+			"Value of type '{type}' declared for component '{identifier}' can not be compiled", [],
+			{"type": value.__class__.__name__, "identifier": identifier}))
+
+	def __module_name__(self, module):
+		if not self.__module_names__.has_key(module):
+			name = "_module%d" % len(self.__module_names__)
+
+			self.__module_names__[module] = name
+			self.__imports__.append("import %s as %s" % (module, name))
+
+		return self.__module_names__[module]
+
+	def __type_name__(self, type):
+		"""
+		Get name of class in the generated module, or None if the class can not be imported by its module and name.
+		"""
+		if not self.__class_names__.has_key(type):
+			module = sys.modules.get(type.__module__)
+
+			if module is None or getattr(module, type.__name__, None) is not type:
+				# e.g. class defined in a function, components of such type are found by type when queried
+				return None
+
+			name = "_class%d" % len(self.__class_names__)
+
+			self.__class_names__[type] = name
+			self.__bindings__.append("%s = %s.%s" % (name, self.__module_name__(type.__module__), type.__name__))
+
+		return self.__class_names__[type]
+
+	def __argument__(self, value, identifier):
+		"""
+		Get Python expression of a declared init argument.
+		"""
+		if isinstance(value, basestring) and value.startswith("{") and value.endswith("}"):
+			if value.startswith("{$"):
+				if value == "{$None}":
+					return "None"
+
+				return self.__literal__(self.__resources__[value[2:-1]], identifier)
+			elif value.startswith("{~"):
+				return "Declare.LazyProxy(self.%s)" % self.__methods__[value[2:-1]]
+
+			return "self.%s()" % self.__methods__[value[1:-1]]
+
+		return self.__literal__(value, identifier)
+
+	def __items__(self, opening, items, closing, indentation="\t"):
+		"""
+		Get Python expression of a tuple or dictionary with one item on each line.
+		"""
+		if not items:
+			return opening + closing
+
+		return opening + "".join("\n" + indentation + "\t" + item + "," for item in items) + "\n" + indentation + \
+		       closing
+
+	def __construction__(self, declaration, type):
+		"""
+		Get Python expression constructing component of declaration.
+		"""
+		initArgs = declaration.init_args()
+		arguments = []
+
+		if isinstance(initArgs, tuple):
+			arguments = [self.__argument__(argument, declaration.identifier()) for argument in initArgs]
+		elif isinstance(initArgs, dict):
+			keywordArguments = {}
+
+			for name, argument in sorted(initArgs.iteritems()):
+				name = str(name)
+
+				# names which are not Python identifiers can only be passed in a dictionary
+				if name[:1].isdigit() or not self.__identifier_characters__.issuperset(name) \
+						or keyword.iskeyword(name):
+					keywordArguments[name] = argument
+				else:
+					arguments.append("%s=%s" % (name, self.__argument__(argument, declaration.identifier())))
+
+			if keywordArguments:
+				arguments.append("**{" + ", ".join("%r: %s" % (name, self.__argument__(argument,
+					declaration.identifier())) for name, argument in sorted(keywordArguments.iteritems())) + "}")
+
+		return "%s(%s)" % (self.__type_name__(type), ", ".join(arguments))
+
+	def compile(self, declarations, eager):
+		"""
+		Get source of module with container of declarations.
+
+		declarations: List of (declaration, class) pairs in order of registration. Declarations must be ordered
+		after the declarations they reference.
+		eager: Set of identifiers of singletons which are constructed when the container is created.
+		"""
+		for index, (declaration, type) in enumerate(declarations):
+			if declaration.async_init() is not None:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component '{identifier}' has an asynchronous initializer and can not be compiled", [],
+					{"identifier": declaration.identifier()}))
+
+			if declaration.lifetime() in self.__unsupported_lifetimes__:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component '{identifier}' has lifetime '{lifetime}' which can not be compiled", [],
+					{"identifier": declaration.identifier(), "lifetime": declaration.lifetime()}))
+
+			if self.__type_name__(type) is None:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Class of component '{identifier}' can not be imported by its module and name", [],
+					{"identifier": declaration.identifier()}))
+
+			if declaration.lifetime() == "singleton":
+				self.__methods__[declaration.identifier()] = "_singleton%d" % index
+			else:
+				self.__methods__[declaration.identifier()] = "_create%d" % index
+
+		# identifiers of singleton and non singleton components of each type, in order of registration
+		typeIndex = {}
+
+		for declaration, type in declarations:
+			for base in inspect.getmro(type):
+				if base is object or self.__type_name__(base) is None:
+					continue
+
+				identifiers = typeIndex.setdefault(self.__type_name__(base), ([], []))
+				identifiers[0 if declaration.lifetime() == "singleton" else 1].append(declaration.identifier())
+
+		lines = ["class %s(Declare.CompiledContainer):" % self.__class_name__, "",
+		         "\t__declarations__ = " + self.__items__("(", [self.__literal__(Configuration.__declaration_record__(
+			         declaration), declaration.identifier()) for declaration, type in declarations], ")"),
+		         "\t__classes__ = " + self.__items__("(", ["(%r, %s, %r)" % (declaration.identifier(),
+			         self.__type_name__(type), declaration.lifetime() == "singleton")
+			         for declaration, type in declarations], ")"),
+		         "\t__type_index__ = " + self.__items__("{", ["%s: (%s, %s)" % (name,
+			         self.__literal__(tuple(singletons), name), self.__literal__(tuple(components), name))
+			         for name, (singletons, components) in sorted(typeIndex.iteritems())], "}"),
+		         "\t__eager_singletons__ = " + self.__items__("(", ["%r" % declaration.identifier()
+			         for declaration, type in declarations if declaration.identifier() in eager], ")"), "",
+		         "\tdef __init__(self):"]
+
+		for index, (declaration, type) in enumerate(declarations):
+			if declaration.lifetime() == "singleton":
+				lines.append("\t\tself._instance%d = None" % index)
+
+		lines.extend(["\t\tDeclare.CompiledContainer.__init__(self)", "",
+		              "\tdef __compiled_factories__(self):",
+		              "\t\treturn " + self.__items__("{", ["%r: self.%s" % (declaration.identifier(),
+			              self.__methods__[declaration.identifier()]) for declaration, type in declarations], "}",
+			              "\t\t")])
+
+		for index, (declaration, type) in enumerate(declarations):
+			lines.append("")
+
+			if declaration.lifetime() == "singleton":
+				lines.extend(["\tdef _singleton%d(self):" % index,
+				              "\t\tinstance = self._instance%d" % index,
+				              "\t\tif instance is None:",
+				              "\t\t\twith self.__lock__:",
+				              "\t\t\t\tif self._instance%d is None:" % index,
+				              "\t\t\t\t\tself._instance%d = %s" % (index,
+				                                                  self.__construction__(declaration, type)),
+				              "\t\t\t\t\tself.__singletons__[%r] = self._instance%d" % (declaration.identifier(),
+				                                                                     index),
+				              "\t\t\t\tinstance = self._instance%d" % index,
+				              "\t\treturn instance"])
+			else:
+				lines.extend(["\tdef _create%d(self):" % index,
+				              "\t\treturn %s" % self.__construction__(declaration, type)])
+
+		return "\n".join(["# Container compiled by Declare from a Configuration, do not edit.", "",
+		                  "import Declare"] + self.__imports__ + [""] + self.__bindings__ + ["", ""] + lines) + "\n"
+
+
+class __Pool__(object):
+	"""
+	Pool of instances of a pooled component. Instances are constructed on demand, up to the maximum size of the
+	pool, and reused once they are released.
+	"""
+
+	__format_string__ = string.Formatter().vformat
+
+	def __init__(self, identifier, construct, options):
+		"""
+		identifier: Identifier of the pooled component.
+		construct: Function constructing an instance of the component.
+		options: Lifetime options of the declaration:
+		- min: Number of instances constructed when the pool is filled. Default is 0.
+		- max: Maximum number of instances. Default is None, for no maximum.
+		- reset: Name of a method of the component called when an instance is released. Optional.
+		- block: Whether acquire waits for an instance to be released when the pool is exhausted, otherwise it raises
+		ComponentError. Default is True.
+		- timeout: Maximum time, in seconds, acquire waits for an instance. Default is None, for no timeout.
+		"""
+		self.__identifier__ = identifier
+		self.__construct__ = construct
+		self.__minimum__ = options.get("min", 0)
+		self.__maximum__ = options.get("max")
+		self.__reset__ = options.get("reset")
+		self.__block__ = options.get("block", True)
+		self.__timeout__ = options.get("timeout")
+
+		if not isinstance(self.__minimum__, (int, long)) or self.__minimum__ < 0 \
+				or self.__maximum__ is not None and (not isinstance(self.__maximum__, (int, long))
+				                                     or self.__maximum__ < max(self.__minimum__, 1)):
+			raise ComponentSpecificationError(self.__format_string__(
+				"Component declaration '{identifier}' declares invalid pool size", [], {"identifier": identifier}))
+
+		if self.__timeout__ is not None and (not isinstance(self.__timeout__, (int, long, float))
+		                                     or self.__timeout__ < 0):
+			raise ComponentSpecificationError(self.__format_string__(
+				"Component declaration '{identifier}' declares invalid pool timeout, it must not be negative", [],
+				{"identifier": identifier}))
+
+		self.__condition__ = threading.Condition(threading.Lock())
+		self.__idle__ = []
+		# identities of the instances which are acquired
+		self.__acquired__ = set()
+		self.__size__ = 0
+		# whether the pool was filled to its minimum size, otherwise it is filled when it is first acquired
+		self.__filled__ = False
+
+		self.__acquisitions__ = 0
+		self.__hits__ = 0
+		self.__waits__ = 0
+		self.__wait_time__ = 0.0
+		self.__max_wait_time__ = 0.0
+
+	def set_construct(self, construct):
+		self.__construct__ = construct
+
+	def fill(self):
+		"""
+		Construct instances up to the minimum size of the pool.
+		"""
+		with self.__condition__:
+			self.__filled__ = True
+			count = max(self.__minimum__ - self.__size__, 0)
+			self.__size__ += count
+
+		instances = []
+
+		try:
+			for index in range(count):
+				instances.append(self.__construct__())
+		finally:
+			with self.__condition__:
+				self.__size__ -= count - len(instances)
+				self.__idle__.extend(instances)
+				self.__condition__.notify_all()
+
+	def __wait__(self):
+		"""
+		Wait for an instance to be released, with the lock held. Returns whether an instance can be acquired.
+		"""
+		started = timeit.default_timer()
+		deadline = started + self.__timeout__ if self.__timeout__ is not None else None
+
+		self.__waits__ += 1
+
+		try:
+			while not self.__idle__ and self.__size__ >= self.__maximum__:
+				if deadline is None:
+					self.__condition__.wait()
+				elif deadline > timeit.default_timer():
+					self.__condition__.wait(deadline - timeit.default_timer())
+				else:
+					return False
+
+			return True
+		finally:
+			waited = timeit.default_timer() - started
+
+			self.__wait_time__ += waited
+			self.__max_wait_time__ = max(self.__max_wait_time__, waited)
+
+	def acquire(self):
+		"""
+		Get an idle instance, or construct one if the pool is not full.
+		"""
+		if not self.__filled__:
+			self.fill()
+
+		with self.__condition__:
+			self.__acquisitions__ += 1
+
+			if not self.__idle__ and self.__maximum__ is not None and self.__size__ >= self.__maximum__:
+				if not self.__block__ or not self.__wait__():
+					raise ComponentError(self.__format_string__(
+						"Pool of component '{identifier}' is exhausted, all {size} instances are acquired", [],
+						{"identifier": self.__identifier__, "size": self.__size__}))
+
+			if self.__idle__:
+				self.__hits__ += 1
+				instance = self.__idle__.pop()
+				self.__acquired__.add(id(instance))
+
+				return instance
+
+			# the instance is constructed without holding the lock
+			self.__size__ += 1
+
+		try:
+			instance = self.__construct__()
+		except:
+			with self.__condition__:
+				self.__size__ -= 1
+				self.__condition__.notify()
+
+			raise
+
+		with self.__condition__:
+			self.__acquired__.add(id(instance))
+
+		return instance
+
+	def release(self, instance):
+		"""
+		Return acquired instance to the pool, after calling its reset method. An instance which fails to reset is
+		discarded.
+		"""
+		with self.__condition__:
+			if not id(instance) in self.__acquired__:
+				raise ComponentError(self.__format_string__(
+					"Instance was not acquired from the pool of component '{identifier}'", [],
+					{"identifier": self.__identifier__}))
+
+			self.__acquired__.discard(id(instance))
+
+		try:
+			if self.__reset__ is not None:
+				getattr(instance, self.__reset__)()
+		except:
+			with self.__condition__:
+				self.__size__ -= 1
+				self.__condition__.notify()
+
+			raise
+
+		with self.__condition__:
+			self.__idle__.append(instance)
+			self.__condition__.notify()
+
+	def drain(self):
+		"""
+		Remove idle instances from the pool. Returns removed instances.
+		"""
+		with self.__condition__:
+			idle = self.__idle__
+			self.__idle__ = []
+			self.__size__ -= len(idle)
+			self.__condition__.notify_all()
+
+		return idle
+
+	def stats(self):
+		"""
+		Get dictionary of the size of the pool and counters of acquisitions.
+		"""
+		with self.__condition__:
+			return {"size": self.__size__, "idle": len(self.__idle__), "acquisitions": self.__acquisitions__,
+			        "hits": self.__hits__,
+			        "hit_rate": float(self.__hits__) / self.__acquisitions__ if self.__acquisitions__ else 0.0,
+			        "waits": self.__waits__, "wait_time": self.__wait_time__, "max_wait_time": self.__max_wait_time__}
+
+
+class __Scope__(object):
+	"""
+	Scope in which each scoped component is constructed at most once. The instances are disposed, in reverse order
+	of construction, when the scope is exited. A scope can be entered by several threads, in which case it is exited
+	when the last of them exits it.
+	"""
+
+	def __init__(self, scopes):
+		"""
+		scopes: Thread local stacks of the scopes entered on each thread.
+		"""
+		self.__scopes__ = scopes
+		self.__instances__ = {}
+		self.__disposals__ = []
+		self.__lock__ = threading.RLock()
+		self.__entries__ = 0
+
+	def __enter__(self):
+		stack = getattr(self.__scopes__, "stack", None)
+
+		if stack is None:
+			stack = self.__scopes__.stack = []
+
+		with self.__lock__:
+			self.__entries__ += 1
+
+		stack.append(self)
+
+		return self
+
+	def __exit__(self, exceptionType, exception, traceback):
+		self.__scopes__.stack.remove(self)
+
+		with self.__lock__:
+			self.__entries__ -= 1
+
+			if self.__entries__ > 0:
+				return False
+
+		self.dispose()
+
+		return False
+
+	def instance(self, identifier, construct, dispose):
+		"""
+		Get instance of scoped component, constructing it on first use in the scope.
+
+		construct: Function constructing the component.
+		dispose: Function getting the name of the method of an instance called when the scope is exited, which is
+		None if the instance is not disposed.
+		"""
+		instance = self.__instances__.get(identifier)
+
+		if instance is None:
+			# reentrant, as the component can reference other scoped components
+			with self.__lock__:
+				instance = self.__instances__.get(identifier)
+
+				if instance is None:
+					instance = construct()
+
+					self.__instances__[identifier] = instance
+					self.__disposals__.append((instance, dispose(instance)))
+
+		return instance
+
+	def dispose(self):
+		"""
+		Dispose instances constructed in the scope, in reverse order of construction. All instances are disposed
+		even if disposing one of them raises an error, the first error is raised afterwards.
+		"""
+		with self.__lock__:
+			disposals = self.__disposals__
+			self.__instances__ = {}
+			self.__disposals__ = []
+
+		error = None
+
+		for instance, dispose in reversed(disposals):
+			if dispose is None:
+				continue
+
+			try:
+				getattr(instance, dispose)()
+			except:
+				if error is None:
+					error = sys.exc_info()
+
+		if error is not None:
+			raise error[0], error[1], error[2]
+
+
+class __Cache__(object):
+	"""
+	Cache of instances of cached components, shared by the containers of a Manager. An instance is reused until the
+	time to live of its declaration expires. An expired instance is still returned while it is replaced by a new
+	instance constructed in the background. The least recently used instances are evicted when the cache is full.
+	"""
+
+	__counters__ = ("hits", "stale_hits", "misses", "refreshes", "refresh_failures", "evictions")
+
+	def __init__(self, maxEntries=None):
+		"""
+		maxEntries: Maximum number of cached instances. Default is None, for no maximum.
+		"""
+		self.__max_entries__ = maxEntries
+		# entries of component identifiers, from the least to the most recently used, as lists of
+		# [specification, instance, expiry, refreshing]
+		self.__entries__ = collections.OrderedDict()
+		self.__statistics__ = {}
+		self.__lock__ = threading.Lock()
+
+	def __count__(self, identifier, counter):
+		"""
+		Increment counter of component, with the lock held.
+		"""
+		statistics = self.__statistics__.get(identifier)
+
+		if statistics is None:
+			statistics = self.__statistics__[identifier] = dict.fromkeys(__Cache__.__counters__, 0)
+
+		statistics[counter] += 1
+
+	def __lookup__(self, specification, stale):
+		"""
+		Get entry of specification which is still usable and mark it as most recently used, with the lock held.
+		"""
+		entry = self.__entries__.pop(specification.identifier(), None)
+
+		# entry of a changed declaration of the component is left from a previous configuration, specifications copied
+		# for the containers of later configurations share the lock
+		if entry is None or entry[0].lock() is not specification.lock():
+			return None
+
+		self.__entries__[specification.identifier()] = entry
+
+		if stale is not None and timeit.default_timer() >= entry[2] + stale:
+			return None
+
+		return entry
+
+	def __store__(self, specification, instance, ttl):
+		with self.__lock__:
+			self.__entries__.pop(specification.identifier(), None)
+			self.__entries__[specification.identifier()] = [specification, instance, timeit.default_timer() + ttl,
+			                                                 False]
+
+			while self.__max_entries__ is not None and len(self.__entries__) > self.__max_entries__:
+				self.__count__(self.__entries__.popitem(last=False)[0], "evictions")
+
+	def __refresh__(self, specification, ttl):
+		"""
+		Replace expired instance of specification.
+		"""
+		try:
+			instance = specification.plan().construct()
+		except Exception:
+			# the expired instance is used until a refresh succeeds
+			with self.__lock__:
+				self.__count__(specification.identifier(), "refresh_failures")
+				entry = self.__entries__.get(specification.identifier())
+
+				if entry is not None:
+					entry[3] = False
+
+			return
+
+		with self.__lock__:
+			self.__count__(specification.identifier(), "refreshes")
+
+		self.__store__(specification, instance, ttl)
+
+	def instance(self, specification, ttl, stale):
+		"""
+		Get cached instance of specification, constructing it if it is not cached.
+
+		ttl: Time, in seconds, an instance is used before it is refreshed.
+		stale: Time, in seconds, an expired instance is still used while it is refreshed, or None for no limit.
+		"""
+		with self.__lock__:
+			entry = self.__lookup__(specification, stale)
+
+			if entry is not None:
+				if timeit.default_timer() < entry[2]:
+					self.__count__(specification.identifier(), "hits")
+
+					return entry[1]
+
+				self.__count__(specification.identifier(), "stale_hits")
+				refresh = not entry[3]
+				entry[3] = True
+
+		if entry is not None:
+			if refresh:
+				thread = threading.Thread(target=self.__refresh__, args=(specification, ttl),
+				                          name="Refresh " + specification.identifier())
+				thread.daemon = True
+				thread.start()
+
+			return entry[1]
+
+		# concurrent misses construct a single instance
+		with specification.lock():
+			with self.__lock__:
+				entry = self.__lookup__(specification, stale)
+
+				if entry is not None:
+					self.__count__(specification.identifier(), "hits")
+
+					return entry[1]
+
+				self.__count__(specification.identifier(), "misses")
+
+			instance = specification.plan().construct()
+
+			self.__store__(specification, instance, ttl)
+
+		return instance
+
+	def clear(self):
+		"""
+		Evict all cached instances. Returns number of evicted instances.
+		"""
+		with self.__lock__:
+			count = len(self.__entries__)
+
+			for identifier in self.__entries__:
+				self.__count__(identifier, "evictions")
+
+			self.__entries__.clear()
+
+		return count
+
+	def remove(self, identifier):
+		"""
+		Evict instance of component, if it is cached. Returns evicted instance, or None.
+		"""
+		with self.__lock__:
+			entry = self.__entries__.pop(identifier, None)
+
+		return entry[1] if entry is not None else None
+
+	def stats(self):
+		"""
+		Get dictionary of the counters of each cached component, by component identifier.
+		"""
+		with self.__lock__:
+			statistics = {}
+
+			for identifier, counters in self.__statistics__.iteritems():
+				resolutions = counters["hits"] + counters["stale_hits"] + counters["misses"]
+
+				statistics[identifier] = dict(counters)
+				statistics[identifier]["hit_rate"] = float(resolutions - counters["misses"]) / resolutions \
+					if resolutions else 0.0
+				statistics[identifier]["cached"] = identifier in self.__entries__
+
+			return statistics
+
+
+class LazyProxy(object):
+	"""
+	Proxy of a component referenced as an init argument of the form {~componentName}. The component is resolved on
+	first use of the proxy, by any thread, and attribute accesses and operations are then forwarded to it.
+	"""
+	__slots__ = ("__provider__", "__target__", "__lock__")
+
+	def __init__(self, provider):
+		"""
+		provider: Function resolving the component.
+		"""
+		object.__setattr__(self, "__provider__", provider)
+		object.__setattr__(self, "__target__", None)
+		object.__setattr__(self, "__lock__", threading.Lock())
+
+	def __getattribute__(self, name):
+		# attributes of the proxy are read through the descriptors of its slots, all others are forwarded
+		target = __proxy_target__(self)
+
+		return getattr(target if target is not None else __resolve_proxy__(self), name)
+
+	def __setattr__(self, name, value):
+		setattr(__resolve_proxy__(self), name, value)
+
+	def __delattr__(self, name):
+		delattr(__resolve_proxy__(self), name)
+
+	def __call__(self, *arguments, **keywordArguments):
+		return __resolve_proxy__(self)(*arguments, **keywordArguments)
+
+	def __repr__(self):
+		return repr(__resolve_proxy__(self))
+
+	def __str__(self):
+		return str(__resolve_proxy__(self))
+
+	def __unicode__(self):
+		return unicode(__resolve_proxy__(self))
+
+	def __nonzero__(self):
+		return bool(__resolve_proxy__(self))
+
+	def __eq__(self, other):
+		return __resolve_proxy__(self) == other
+
+	def __ne__(self, other):
+		return __resolve_proxy__(self) != other
+
+	def __hash__(self):
+		return hash(__resolve_proxy__(self))
+
+	def __len__(self):
+		return len(__resolve_proxy__(self))
+
+	def __iter__(self):
+		return iter(__resolve_proxy__(self))
+
+	def __contains__(self, item):
+		return item in __resolve_proxy__(self)
+
+	def __getitem__(self, key):
+		return __resolve_proxy__(self)[key]
+
+	def __setitem__(self, key, value):
+		__resolve_proxy__(self)[key] = value
+
+	def __delitem__(self, key):
+		del __resolve_proxy__(self)[key]
+
+	def __enter__(self):
+		return __resolve_proxy__(self).__enter__()
+
+	def __exit__(self, exceptionType, exception, traceback):
+		return __resolve_proxy__(self).__exit__(exceptionType, exception, traceback)
+
+
+__proxy_provider__ = LazyProxy.__dict__["__provider__"].__get__
+__proxy_target__ = LazyProxy.__dict__["__target__"].__get__
+__proxy_lock__ = LazyProxy.__dict__["__lock__"].__get__
+
+
+def __resolve_proxy__(proxy):
+	"""
+	Get component of LazyProxy, resolving it on first use.
+	"""
+	target = __proxy_target__(proxy)
+
+	if target is None:
+		with __proxy_lock__(proxy):
+			target = __proxy_target__(proxy)
+
+			if target is None:
+				target = __proxy_provider__(proxy)()
+
+				object.__setattr__(proxy, "__target__", target)
+				object.__setattr__(proxy, "__provider__", None)
+
+	return target
+
+
+class __Container__(object):
+	"""
+	Registrations of the components of a Configuration and their resolution. Manager resolves components through a
+	container, which is replaced as a whole when the configuration is reloaded.
+	"""
+
+	__format_string__ = string.Formatter().vformat
+	# stack frames resolving a component takes, by lifetime, used to reject declarations nested deeper than the
+	# recursion limit allows. They are measured on Python 2.7, which takes more frames than Python 3. Resolving
+	# graph roots and components of lazy declarations takes further frames
+	__frames_per_resolution__ = {"": 2, "singleton": 7, "per_graph": 6, "scoped": 7, "cached": 6, "per_process": 6,
+	                             "pooled": 2}
+	__frames_per_graph_root__ = 4
+	__frames_per_lazy_resolution__ = 4
+	# stack frames left to the callers of the Manager
+	__reserved_frames__ = 100
+
+	def __is_reference_to_component__(self, value):
+		# component is identified by the following format: {name}
+		return value.startswith("{") and value.endswith("}")
+
+	def __is_reference_to_resource__(self, value):
+		# resource is identified by the following format: {$name}
+		return value.startswith("{$") and value.endswith("}")
+
+	def __reference_provider__(self, componentName, specification):
+		"""
+		Get provider of the component referenced as init argument of a specification.
+		"""
+		# if singleton with specified identifier exists
+		if self.__named_singleton_components__.has_key(componentName):
+			instance = self.__named_singleton_components__[componentName]
+
+			return lambda: instance
+		elif self.__named_singleton_specifications__.has_key(componentName):
+			# if singleton with specified identifier is yet to be constructed
+			return functools.partial(self.__singleton_instance__,
+			                         self.__named_singleton_specifications__[componentName])
+		elif self.__named_component_specifications__.has_key(componentName):
+			# if specification with specified identifier exists
+			return self.__named_component_specifications__[componentName].plan().create
+		elif self.__pending_declarations__.has_key(componentName):
+			# if declaration of the component is yet to be processed
+			self.__processPendingDeclaration__(componentName)
+
+			return self.__reference_provider__(componentName, specification)
+		elif self.__parent__ is not None and self.__configuration__[componentName] is None:
+			# if component is declared by a parent container
+			return self.__parent__.__reference_provider__(componentName, specification)
+		elif self.__configuration__[componentName] is not None:
+			# if lazy declaration was registered by another thread since it was looked up
+			return self.__reference_provider__(componentName, specification)
+		else:
+			raise ComponentSpecificationError(self.__format_string__(
+				"Unable to find component '{componentName}' as init argument for '{identifier}', "
+				"{specification.__plugin_class__.__module__}.{specification.__plugin_class__.__name__}.",
+				[], {"componentName": componentName, "identifier": specification.identifier(),
+				     "specification": specification}))
+
+	def __compile_init_argument__(self, value, specification):
+		"""
+		Compile declared init argument into either a constant or a provider.
+		Returns a tuple of (value, provider), provider is None if the argument is constant.
+		"""
+		# if resource value is string, it could be just a string or reference to either resource or component
+		if not isinstance(value, basestring):
+			return value, None
+
+		if self.__is_reference_to_resource__(value):
+
+			resourceName = value[2:-1]
+			# resources which are not declared by a child container are declared by its parents
+			resources = self.__resources_of__(resourceName)
+
+			if resourceName == "None":
+				# if resource value is {$None}
+				return None, None
+			if resources is not None:
+				# if resource with specified identifier exists (was declared)
+				return resources[resourceName], None
+			else:
+				# if specified resource not found
+				raise ComponentSpecificationError(self.__format_string__(
+					"Unable to find resource '{resourceName}' as init argument for '{identifier}', "
+					"{specification.__plugin_class__.__module__}.{specification.__plugin_class__.__name__}.",
+					[], {"resourceName": resourceName, "identifier": specification.identifier(),
+					     "specification": specification}))
+
+		elif self.__is_reference_to_component__(value):
+
+			componentName = value[1:-1]
+			# component referenced as {~name} is injected as a proxy which resolves it on first use
+			lazy = componentName.startswith("~")
+
+			if lazy:
+				componentName = componentName[1:]
+
+			# singletons which already exist are constants
+			declaration = self.__declaration__(componentName)
+
+			# asynchronous initializer of a non singleton can not be awaited before the referencing component is
+			# constructed
+			if declaration is not None and declaration.async_init() is not None \
+					and declaration.lifetime() != "singleton":
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component '{componentName}' has an asynchronous initializer and can only be referenced by "
+					"'{identifier}' if it is a singleton", [],
+					{"componentName": componentName, "identifier": specification.identifier()}))
+
+			# pooled instances must be released, which a referencing component can not do
+			if declaration is not None and declaration.lifetime() == "pooled":
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component '{componentName}' is pooled and can not be referenced by '{identifier}'", [],
+					{"componentName": componentName, "identifier": specification.identifier()}))
+
+			if self.__named_singleton_components__.has_key(componentName):
+				return self.__named_singleton_components__[componentName], None
+			elif self.__named_singleton_specifications__.has_key(componentName) \
+					or self.__named_component_specifications__.has_key(componentName):
+				provider = self.__reference_provider__(componentName, specification)
+			elif self.__parent__ is not None and self.__configuration__[componentName] is None:
+				# component of a parent container
+				owner = self.__owner__(componentName)
+
+				if owner is not None and owner.__named_singleton_components__.has_key(componentName):
+					return owner.__named_singleton_components__[componentName], None
+
+				provider = self.__parent__.__reference_provider__(componentName, specification)
+			else:
+				# bind reference to component which has not been processed yet on first use
+				provider = __DeferredReference__(self, componentName, specification)
+
+			return None, functools.partial(LazyProxy, provider) if lazy else provider
+
+		return value, None
+
+	def __compile_specification__(self, specification):
+		"""
+		Validate specification against the __init__ signature of its type and compile its construction plan.
+		"""
+		componentClass = specification.type()
+		initArgs = specification.init_args()
+
+		initFunction = getattr(componentClass, "__init__", None)
+
+		# signature of __init__ implemented in C (e.g. object.__init__) can not be inspected
+		if inspect.ismethod(initFunction) or inspect.isfunction(initFunction):
+			expectedArguments = inspect.getargspec(initFunction)
+		else:
+			expectedArguments = None
+
+		argumentsCount = len(initArgs) if initArgs is not None else 0
+
+		if expectedArguments is not None:
+			defaultsCount = len(expectedArguments.defaults) if expectedArguments.defaults is not None else 0
+			requiredArgumentsCount = len(expectedArguments.args) - (defaultsCount + 1)
+
+			# raise an error if the number of arguments declared in specification is less than the number of
+			# non optional arguments required by the __init__ function
+			if argumentsCount < requiredArgumentsCount:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component declaration '{identifier}' does not have enough init arguments", [],
+					{"identifier": specification.identifier()}))
+
+			if isinstance(initArgs, tuple) and expectedArguments.varargs is None \
+					and argumentsCount > len(expectedArguments.args) - 1:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component declaration '{identifier}' has too many init arguments", [],
+					{"identifier": specification.identifier()}))
+
+		# Compile declared arguments.
+		# Each declared argument can be evaluated to one of the following:
+		# - None, which is represented by "{$None}"
+		# - Resource, which is represented by "{$resourceIdentifier}"
+		# - Component, which is represented by "{componentDeclarationIdentifier}".
+		#   The identified component will be resolved by either referencing a singleton component or
+		#   creating a new instance of non singleton component
+		#   An error will be raised if the no declaration can be found the the specified identifier
+		# - Primitive types
+		arguments = []
+		keywordArguments = {}
+		providers = []
+		keywordProviders = []
+
+		# if arguments are declared as list
+		if isinstance(initArgs, tuple):
+			for index, argument in enumerate(initArgs):
+				value, provider = self.__compile_init_argument__(argument, specification)
+
+				arguments.append(value)
+
+				if provider is not None:
+					providers.append((index, provider))
+
+		elif isinstance(initArgs, dict):
+			# if arguments are declared as dictionary
+			for name, argument in initArgs.iteritems():
+
+				# if declared argument name is not in init argument list
+				if expectedArguments is not None and expectedArguments.keywords is None \
+						and not name in expectedArguments.args:
+					raise ComponentSpecificationError(self.__format_string__(
+						"Component declaration '{identifier}' declares unknown init argument '{name}'", [],
+						{"identifier": specification.identifier(), "name": name}))
+
+				value, provider = self.__compile_init_argument__(argument, specification)
+
+				if provider is not None:
+					keywordProviders.append((str(name), provider))
+				else:
+					keywordArguments[str(name)] = value
+
+		plan = __ConstructionPlan__(componentClass, tuple(arguments), keywordArguments, tuple(providers),
+		                            tuple(keywordProviders))
+
+		if self.__instrumentation__ is not None:
+			plan.construct = self.__instrumentation__.__instrument_plan__(specification.identifier(), plan)
+			plan.create = plan.construct
+
+		if specification.identifier() in self.__graph_roots__:
+			# per graph components are shared by the components of the graph of the outermost component resolved
+			plan.construct = functools.partial(self.__resolve_graph__, plan.construct)
+			plan.create = plan.construct
+
+		if specification.async_init() is not None:
+			plan.create = functools.partial(self.__asynchronous_only__, specification)
+
+		specification.set_plan(plan)
+
+		lifetime = self.__configuration__[specification.identifier()].lifetime()
+
+		if lifetime == "pooled":
+			self.__compile_pool__(specification)
+		elif lifetime == "scoped":
+			self.__compile_scoped__(specification)
+		elif lifetime == "per_graph":
+			self.__lifetime_options__(self.__configuration__[specification.identifier()], ())
+			plan.create = functools.partial(self.__graph_instance__, specification)
+		elif lifetime == "cached":
+			self.__compile_cached__(specification)
+		elif lifetime == "per_process":
+			self.__lifetime_options__(self.__configuration__[specification.identifier()], ("dispose",))
+			plan.create = functools.partial(self.__process_instance__, specification)
+
+		return specification
+
+	def __lifetime_options__(self, declaration, names):
+		"""
+		Get lifetime options of declaration, checking that they are among specified names.
+		"""
+		options = declaration.lifetime_options()
+
+		for name in options:
+			if not name in names:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component declaration '{identifier}' declares unknown {lifetime} lifetime option '{name}'", [],
+					{"identifier": declaration.identifier(), "lifetime": declaration.lifetime(), "name": name}))
+
+		if declaration.async_init() is not None:
+			raise ComponentSpecificationError(self.__format_string__(
+				"Component '{identifier}' is {lifetime} and can not have an asynchronous initializer", [],
+				{"identifier": declaration.identifier(), "lifetime": declaration.lifetime()}))
+
+		return options
+
+	def __asynchronous_only__(self, specification):
+		raise ComponentError(self.__format_string__(
+			"Component '{identifier}' has an asynchronous initializer and must be resolved with get_component_async",
+			[], {"identifier": specification.identifier()}))
+
+	def __compile_pool__(self, specification):
+		"""
+		Bind pool of pooled specification to its construction plan. The pool is created when the specification is
+		compiled for the first time and kept when the configuration is reloaded. It is filled to its minimum size when
+		the Manager is created, or else when it is first acquired.
+		"""
+		options = self.__lifetime_options__(self.__configuration__[specification.identifier()],
+		                                    ("min", "max", "reset", "block", "timeout", "dispose"))
+
+		plan = specification.plan()
+		plan.create = functools.partial(self.__pooled_only__, specification)
+
+		if specification.pool() is None:
+			specification.set_pool(__Pool__(specification.identifier(), plan.construct, options))
+
+			# the pool of a declaration processed once this container is complete, i.e. with the registry lock held,
+			# is filled by its first acquisition, as its instances can wait for declarations registered by other
+			# threads
+			if self.__pool_rebinds__ is not None:
+				specification.pool().fill()
+		elif self.__pool_rebinds__ is not None:
+			# the pool is shared with the container of the previous configuration until this container is complete
+			self.__pool_rebinds__.append((specification.pool(), plan.construct))
+		else:
+			specification.pool().set_construct(plan.construct)
+
+	def __pooled_only__(self, specification):
+		raise ComponentError(self.__format_string__(
+			"Component '{identifier}' is pooled and must be acquired with Manager.acquire", [],
+			{"identifier": specification.identifier()}))
+
+	def __compile_scoped__(self, specification):
+		"""
+		Bind scoped specification to the scope entered on the resolving thread.
+		"""
+		options = self.__lifetime_options__(self.__configuration__[specification.identifier()], ("dispose",))
+
+		specification.plan().create = functools.partial(self.__scoped_instance__, specification,
+		                                                functools.partial(__Container__.__dispose_method__, options))
+
+	@staticmethod
+	def __dispose_method__(options, instance):
+		"""
+		Get name of the method disposing instance of component with specified lifetime options, i.e. the method named
+		by the 'dispose' option, or else the close or dispose method of the instance, or None.
+		"""
+		if options.has_key("dispose"):
+			return options["dispose"]
+
+		return next((name for name in ("close", "dispose") if callable(getattr(instance, name, None))), None)
+
+	def __scoped_instance__(self, specification, dispose):
+		"""
+		Get instance of scoped specification in the innermost scope entered on the current thread.
+		"""
+		stack = getattr(self.__scopes__, "stack", None)
+
+		if not stack:
+			raise ComponentError(self.__format_string__(
+				"Component '{identifier}' is scoped and must be resolved inside Manager.scope", [],
+				{"identifier": specification.identifier()}))
+
+		return stack[-1].instance(specification.identifier(), specification.plan().construct, dispose)
+
+	def __compile_cached__(self, specification):
+		"""
+		Bind cached specification to the cache of the Manager.
+		"""
+		options = self.__lifetime_options__(self.__configuration__[specification.identifier()],
+		                                    ("ttl", "stale", "dispose"))
+		ttl = options.get("ttl")
+		stale = options.get("stale")
+
+		if not isinstance(ttl, (int, long, float)) or ttl <= 0 \
+				or stale is not None and (not isinstance(stale, (int, long, float)) or stale < 0):
+			raise ComponentSpecificationError(self.__format_string__(
+				"Component declaration '{identifier}' declares invalid cache times, ttl must be positive and stale "
+				"must not be negative", [], {"identifier": specification.identifier()}))
+
+		if specification.lock() is None:
+			specification.set_lock(threading.Lock())
+
+		specification.plan().create = functools.partial(self.__cache__.instance, specification, ttl, stale)
+
+	def __process_instance__(self, specification):
+		"""
+		Get instance of per process specification in the current process, constructing it on first use in the
+		process, e.g. in a process forked after the instance of its parent was constructed.
+		"""
+		entry = self.__process_instances__.get(specification.identifier())
+		processId = os.getpid()
+
+		if entry is not None and entry[0] == processId:
+			return entry[1]
+
+		# locks of the parent process could have been held by threads which do not exist in a forked process
+		with self.__process_locks__.setdefault(processId, threading.RLock()):
+			entry = self.__process_instances__.get(specification.identifier())
+
+			if entry is None or entry[0] != processId:
+				entry = (processId, specification.plan().construct())
+
+				self.__process_instances__[specification.identifier()] = entry
+
+		return entry[1]
+
+	def __resolve_graph__(self, construct):
+		"""
+		Construct component, sharing per graph components among its references unless it is itself referenced by a
+		component of a graph being resolved.
+		"""
+		if getattr(self.__resolution__, "graph", None) is not None:
+			return construct()
+
+		self.__resolution__.graph = {}
+
+		try:
+			return construct()
+		finally:
+			self.__resolution__.graph = None
+
+	def __graph_instance__(self, specification):
+		"""
+		Get instance of per graph specification in the graph being resolved on the current thread.
+		"""
+		graph = getattr(self.__resolution__, "graph", None)
+
+		if graph is None:
+			# resolved directly rather than referenced
+			return specification.plan().construct()
+
+		instance = graph.get(specification.identifier())
+
+		if instance is None:
+			instance = graph[specification.identifier()] = specification.plan().construct()
+
+		return instance
+
+	def __create_instance__(self, specification):
+		"""
+		Create instance of a type based on a specification.
+		:rtype: object
+		"""
+		return specification.plan().create()
+
+	def __singleton_instance__(self, specification):
+		"""
+		Get instance of a singleton specification, constructing it on first use.
+		"""
+		instance = specification.instance()
+
+		if instance is None:
+			# construction is guarded by a lock per singleton, which is only acquired until the instance exists
+			with specification.lock():
+				instance = specification.shared_instance()
+
+				if instance is None:
+					instance = self.__create_instance__(specification)
+
+				specification.set_instance(instance)
+				self.__named_singleton_components__[specification.identifier()] = instance
+
+		return instance
+
+	def __registerSingleton__(self, pluginClass, specification):
+		# register singleton specification for its class and every base class in its method resolution order
+		for type in inspect.getmro(pluginClass):
+			if type == object:
+				continue
+
+			# get list (object) of singleton specifications for 'type'
+			if self.__singleton_components__.has_key(type):
+				specifications = self.__singleton_components__[type]
+			else:
+				specifications = []
+				self.__singleton_components__[type] = specifications
+
+			specifications.append(specification)
+
+		self.__singleton_specifications__.append(specification)
+
+		# results of type queries are no longer valid
+		self.__type_cache__ = {}
+
+	def __registerSpecification__(self, pluginClass, specification):
+		# register specification for its class and every base class in its method resolution order
+		for type in inspect.getmro(pluginClass):
+			if type == object:
+				continue
+
+			# get list (object) of specifications for 'type'
+			if self.__plugin_specifications__.has_key(type):
+				specifications = self.__plugin_specifications__[type]
+			else:
+				specifications = []
+				self.__plugin_specifications__[type] = specifications
+
+			specifications.append(specification)
+
+		self.__component_specifications__.append(specification)
+
+		# results of type queries are no longer valid
+		self.__type_cache__ = {}
+
+	def __specifications_of_type__(self, index, specifications, type):
+		"""
+		Get tuple of specifications, from index or list of registered specifications, of components which are
+		instances of specified type.
+		"""
+		# virtual subclasses of abstract base classes are not in the method resolution order of their classes
+		if isinstance(type, abc.ABCMeta):
+			return tuple(specification for specification in specifications if issubclass(specification.type(), type))
+
+		return tuple(index.get(type, ()))
+
+	def __components_of_type__(self, type, singleton, nonSingleton, ordered=False):
+		"""
+		Get tuples of singleton and non singleton specifications of components which are instances of specified
+		type, optionally ordered by identifier. Results are cached until registrations change.
+		"""
+		key = (type, singleton, nonSingleton, ordered)
+		cacheToken = __abc_cache_token__()
+		# results are stored in the cache they were computed for, which is replaced when registrations change
+		typeCache = self.__type_cache__
+		components = typeCache.get(key)
+
+		if components is None or components[0] != cacheToken:
+			singletons = self.__specifications_of_type__(self.__singleton_components__,
+				self.__singleton_specifications__, type) if singleton else ()
+			specifications = self.__specifications_of_type__(self.__plugin_specifications__,
+				self.__component_specifications__, type) if nonSingleton else ()
+
+			if ordered:
+				singletons = tuple(sorted(singletons, key=__Specification__.identifier))
+				specifications = tuple(sorted(specifications, key=__Specification__.identifier))
+
+			components = (cacheToken, singletons, specifications)
+
+			typeCache[key] = components
+
+		return components
+
+	def __processSingletonDeclaration__(self, declaration, pluginClass):
+		"""
+		Register singleton specification, the instance of the component is created on first use or at startup
+		"""
+		specification = self.__compile_specification__(__Specification__(declaration.identifier(), pluginClass,
+		                                                                  declaration.init_args(),
+		                                                                  declaration.async_init()))
+		specification.set_lock(threading.RLock())
+
+		self.__named_singleton_specifications__[declaration.identifier()] = specification
+		self.__registerSingleton__(pluginClass, specification)
+
+	def __processNonSingletonDeclaration__(self, declaration, pluginClass):
+		"""
+		Create and register component specification for future instantiation
+		"""
+		specification = self.__compile_specification__(__Specification__(declaration.identifier(), pluginClass,
+		                                                                  declaration.init_args(),
+		                                                                  declaration.async_init()))
+		self.__named_component_specifications__[declaration.identifier()] = specification
+
+		self.__registerSpecification__(pluginClass, specification)
+
+	def __processDeclaration__(self, declaration):
+		"""
+		Create specification or component instance based on declaration
+		"""
+		started = timeit.default_timer() if self.__instrumentation__ is not None else None
+
+		pluginModule = self.__module_loader__.load(declaration.module_name())
+
+		# check that module has attribute with name equals to declared class name
+		if not hasattr(pluginModule, declaration.class_name()):
+			raise ComponentError(
+				self.__format_string__("Unable to find class '{class}' in modules '{module}' for plugin: '{plugin}'",
+					[], {"class": declaration.class_name(), "module": declaration.module_name(),
+					     "plugin": declaration.identifier()}))
+
+		componentClass = getattr(pluginModule, declaration.class_name())
+
+		self.__descriptors__[declaration.identifier()].set_type(componentClass)
+
+		# check that the identified module attribute is a class
+		if not isinstance(componentClass, (type, types.ClassType)):
+			raise ComponentError(
+				self.__format_string__("'{class}' is not a class in modules '{module}' for plugin: '{plugin}'", [],
+				{"class": declaration.class_name(), "module": declaration.module_name(),
+					"plugin": declaration.identifier()}))
+
+		if declaration.lifetime() == "singleton":
+			self.__processSingletonDeclaration__(declaration, componentClass)
+		else:
+			self.__processNonSingletonDeclaration__(declaration, componentClass)
+
+		if started is not None:
+			self.__instrumentation__.__record_processing__(declaration.identifier(),
+				self.__dependency_graph__.dependencies(declaration.identifier()), timeit.default_timer() - started)
+
+	def __is_lazy__(self, declaration):
+		return declaration.lazy() if declaration.lazy() is not None else self.__lazy__
+
+	def __processPendingDeclaration__(self, identifier):
+		"""
+		Process lazy declaration which is resolved for the first time
+		"""
+		with self.__registry_lock__:
+			# declaration could have been processed by another thread
+			if not self.__pending_declarations__.has_key(identifier):
+				return
+
+			self.__processDeclaration__(self.__pending_declarations__[identifier])
+
+			# declaration is only removed once it is registered, so that it is always either pending or registered
+			del self.__pending_declarations__[identifier]
+
+	def __processPendingDeclarations__(self):
+		"""
+		Process all lazy declarations, e.g. when components are queried by type
+		"""
+		with self.__registry_lock__:
+			for identifier in self.__pending_declarations__.keys():
+				self.__processPendingDeclaration__(identifier)
+
+	def __constructSingleton__(self, specification, completed):
+		"""
+		Construct singleton on a startup worker and report its completion
+		"""
+		try:
+			self.__singleton_instance__(specification)
+			completed.put((specification.identifier(), None))
+		except:
+			completed.put((specification.identifier(), sys.exc_info()))
+
+	def __constructSingletons__(self, order, workers):
+		"""
+		Construct eager singletons in topological order of the dependency graph. With more than one worker,
+		singletons which do not depend on each other are constructed concurrently on a pool of threads.
+		"""
+		singletons = {}
+
+		for identifier in order:
+			if self.__named_singleton_specifications__.has_key(identifier) \
+					and not self.__pending_declarations__.has_key(identifier):
+				# singletons which require asynchronous initialization are constructed by initialize_async
+				if identifier in self.__asynchronous__:
+					self.__asynchronous_singletons__.append(self.__named_singleton_specifications__[identifier])
+				else:
+					singletons[identifier] = self.__named_singleton_specifications__[identifier]
+
+		if workers <= 1:
+			for identifier in order:
+				if singletons.has_key(identifier):
+					self.__singleton_instance__(singletons[identifier])
+
+			return
+
+		# number of not yet constructed components referenced by each component, components of parent containers
+		# are constructed by them
+		remaining = dict((identifier, len([dependency for dependency in self.__dependency_graph__.dependencies(
+			identifier) if self.__configuration__[dependency] is not None])) for identifier in order)
+		ready = [identifier for identifier in order if remaining[identifier] == 0]
+		completed = Queue.Queue()
+		running = 0
+		error = None
+
+		pool = ThreadPool(workers)
+
+		try:
+			while ready or running:
+				while ready and error is None:
+					identifier = ready.pop(0)
+
+					if singletons.has_key(identifier):
+						pool.apply_async(self.__constructSingleton__, (singletons[identifier], completed))
+						running += 1
+					else:
+						# nothing to construct at startup for non singleton and lazy components
+						completed.put((identifier, None))
+						running += 1
+
+				if not running:
+					break
+
+				identifier, exceptionInfo = completed.get()
+				running -= 1
+
+				if exceptionInfo is not None:
+					error = error or exceptionInfo
+				elif error is None:
+					for dependent in self.__dependency_graph__.dependents(identifier):
+						remaining[dependent] -= 1
+
+						if remaining[dependent] == 0:
+							ready.append(dependent)
+		finally:
+			pool.close()
+			pool.join()
+
+		if error is not None:
+			raise error[0], error[1], error[2]
+
+	def __init__(self, configuration, lazy, workers, moduleLoader, instrumentation=None, scopes=None, cache=None,
+	             previous=None, parent=None):
+		"""
+		Register and process the declarations of configuration.
+
+		moduleLoader: Loader of plugin modules, shared by the containers of a Manager.
+		instrumentation: Optional Instrumentation recording the resolution of components.
+		scopes: Thread local stacks of the scopes entered on each thread, shared by the containers of a Manager.
+		cache: Cache of instances of cached components, shared by the containers of a Manager.
+		previous: Optional container of the previous configuration of the Manager. Specifications and singletons of
+		declarations which did not change, and do not reference components which changed, are taken over from it.
+		parent: Optional parent container, which resolves the components and resources the configuration does not
+		declare. The configuration of a child container is made by the __overlay__ function of its parent.
+		"""
+		self.__configuration__ = configuration
+		self.__parent__ = parent
+		self.__lazy__ = lazy
+		self.__module_loader__ = moduleLoader
+		self.__instrumentation__ = instrumentation
+		self.__scopes__ = scopes if scopes is not None else threading.local()
+		self.__cache__ = cache if cache is not None else __Cache__()
+		# per graph instances of the graph being resolved on each thread
+		self.__resolution__ = threading.local()
+		# instances of per process components, as (process id, instance) pairs by identifier
+		self.__process_instances__ = {}
+		# locks guarding construction of per process components, by process id
+		self.__process_locks__ = {}
+		self.__pending_declarations__ = {}
+		# guards registration of lazy declarations, components are resolved without locking
+		self.__registry_lock__ = threading.RLock()
+		# pools taken over from the previous configuration, with the constructors of this container
+		self.__pool_rebinds__ = []
+
+		self.__singleton_components__ = {}
+		self.__singleton_specifications__ = []
+		self.__named_singleton_specifications__ = {}
+		self.__named_singleton_components__ = {}
+
+		self.__plugin_specifications__ = {}
+		self.__component_specifications__ = []
+		self.__named_component_specifications__ = {}
+
+		self.__type_cache__ = {}
+
+		self.__descriptors__ = {}
+		self.__tagged_descriptors__ = {}
+
+		# indexes of the declarations, which are built when a child container is created
+		self.__depths__ = None
+		self.__resource_users__ = None
+
+		# resolution is only counted when instrumented, so that get_component is not slowed down otherwise
+		if instrumentation is not None:
+			self.get_component = self.__instrumented_get_component__
+
+		for declaration in configuration.plugins():
+			self.__registerDescriptor__(declaration)
+
+		# declarations are processed after the declarations they reference
+		self.__dependency_graph__ = __DependencyGraph__(configuration.plugins())
+
+		if parent is not None:
+			order = self.__dependency_graph__.topological_order(
+				lambda identifier: parent.__declaration__(identifier) is not None)
+			# components of parent containers referenced by the declarations of the child container
+			external = set(dependency for identifier in order
+			               for dependency in self.__dependency_graph__.dependencies(identifier)
+			               if configuration[dependency] is None)
+		else:
+			order = self.__dependency_graph__.topological_order()
+			external = ()
+
+		# identifiers of components with asynchronous initializer or referencing one, directly or indirectly
+		self.__asynchronous__ = set(dependency for dependency in external
+		                            if dependency in parent.__owner__(dependency).__asynchronous__)
+		self.__asynchronous_singletons__ = []
+
+		for identifier in order:
+			if configuration[identifier].async_init() is not None or any(dependency in self.__asynchronous__
+					for dependency in self.__dependency_graph__.dependencies(identifier)):
+				self.__asynchronous__.add(identifier)
+
+		# instances of scoped components must not be kept after the scope is exited, and instances of per process
+		# components must not be shared by the processes forked after they were constructed
+		self.__captive__ = {}
+		self.__check_captive_references__(order, external, "scoped", ("singleton", "pooled", "cached", "per_process"))
+		self.__check_captive_references__(order, external, "per_process", ("singleton", "pooled", "cached"))
+
+		# pooled components are only acquired from their pools and scoped components only resolved within a scope,
+		# so that queries of components by type leave them out
+		self.__pooled__ = frozenset(identifier for identifier in order
+		                            if configuration[identifier].lifetime() == "pooled")
+		self.__pooled_or_scoped__ = self.__pooled__.union(identifier for identifier in order
+		                                                  if configuration[identifier].lifetime() == "scoped")
+
+		# identifiers of per graph components and of components referencing one through non singleton components,
+		# which share the per graph components of the graph they resolve
+		self.__graph_roots__ = set(dependency for dependency in external
+		                           if dependency in parent.__owner__(dependency).__graph_roots__)
+
+		for identifier in order:
+			if configuration[identifier].lifetime() == "per_graph" or any(dependency in self.__graph_roots__
+					and self.__declaration__(dependency).lifetime() != "singleton"
+					for dependency in self.__dependency_graph__.dependencies(identifier)):
+				self.__graph_roots__.add(identifier)
+
+		# the depths of a child container are kept, as they are few, for its own child containers
+		depths = self.__compute_depths__(order, dict((dependency, parent.__owner__(dependency).__depth__(dependency))
+		                                             for dependency in external))
+
+		if parent is not None:
+			self.__depths__ = depths
+
+		# identifiers of declarations which are added, changed or reference such declarations
+		self.__changed__ = self.__changed_declarations__(previous, order) if previous is not None else set(order)
+
+		if previous is not None:
+			for identifier, entry in previous.__process_instances__.iteritems():
+				if configuration[identifier] is not None and not identifier in self.__changed__:
+					self.__process_instances__[identifier] = entry
+
+		for identifier in order:
+			declaration = configuration[identifier]
+
+			if not identifier in self.__changed__ and previous.__processed_specification__(identifier) is not None:
+				self.__reuseDeclaration__(declaration, previous.__processed_specification__(identifier))
+			elif self.__is_lazy__(declaration):
+				# the module of a lazy declaration is imported when the declaration is resolved for the first time
+				self.__pending_declarations__[declaration.identifier()] = declaration
+			else:
+				self.__processDeclaration__(declaration)
+
+		self.__constructSingletons__(order, workers)
+
+		for pool, construct in self.__pool_rebinds__:
+			pool.set_construct(construct)
+
+		self.__pool_rebinds__ = None
+
+	def __compute_depths__(self, order, depths):
+		"""
+		Get dictionary of the number of stack frames resolving each component takes, along its longest chain of
+		references which are resolved recursively. Raises ComponentSpecificationError if a chain takes more frames
+		than the recursion limit allows.
+
+		depths: Dictionary of the depths of the components of parent containers referenced by the components.
+		"""
+		maxDepth = sys.getrecursionlimit() - __Container__.__reserved_frames__
+
+		def frames(identifier):
+			declaration = self.__configuration__[identifier]
+			count = __Container__.__frames_per_resolution__.get(declaration.lifetime(), 2)
+
+			if identifier in self.__graph_roots__:
+				count += __Container__.__frames_per_graph_root__
+
+			if self.__is_lazy__(declaration):
+				count += __Container__.__frames_per_lazy_resolution__
+
+			return count
+
+		def depth(dependency):
+			# eager singletons are constructed in dependency order, so that resolving a reference to one does not
+			# construct the components it references
+			container = self.__owner__(dependency)
+			declaration = container.__configuration__[dependency]
+
+			if declaration.lifetime() == "singleton" and not container.__is_lazy__(declaration):
+				return 0
+
+			return depths[dependency]
+
+		for identifier in order:
+			dependencies = self.__dependency_graph__.dependencies(identifier)
+
+			depths[identifier] = frames(identifier) + max([depth(dependency) for dependency in dependencies] or [0])
+
+			if depths[identifier] > maxDepth:
+				path = [identifier]
+
+				while dependencies and max(depth(dependency) for dependency in dependencies):
+					path.append(max(dependencies, key=depth))
+					dependencies = self.__dependency_graph__.dependencies(path[-1])
+
+				raise ComponentSpecificationError(self.__format_string__(
+					"References from component '{identifier}' are nested {levels} levels deep, which take about "
+					"{depth} stack frames to resolve, more than the {maxDepth} frames allowed by the recursion limit: "
+					"{path}", [],
+					{"identifier": identifier, "levels": len(path), "depth": depths[identifier], "maxDepth": maxDepth,
+					 "path": " -> ".join(path)}))
+
+		return depths
+
+	def __check_captive_references__(self, order, external, lifetime, holders):
+		"""
+		Check that components of a lifetime are not referenced, directly or through other non singleton components,
+		by components of the lifetimes in holders, which would keep the instances longer than their lifetime.
+
+		external: Identifiers of the components of parent containers referenced by the components.
+		"""
+		# identifiers of components of the lifetime and of the other components referencing one
+		bound = self.__captive__[lifetime] = set(
+			dependency for dependency in external
+			if dependency in self.__parent__.__owner__(dependency).__captive__[lifetime])
+
+		for identifier in order:
+			declaration = self.__configuration__[identifier]
+			references = [dependency for dependency in self.__dependency_graph__.dependencies(identifier)
+			              if dependency in bound]
+
+			if declaration.lifetime() == lifetime or references and not declaration.lifetime() in holders:
+				bound.add(identifier)
+			elif references:
+				raise ComponentSpecificationError(self.__format_string__(
+					"Component '{identifier}' is {holder} and can not reference component '{componentName}', which is "
+					"or references a {lifetime} component", [],
+					{"identifier": identifier, "holder": declaration.lifetime(), "lifetime": lifetime,
+					 "componentName": references[0]}))
+
+	def __owner__(self, identifier):
+		"""
+		Get container declaring component, i.e. this container or the nearest parent container declaring it, or None
+		if the component is not declared.
+		"""
+		container = self
+
+		while container is not None and container.__configuration__[identifier] is None:
+			container = container.__parent__
+
+		return container
+
+	def __declaration__(self, identifier):
+		"""
+		Get declaration of component in this container or in the nearest parent container declaring it.
+		"""
+		container = self.__owner__(identifier)
+
+		return container.__configuration__[identifier] if container is not None else None
+
+	def __resources_of__(self, name):
+		"""
+		Get dictionary of resources which declares resource, of this container or of the nearest parent container
+		declaring it, or None if the resource is not declared.
+		"""
+		container = self
+
+		while container is not None and not container.__configuration__.resources().has_key(name):
+			container = container.__parent__
+
+		return container.__configuration__.resources() if container is not None else None
+
+	def __depth__(self, identifier):
+		"""
+		Get length of the longest chain of references from component declared by this container.
+		"""
+		if self.__depths__ is None:
+			self.__depths__ = self.__compute_depths__(self.__dependency_graph__.topological_order(), {})
+
+		return self.__depths__[identifier]
+
+	def __dependents__(self, identifier):
+		"""
+		Get identifiers of the components of this container, or of its parents, which reference component.
+		"""
+		dependents = []
+		container = self
+
+		while container is not None:
+			dependents.extend(dependent for dependent in container.__dependency_graph__.dependents(identifier)
+			                  if self.__owner__(dependent) is container)
+			container = container.__parent__
+
+		return dependents
+
+	def __users_of_resource__(self, name):
+		"""
+		Get identifiers of the components of this container, or of its parents, which reference resource.
+		"""
+		users = []
+		container = self
+
+		while container is not None:
+			if container.__resource_users__ is None:
+				resourceUsers = {}
+
+				for declaration in container.__configuration__.plugins():
+					for resource in __DependencyGraph__.references(declaration.init_args(), True):
+						resourceUsers.setdefault(resource, []).append(declaration.identifier())
+
+				container.__resource_users__ = resourceUsers
+
+			users.extend(user for user in container.__resource_users__.get(name, ())
+			             if self.__owner__(user) is container)
+			container = container.__parent__
+
+		return users
+
+	def __overlay__(self, overrides):
+		"""
+		Get Configuration of a child container of this container. It declares the resources and declarations of
+		overrides, and the declarations of this container, or of its parents, which reference the overridden
+		declarations, or resources which are overridden with different values, directly or indirectly. The other
+		components are resolved by this container.
+		"""
+		undeclared = object()
+		pending = [declaration.identifier() for declaration in overrides.plugins()]
+
+		for name, value in overrides.resources().iteritems():
+			resources = self.__resources_of__(name)
+
+			if resources is None or resources.get(name, undeclared) != value:
+				pending.extend(self.__users_of_resource__(name))
+
+		affected = set()
+
+		while pending:
+			identifier = pending.pop()
+
+			if not identifier in affected:
+				affected.add(identifier)
+				pending.extend(self.__dependents__(identifier))
+
+		declarations = list(overrides.plugins())
+		declarations.extend(self.__declaration__(identifier) for identifier in affected
+		                    if overrides[identifier] is None)
+
+		return Configuration(overrides.resources(), declarations)
+
+	def __changed_declarations__(self, previous, order):
+		"""
+		Get set of identifiers of declarations which are not declared with the same arguments in the previous
+		configuration, or reference resources with different values, and of the declarations referencing them.
+		"""
+		previousResources = previous.__configuration__.resources()
+		resources = self.__configuration__.resources()
+		undeclared = object()
+		changedResources = set(name for name in set(previousResources.keys()) | set(resources.keys())
+		                       if previousResources.get(name, undeclared) != resources.get(name, undeclared))
+
+		changed = set()
+
+		for identifier in order:
+			declaration = self.__configuration__[identifier]
+			previousDeclaration = previous.__configuration__[identifier]
+
+			if previousDeclaration is None or Configuration.__declaration_record__(declaration) != \
+					Configuration.__declaration_record__(previousDeclaration) or \
+					any(resource in changedResources
+					    for resource in __DependencyGraph__.references(declaration.init_args(), True)) or \
+					any(dependency in changed for dependency in self.__dependency_graph__.dependencies(identifier)):
+				changed.add(identifier)
+
+		return changed
+
+	def __processed_specification__(self, identifier):
+		"""
+		Get specification of processed declaration, or None if the declaration is pending or not declared.
+		"""
+		if self.__named_singleton_specifications__.has_key(identifier):
+			return self.__named_singleton_specifications__[identifier]
+
+		return self.__named_component_specifications__.get(identifier)
+
+	def __reuseDeclaration__(self, declaration, specification):
+		"""
+		Register specification, and instance of singleton, taken over from the container of a previous configuration
+		"""
+		self.__descriptors__[declaration.identifier()].set_type(specification.type())
+
+		# providers of references are bound to the components of this container, the specification is copied so that
+		# the container of the previous configuration is left as is until this container replaces it
+		specification = specification.copy()
+		self.__compile_specification__(specification)
+
+		if declaration.lifetime() == "singleton":
+			self.__named_singleton_specifications__[declaration.identifier()] = specification
+			self.__registerSingleton__(specification.type(), specification)
+
+			if specification.instance() is not None:
+				self.__named_singleton_components__[declaration.identifier()] = specification.instance()
+		else:
+			self.__named_component_specifications__[declaration.identifier()] = specification
+			self.__registerSpecification__(specification.type(), specification)
+
+	def configuration(self):
+		return self.__configuration__
+
+	def changed(self):
+		return frozenset(self.__changed__)
+
+	def __registerDescriptor__(self, declaration):
+		descriptor = ComponentDescriptor(declaration)
+
+		self.__descriptors__[declaration.identifier()] = descriptor
+
+		for tag in declaration.tags():
+			# get list (object) of descriptors for 'tag'
+			if self.__tagged_descriptors__.has_key(tag):
+				descriptors = self.__tagged_descriptors__[tag]
+			else:
+				descriptors = []
+				self.__tagged_descriptors__[tag] = descriptors
+
+			descriptors.append(descriptor)
+
+	def module_import_times(self):
+		"""
+		See Manager.module_import_times
+		"""
+		return self.__module_loader__.import_times()
+
+	def __inherited_components_of_type__(self, type, singleton, nonSingleton, ordered=False):
+		"""
+		Get tuples of (container, specification) pairs of singleton and non singleton components of a child
+		container which are instances of specified type, including the components of parent containers it does not
+		override. Results are cached like the results of __components_of_type__.
+		"""
+		containers = []
+		container = self
+
+		while container is not None:
+			# registrations of the parent containers do not change once their lazy declarations are processed
+			if container.__pending_declarations__:
+				container.__processPendingDeclarations__()
+
+			containers.append(container)
+			container = container.__parent__
+
+		key = (__Container__, type, singleton, nonSingleton, ordered)
+		cacheToken = __abc_cache_token__()
+		typeCache = self.__type_cache__
+		components = typeCache.get(key)
+
+		if components is None or components[0] != cacheToken:
+			singletons = []
+			specifications = []
+
+			for container in containers:
+				cacheToken, containerSingletons, containerSpecifications = container.__components_of_type__(
+					type, singleton, nonSingleton)
+
+				singletons.extend((container, specification) for specification in containerSingletons
+				                  if self.__owner__(specification.identifier()) is container)
+				specifications.extend((container, specification) for specification in containerSpecifications
+				                      if self.__owner__(specification.identifier()) is container)
+
+			if ordered:
+				singletons.sort(key=lambda pair: pair[1].identifier())
+				specifications.sort(key=lambda pair: pair[1].identifier())
+
+			components = (cacheToken, tuple(singletons), tuple(specifications))
+
+			typeCache[key] = components
+
+		return components
+
+	def __unresolvable__(self):
+		"""
+		Get identifiers of the components of this container which queries of components by type do not resolve on
+		the current thread: pooled components, and scoped components outside of a scope.
+		"""
+		return self.__pooled__ if getattr(self.__scopes__, "stack", None) else self.__pooled_or_scoped__
+
+	def __resolvable__(self, specifications):
+		"""
+		Get specifications of non singleton components, found by a query by type, which the query resolves.
+		"""
+		unresolvable = self.__unresolvable__()
+
+		if not unresolvable:
+			return specifications
+
+		return tuple(specification for specification in specifications
+		             if not specification.identifier() in unresolvable)
+
+	def __resolvable_pairs__(self, specifications):
+		"""
+		Get (container, specification) pairs of non singleton components, found by a query by type of a child
+		container, which the query resolves.
+		"""
+		return tuple((container, specification) for container, specification in specifications
+		             if not specification.identifier() in container.__unresolvable__())
+
+	def get_components_of_type(self, type, lifetime="all"):
+		"""
+		See Manager.get_components_of_type
+		"""
+		components = []
+
+		if self.__parent__ is not None:
+			cacheToken, singletons, specifications = self.__inherited_components_of_type__(type,
+				lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton")
+
+			return [container.__singleton_instance__(specification) for container, specification in singletons] + \
+			       [container.__create_instance__(specification)
+			        for container, specification in self.__resolvable_pairs__(specifications)]
+
+		# classes of lazy declarations are required to match them against specified type
+		if self.__pending_declarations__:
+			self.__processPendingDeclarations__()
+
+		cacheToken, singletons, specifications = self.__components_of_type__(type,
+			lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton")
+		specifications = self.__resolvable__(specifications)
+
+		# gather all singleton instances of specified type or types inheriting specified type
+		for specification in singletons:
+			components.append(self.__singleton_instance__(specification))
+
+		# create and gather instances of specified type or types inheriting specified type
+		for specification in specifications:
+			components.append(self.__create_instance__(specification))
+
+		return components
+
+	def iter_components_of_type(self, type, lifetime="all", ordered=False, until=None):
+		"""
+		See Manager.iter_components_of_type
+		"""
+		if self.__parent__ is not None:
+			cacheToken, singletons, specifications = self.__inherited_components_of_type__(type,
+				lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton", ordered)
+		else:
+			# classes of lazy declarations are required to match them against specified type
+			if self.__pending_declarations__:
+				self.__processPendingDeclarations__()
+
+			cacheToken, singletons, specifications = self.__components_of_type__(type,
+				lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton", ordered)
+
+			singletons = [(self, specification) for specification in singletons]
+			specifications = [(self, specification) for specification in specifications]
+
+		for container, specification in singletons:
+			component = container.__singleton_instance__(specification)
+
+			yield component
+
+			if until is not None and until(component):
+				return
+
+		for container, specification in self.__resolvable_pairs__(specifications):
+			component = container.__create_instance__(specification)
+
+			yield component
+
+			if until is not None and until(component):
+				return
+
+	def describe_components(self, type=None, tag=None, lifetime="all"):
+		"""
+		See Manager.describe_components
+		"""
+		singleton = lifetime == "all" or lifetime == "any" or lifetime == "singleton"
+		nonSingleton = lifetime != "singleton"
+
+		if self.__parent__ is not None:
+			if type is not None:
+				cacheToken, singletons, specifications = self.__inherited_components_of_type__(type, singleton,
+				                                                                               nonSingleton)
+
+				descriptors = [container.__descriptors__[specification.identifier()]
+				               for container, specification in singletons + specifications]
+			else:
+				# descriptors of the components this container does not override are described by its parents
+				descriptors = [descriptor for descriptor in self.__parent__.describe_components(None, tag, lifetime)
+				               if self.__configuration__[descriptor.identifier()] is None]
+				descriptors.extend(self.__descriptors__.values())
+
+				if not (singleton and nonSingleton):
+					descriptors = [descriptor for descriptor in descriptors
+					               if (descriptor.lifetime() == "singleton") == singleton]
+
+			if tag is not None:
+				descriptors = [descriptor for descriptor in descriptors if tag in descriptor.tags()]
+
+			return descriptors
+
+		if type is not None:
+			# classes of lazy declarations are required to match them against specified type
+			if self.__pending_declarations__:
+				self.__processPendingDeclarations__()
+
+			cacheToken, singletons, specifications = self.__components_of_type__(type, singleton, nonSingleton)
+
+			descriptors = [self.__descriptors__[specification.identifier()]
+			               for specification in singletons + specifications]
+
+			if tag is not None:
+				descriptors = [descriptor for descriptor in descriptors if tag in descriptor.tags()]
+		else:
+			if tag is not None:
+				descriptors = self.__tagged_descriptors__.get(tag, [])
+			else:
+				descriptors = self.__descriptors__.values()
+
+			if not (singleton and nonSingleton):
+				descriptors = [descriptor for descriptor in descriptors
+				               if (descriptor.lifetime() == "singleton") == singleton]
+
+		return list(descriptors)
+
+	def describe_component(self, identifier):
+		"""
+		See Manager.describe_component
+		"""
+		if self.__parent__ is not None and self.__configuration__[identifier] is None:
+			return self.__parent__.describe_component(identifier)
+
+		return self.__descriptors__.get(identifier)
+
+	def compile(self, className):
+		"""
+		See Manager.compile
+		"""
+		if self.__parent__ is not None:
+			raise ComponentError("Child managers can not be compiled, compile their parent manager instead")
+
+		# all declarations are processed, so that they are validated and their classes are known
+		if self.__pending_declarations__:
+			self.__processPendingDeclarations__()
+
+		declarations = []
+		eager = set()
+
+		for identifier in self.__dependency_graph__.topological_order():
+			declaration = self.__configuration__[identifier]
+
+			declarations.append((declaration, self.__descriptors__[identifier].type()))
+
+			if declaration.lifetime() == "singleton" and not self.__is_lazy__(declaration):
+				eager.add(identifier)
+
+		return __ContainerCompiler__(self.__configuration__.resources(), className).compile(declarations, eager)
+
+	def warmup(self):
+		"""
+		See Manager.warmup
+		"""
+		if self.__pending_declarations__:
+			self.__processPendingDeclarations__()
+
+		constructed = []
+
+		for identifier in self.__dependency_graph__.topological_order():
+			specification = self.__named_singleton_specifications__.get(identifier)
+
+			if specification is not None and specification.instance() is None \
+					and not identifier in self.__asynchronous__:
+				self.__singleton_instance__(specification)
+				constructed.append(identifier)
+
+		return constructed
+
+	def __disposals__(self):
+		"""
+		Get instances of the components of this container which are disposed when the Manager is closed, as lists of
+		(instance, name of dispose method) pairs by identifier. Singletons, per process instances of this process,
+		cached instances and idle pooled instances are disposed, by the method named by the 'dispose' lifetime
+		option of their declaration, or by their close or dispose method.
+		"""
+		disposals = {}
+
+		for declaration in self.__configuration__.plugins():
+			identifier = declaration.identifier()
+			lifetime = declaration.lifetime()
+			instances = []
+
+			if lifetime == "singleton":
+				specification = self.__named_singleton_specifications__.get(identifier)
+
+				if specification is not None and specification.instance() is not None:
+					instances.append(specification.instance())
+			elif lifetime == "per_process":
+				entry = self.__process_instances__.get(identifier)
+
+				if entry is not None and entry[0] == os.getpid():
+					instances.append(entry[1])
+			elif lifetime == "cached":
+				instance = self.__cache__.remove(identifier)
+
+				if instance is not None:
+					instances.append(instance)
+			elif lifetime == "pooled":
+				specification = self.__named_component_specifications__.get(identifier)
+
+				if specification is not None and specification.pool() is not None:
+					instances.extend(specification.pool().drain())
+
+			options = declaration.lifetime_options()
+			pairs = []
+
+			for instance in instances:
+				dispose = __Container__.__dispose_method__(options, instance)
+
+				if dispose is not None:
+					pairs.append((instance, dispose))
+
+			if pairs:
+				disposals[identifier] = pairs
+
+		return disposals
+
+	def __dispose_instances__(self, identifier, pairs, completed):
+		"""
+		Dispose instances of a component on a shutdown thread and report the time spent and the first error raised.
+		"""
+		started = timeit.default_timer()
+		error = None
+
+		for instance, dispose in pairs:
+			try:
+				getattr(instance, dispose)()
+			except:
+				if error is None:
+					error = sys.exc_info()[1]
+
+		completed.put((identifier, timeit.default_timer() - started, error))
+
+	def dispose(self, timeout, workers):
+		"""
+		See Manager.close
+		"""
+		disposals = self.__disposals__()
+		identifiers = [declaration.identifier() for declaration in self.__configuration__.plugins()]
+		# number of components referencing each component which are not disposed yet
+		remaining = dict((identifier, len(self.__dependency_graph__.dependents(identifier)))
+		                 for identifier in identifiers)
+		ready = [identifier for identifier in identifiers if remaining[identifier] == 0]
+		completed = Queue.Queue()
+		# deadlines of the disposals which are running, None for no deadline
+		running = {}
+		report = {}
+
+		def release(identifier):
+			# components referenced by a disposed component can be disposed once all their dependents are
+			for dependency in self.__dependency_graph__.dependencies(identifier):
+				if remaining.has_key(dependency):
+					remaining[dependency] -= 1
+
+					if remaining[dependency] == 0:
+						ready.append(dependency)
+
+		while ready or running:
+			while ready and len(running) < max(workers, 1):
+				identifier = ready.pop()
+
+				if not disposals.has_key(identifier):
+					release(identifier)
+					continue
+
+				thread = threading.Thread(target=self.__dispose_instances__,
+				                          args=(identifier, disposals[identifier], completed))
+				# a disposal which does not complete in time does not prevent the process from exiting
+				thread.daemon = True
+				running[identifier] = timeit.default_timer() + timeout if timeout is not None else None
+				thread.start()
+
+			if not running:
+				continue
+
+			deadlines = [deadline for deadline in running.itervalues() if deadline is not None]
+
+			try:
+				if deadlines:
+					identifier, seconds, error = completed.get(True, max(min(deadlines) - timeit.default_timer(), 0))
+				else:
+					identifier, seconds, error = completed.get()
+			except Queue.Empty:
+				now = timeit.default_timer()
+
+				# components referenced by a component whose disposal timed out are disposed anyway
+				for identifier, deadline in running.items():
+					if deadline is not None and deadline <= now:
+						del running[identifier]
+						report[identifier] = {"status": "timed_out", "seconds": timeout, "error": None}
+						release(identifier)
+
+				continue
+
+			# disposals which timed out are already reported
+			if not running.has_key(identifier):
+				continue
+
+			del running[identifier]
+			report[identifier] = {"status": "failed" if error is not None else "disposed", "seconds": seconds,
+			                      "error": error}
+			release(identifier)
+
+			if self.__instrumentation__ is not None:
+				self.__instrumentation__.__notify__("dispose", identifier, seconds)
+
+		return report
+
+	def pool(self, identifier):
+		"""
+		Get pool of component with specified identifier, or None if the identifier is not found.
+		"""
+		specification = self.__specification_of__(identifier)
+
+		if specification is None:
+			return None
+
+		if specification.pool() is None:
+			raise ComponentError(self.__format_string__("Component '{identifier}' is not pooled", [],
+			                                            {"identifier": identifier}))
+
+		return specification.pool()
+
+	def pool_stats(self):
+		"""
+		See Manager.pool_stats
+		"""
+		stats = self.__parent__.pool_stats() if self.__parent__ is not None else {}
+
+		stats.update((specification.identifier(), specification.pool().stats())
+		             for specification in self.__component_specifications__ if specification.pool() is not None)
+
+		return stats
+
+	def __require_asyncio__(self):
+		if asyncio is None:
+			raise ComponentError("Asynchronous resolution of components requires asyncio or trollius")
+
+	def __specification_of__(self, identifier):
+		"""
+		Get specification of component with specified identifier, processing its declaration if it is lazy
+		"""
+		if self.__pending_declarations__.has_key(identifier):
+			self.__processPendingDeclaration__(identifier)
+
+		if self.__named_singleton_specifications__.has_key(identifier):
+			return self.__named_singleton_specifications__[identifier]
+
+		if self.__parent__ is not None and self.__configuration__[identifier] is None:
+			return self.__parent__.__specification_of__(identifier)
+
+		return self.__named_component_specifications__.get(identifier)
+
+	def __resolve_dependencies_async__(self, identifier):
+		"""
+		Get future of asynchronous resolution of singletons with asynchronous initializers referenced by a component,
+		directly or through other components. Independent singletons are initialized concurrently.
+		"""
+		futures = []
+		visited = set()
+		dependencies = list(self.__dependency_graph__.dependencies(identifier))
+
+		while dependencies:
+			dependency = dependencies.pop()
+			# dependencies of a child container may be declared by its parents
+			owner = self.__owner__(dependency)
+
+			# components which do not depend on asynchronous initializers can be constructed synchronously
+			if dependency in visited or owner is None or not dependency in owner.__asynchronous__:
+				continue
+
+			visited.add(dependency)
+
+			specification = owner.__specification_of__(dependency)
+
+			if owner.__named_singleton_specifications__.get(dependency) is specification:
+				futures.append(owner.__singleton_async__(specification))
+			else:
+				dependencies.extend(owner.__dependency_graph__.dependencies(dependency))
+
+		return asyncio.gather(*futures)
+
+	def __create_async__(self, specification, register=None):
+		"""
+		Get future of instance of a specification, constructed once the singletons it references are initialized and
+		then initialized by its asynchronous initializer, if any.
+		"""
+		def initialized(instance):
+			if register is not None:
+				register(instance)
+
+			return instance
+
+		def construct(dependencies):
+			instance = specification.plan().construct()
+
+			if specification.async_init() is None:
+				return initialized(instance)
+
+			initialization = getattr(instance, specification.async_init())()
+
+			if not __is_awaitable__(initialization):
+				return initialized(instance)
+
+			return __async_then__(initialization, lambda result: initialized(instance))
+
+		return __async_then__(self.__resolve_dependencies_async__(specification.identifier()), construct)
+
+	def __singleton_async__(self, specification):
+		"""
+		Get future of instance of singleton specification. Concurrent resolutions share a single construction.
+		"""
+		instance = specification.instance()
+
+		if instance is not None:
+			return __completed_future__(instance)
+
+		def register(instance):
+			with specification.lock():
+				specification.set_instance(instance)
+				self.__named_singleton_components__[specification.identifier()] = instance
+
+		def completed(future):
+			specification.set_future(None)
+
+		with specification.lock():
+			instance = specification.shared_instance()
+
+			if instance is not None:
+				specification.set_instance(instance)
+				return __completed_future__(instance)
+
+			future = specification.future()
+
+			if future is None:
+				future = self.__create_async__(specification, register)
+				future.add_done_callback(completed)
+
+				specification.set_future(future)
+
+		return future
+
+	def get_component_async(self, identifier):
+		"""
+		See Manager.get_component_async
+		"""
+		self.__require_asyncio__()
+
+		if self.__parent__ is not None and self.__configuration__[identifier] is None:
+			return self.__parent__.get_component_async(identifier)
+
+		specification = self.__specification_of__(identifier)
+
+		if specification is None:
+			return __completed_future__(None)
+
+		if self.__named_singleton_specifications__.get(identifier) is specification:
+			return self.__singleton_async__(specification)
+
+		return self.__create_async__(specification)
+
+	def get_components_of_type_async(self, type, lifetime="all"):
+		"""
+		See Manager.get_components_of_type_async
+		"""
+		self.__require_asyncio__()
+
+		if self.__parent__ is not None:
+			cacheToken, singletons, specifications = self.__inherited_components_of_type__(type,
+				lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton")
+
+			futures = [container.__singleton_async__(specification) for container, specification in singletons]
+			futures.extend(container.__create_async__(specification)
+			               for container, specification in self.__resolvable_pairs__(specifications))
+
+			return __async_then__(asyncio.gather(*futures), list)
+
+		# classes of lazy declarations are required to match them against specified type
+		if self.__pending_declarations__:
+			self.__processPendingDeclarations__()
+
+		cacheToken, singletons, specifications = self.__components_of_type__(type,
+			lifetime == "all" or lifetime == "any" or lifetime == "singleton", lifetime != "singleton")
+
+		futures = [self.__singleton_async__(specification) for specification in singletons]
+		futures.extend(self.__create_async__(specification) for specification in self.__resolvable__(specifications))
+
+		return __async_then__(asyncio.gather(*futures), list)
+
+	def initialize_async(self):
+		"""
+		See Manager.initialize_async
+		"""
+		self.__require_asyncio__()
+
+		return __async_then__(asyncio.gather(*[self.__singleton_async__(specification)
+		                                      for specification in self.__asynchronous_singletons__]),
+		                      lambda singletons: None)
+
+	def get_component(self, identifier):
+		"""
+		See Manager.get_component
+		"""
+		component = None
 
 		# if identified component is singleton
 		if self.__named_singleton_components__.has_key(identifier):
@@ -423,5 +3939,750 @@ class Manager(object):
 		elif self.__named_component_specifications__.has_key(identifier):
 			# create instance of identified component
 			component = self.__create_instance__(self.__named_component_specifications__[identifier])
+		elif self.__named_singleton_specifications__.has_key(identifier):
+			# construct lazy singleton on first use
+			component = self.__singleton_instance__(self.__named_singleton_specifications__[identifier])
+		elif self.__pending_declarations__.has_key(identifier):
+			# process lazy declaration on first use
+			self.__processPendingDeclaration__(identifier)
+
+			component = __Container__.get_component(self, identifier)
+		elif self.__parent__ is not None and self.__configuration__[identifier] is None:
+			# resolve component of parent container, which is recorded by the instrumentation of this container
+			component = __Container__.get_component(self.__parent__, identifier)
+		elif self.__configuration__[identifier] is not None:
+			# lazy declaration was registered by another thread since it was looked up, a declaration is only removed
+			# from the pending declarations once it is registered
+			component = __Container__.get_component(self, identifier)
+
+		return component
+
+	def provider(self, identifier):
+		"""
+		See Manager.provider
+		"""
+		if self.__declaration__(identifier) is None:
+			return None
+
+		return self.__reference_provider__(identifier, None)
+
+	def provider_of_type(self, type, lifetime="all"):
+		"""
+		See Manager.provider_of_type
+		"""
+		singleton = lifetime == "all" or lifetime == "any" or lifetime == "singleton"
+		nonSingleton = lifetime != "singleton"
+
+		if self.__parent__ is not None:
+			cacheToken, singletons, specifications = self.__inherited_components_of_type__(type, singleton,
+			                                                                               nonSingleton)
+		else:
+			# classes of lazy declarations are required to match them against specified type
+			if self.__pending_declarations__:
+				self.__processPendingDeclarations__()
+
+			cacheToken, singletons, specifications = self.__components_of_type__(type, singleton, nonSingleton)
+
+			singletons = tuple((self, specification) for specification in singletons)
+			specifications = tuple((self, specification) for specification in specifications)
+
+		# pooled components are left out, scoped components are only resolved when the function is called in a scope
+		selected = tuple((container, specification) for container, specification in singletons + specifications
+		                 if not specification.identifier() in container.__pooled__)
+		providers = tuple(container.__reference_provider__(specification.identifier(), specification)
+		                  for container, specification in selected)
+		scoped = frozenset(index for index, (container, specification) in enumerate(selected)
+		                   if specification.identifier() in container.__pooled_or_scoped__)
+
+		if not scoped:
+			return lambda: [provider() for provider in providers]
+
+		scopes = self.__scopes__
+
+		return lambda: [provider() for index, provider in enumerate(providers)
+		                if not index in scoped or getattr(scopes, "stack", None)]
+
+	def create_many(self, identifier, count):
+		"""
+		See Manager.create_many
+		"""
+		owner = self.__owner__(identifier)
+
+		if owner is None:
+			return None
+
+		specification = owner.__specification_of__(identifier)
+
+		if owner.__named_singleton_specifications__.get(identifier) is specification:
+			return [owner.__singleton_instance__(specification)] * count
+
+		plan = specification.plan()
+
+		# components of other lifetimes, or with asynchronous initializer, are created by their lifetime
+		if plan.create != plan.construct:
+			create = plan.create
+
+			return [create() for index in xrange(count)]
+
+		return plan.construct_many(count)
+
+	def __instrumented_get_component__(self, identifier):
+		"""
+		Get component with specified identifier and record its resolution
+		"""
+		singletonHit = self.__named_singleton_components__.has_key(identifier)
+		component = __Container__.get_component(self, identifier)
+
+		if component is not None:
+			self.__instrumentation__.__record_resolution__(identifier, singletonHit)
+
+		return component
+
+
+class __ClosedContainer__(object):
+	"""
+	Container of a closed Manager, which raises ComponentError instead of resolving components. Other queries, e.g.
+	of declarations or statistics, are answered by the container the Manager had when it was closed.
+	"""
+
+	__resolutions__ = frozenset(["get_component", "get_component_async", "get_components_of_type",
+	                             "get_components_of_type_async", "iter_components_of_type", "provider",
+	                             "provider_of_type", "create_many", "warmup", "initialize_async", "__overlay__"])
+
+	def __init__(self, container):
+		self.__closed_container__ = container
+
+	def __getattr__(self, name):
+		if name in __ClosedContainer__.__resolutions__:
+			return self.__refuse__
+
+		return getattr(self.__closed_container__, name)
+
+	def __refuse__(self, *arguments, **keywords):
+		raise ComponentError("Unable to resolve components of a closed Manager")
+
+
+class Manager(object):
+
+	__format_string__ = string.Formatter().vformat
+
+	def __init__(self, configuration, lazy=False, workers=1, instrumentation=None, cacheSize=None, parent=None):
+		"""
+		Initiate ComponentManager with a Configuration object
+
+		lazy: Whether singletons are constructed on first use rather than when the Manager is created.
+		Declarations which specify 'lazy' override this setting.
+		workers: Number of threads constructing singletons when the Manager is created. Singletons which do not
+		reference each other, directly or through other components, are constructed concurrently.
+		instrumentation: Optional Instrumentation recording module imports, declaration processing and the
+		resolution and construction of components.
+		cacheSize: Maximum number of instances of cached components, the least recently used instances are evicted
+		when it is reached. Default is None, for no maximum.
+		parent: Optional Manager the Manager overlays, see Manager.child.
+		"""
+		self.__lazy__ = lazy
+		self.__workers__ = workers
+		self.__instrumentation__ = instrumentation
+		self.__parent__ = parent
+		# serializes reloads, components are resolved without locking
+		self.__reload_lock__ = threading.Lock()
+		self.__cache__ = __Cache__(cacheSize)
+		self.__closed__ = False
+
+		if parent is not None:
+			# modules and scopes are shared with the parent, which resolves the components the child does not override
+			self.__module_loader__ = parent.__module_loader__
+			self.__scopes__ = parent.__scopes__
+
+			self.__container__ = __Container__(parent.__container__.__overlay__(configuration), lazy, workers,
+			                                   self.__module_loader__, instrumentation, self.__scopes__, self.__cache__,
+			                                   None, parent.__container__)
+		else:
+			self.__module_loader__ = __ModuleLoader__(instrumentation)
+			# stacks of the scopes entered on each thread
+			self.__scopes__ = threading.local()
+
+			self.__container__ = __Container__(configuration, lazy, workers, self.__module_loader__, instrumentation,
+			                                   self.__scopes__, self.__cache__)
+
+	def child(self, configuration):
+		"""
+		Get a Manager overlaying this Manager with a Configuration of overriding resources and declarations, e.g. for
+		a tenant or a test. Only the overriding declarations, and the declarations of this Manager which reference
+		them or resources with different values, directly or indirectly, are processed by the child. Other
+		components, including singletons, are resolved by this Manager, so creating a child costs in proportion to
+		the overrides rather than to the whole configuration.
+
+		The child resolves components against the configuration this Manager has when the child is created or
+		reloaded. Child managers can not be compiled.
+		"""
+		return Manager(configuration, self.__lazy__, self.__workers__, self.__instrumentation__, parent=self)
+
+	def parent(self):
+		"""
+		Get Manager this Manager overlays, or None if it is not a child manager.
+		"""
+		return self.__parent__
+
+	def instrumentation(self):
+		"""
+		Get Instrumentation of the Manager, or None if it is not instrumented.
+		"""
+		return self.__instrumentation__
+
+	def configuration(self):
+		"""
+		Get Configuration the Manager currently resolves components of.
+		"""
+		return self.__container__.configuration()
+
+	def reload(self, configuration):
+		"""
+		Apply a new Configuration. Only declarations which were added or changed, or reference resources which
+		changed, and the declarations referencing them, directly or indirectly, are processed again. Modules are not
+		imported again and singletons of other declarations are kept. Components are resolved from the previous
+		configuration until the new one is applied as a whole.
+
+		Returns set of identifiers of the declarations which were processed again.
+		"""
+		with self.__reload_lock__:
+			if self.__closed__:
+				raise ComponentError("Unable to reload a closed Manager")
+
+			if self.__parent__ is not None:
+				parentContainer = self.__parent__.__container__
+				# declarations can only be kept if they were resolved against the same parent configuration
+				previous = self.__container__ if self.__container__.__parent__ is parentContainer else None
+
+				container = __Container__(parentContainer.__overlay__(configuration), self.__lazy__,
+				                          self.__workers__, self.__module_loader__, self.__instrumentation__,
+				                          self.__scopes__, self.__cache__, previous, parentContainer)
+			else:
+				container = __Container__(configuration, self.__lazy__, self.__workers__, self.__module_loader__,
+				                          self.__instrumentation__, self.__scopes__, self.__cache__,
+				                          self.__container__)
+
+			self.__container__ = container
+
+		return container.changed()
+
+	def watch(self, filePath, interval=1.0, snapshotPath=None):
+		"""
+		Start polling configuration file every 'interval' seconds and reload the Manager when the file changes.
+		Returns the started ConfigurationWatcher.
+		"""
+		watcher = ConfigurationWatcher(self, filePath, interval, snapshotPath)
+		watcher.start()
+
+		return watcher
+
+	def compile(self, filePath, className="Container"):
+		"""
+		Write Python module with a CompiledContainer subclass, named className, which resolves the components of
+		the current configuration. Lazy declarations are processed, so that all declarations are validated.
+
+		The container is created by importing the module and instantiating the class. It resolves components without
+		processing declarations, through the same get_component, get_components_of_type, iter_components_of_type,
+		describe_components and describe_component functions as Manager. Resources and constant init arguments must
+		be literals, i.e. None, booleans, numbers, strings, lists, tuples and dictionaries. Components with
+		asynchronous initializers can not be compiled.
+		"""
+		source = self.__container__.compile(className)
+
+		file = open(filePath, "w")
+
+		try:
+			file.write(source)
+		finally:
+			file.close()
+
+	def warmup(self, freeze=False):
+		"""
+		Prepare the Manager to be shared by processes forked from the current process, e.g. by the workers of a
+		pre-forking server. Lazy declarations are processed, which imports their modules and validates them, and
+		singletons which are not constructed yet are constructed, except singletons with asynchronous initializers.
+		Components which can not be shared by processes, e.g. because they hold sockets, threads or locks, are
+		declared with the 'per_process' lifetime, and are constructed in each process on first use instead.
+
+		freeze: Whether to move the objects tracked by the garbage collector to a permanent generation, on Python
+		3.7 or later, so that collections in forked processes do not copy the memory pages they share.
+
+		Returns list of identifiers of the singletons which were constructed.
+		"""
+		constructed = self.__container__.warmup()
+
+		if freeze and hasattr(gc, "freeze"):
+			gc.collect()
+			gc.freeze()
+
+		return constructed
+
+	def scope(self):
+		"""
+		Create scope of scoped components. Within a with statement on the scope, each scoped component is constructed
+		at most once, and the instances are disposed when the with statement exits. A scope can be entered again by
+		other threads, e.g. the threads serving one request, which then share its instances.
+
+		with manager.scope():
+			session = manager.get_component("Session")
+		"""
+		return __Scope__(self.__scopes__)
+
+	def acquire(self, identifier):
+		"""
+		Acquire instance of pooled component with specified identifier, or get None if the identifier is not found.
+		The instance must be released with release once it is no longer used. When the pool is exhausted, acquire
+		waits for an instance to be released or raises ComponentError, as declared in the lifetime options.
+		"""
+		if self.__closed__:
+			raise ComponentError("Unable to acquire components of a closed Manager")
+
+		pool = self.__container__.pool(identifier)
+
+		return pool.acquire() if pool is not None else None
+
+	def release(self, identifier, instance):
+		"""
+		Release instance of pooled component acquired with acquire, after calling its reset method if one is declared.
+		"""
+		pool = self.__container__.pool(identifier)
+
+		if pool is None:
+			raise ComponentError(self.__format_string__("Unable to find component '{identifier}'", [],
+			                                            {"identifier": identifier}))
+
+		pool.release(instance)
+
+	@contextlib.contextmanager
+	def pooled(self, identifier):
+		"""
+		Context manager acquiring instance of pooled component with specified identifier and releasing it on exit:
+
+		with manager.pooled("DefinitionParser") as parser:
+			parser.parse(text)
+		"""
+		if self.__closed__:
+			raise ComponentError("Unable to acquire components of a closed Manager")
+
+		pool = self.__container__.pool(identifier)
+
+		if pool is None:
+			yield None
+		else:
+			instance = pool.acquire()
+
+			try:
+				yield instance
+			finally:
+				# released to the pool it was acquired from, even if the configuration was reloaded meanwhile
+				pool.release(instance)
+
+	def pool_stats(self):
+		"""
+		Get dictionary of identifier of pooled component to dictionary of statistics of its pool:
+		- size: number of instances.
+		- idle: number of instances which are not acquired.
+		- acquisitions: number of acquisitions.
+		- hits: number of acquisitions of an idle instance.
+		- hit_rate: ratio of hits to acquisitions.
+		- waits: number of acquisitions which waited for an instance to be released.
+		- wait_time: cumulative time, in seconds, spent waiting.
+		- max_wait_time: longest time spent waiting.
+		"""
+		return self.__container__.pool_stats()
+
+	def cache_stats(self):
+		"""
+		Get dictionary of identifier of cached component to dictionary of counters of its resolutions:
+		- hits: number of resolutions of an instance which has not expired.
+		- stale_hits: number of resolutions of an expired instance while it is refreshed.
+		- misses: number of resolutions which constructed an instance.
+		- hit_rate: ratio of hits and stale hits to resolutions.
+		- refreshes: number of instances constructed in the background to replace an expired instance.
+		- refresh_failures: number of refreshes which raised an error, the expired instance is used until one succeeds.
+		- evictions: number of instances evicted because the cache was full or cleared.
+		- cached: whether an instance is cached.
+		"""
+		return self.__cache__.stats()
+
+	def clear_cache(self):
+		"""
+		Evict all instances of cached components, e.g. to release memory when the process is low on memory. Returns
+		number of evicted instances.
+		"""
+		return self.__cache__.clear()
+
+	def close(self, timeout=None, workers=4):
+		"""
+		Dispose the components owned by the Manager: singletons, per process instances of this process, cached
+		instances and idle pooled instances. A component is disposed by the method named by the 'dispose' lifetime
+		option of its declaration, or else by its close or dispose method, if any. A component is disposed after
+		the components which reference it, directly or through other components, and components which do not
+		reference each other are disposed concurrently. Components of a parent Manager are not disposed by its child
+		managers. Once the Manager is closed, resolving or acquiring components, reloading it or creating child
+		managers raises ComponentError, closing it again does nothing.
+
+		timeout: Maximum time, in seconds, the disposal of each component is waited for. The components it references
+		are disposed once it times out. Default is None, for no timeout.
+		workers: Maximum number of components disposed concurrently.
+
+		Returns dictionary of the disposed components by identifier, as dictionaries with keys:
+		- status: "disposed", "failed" or "timed_out".
+		- seconds: Time spent disposing the component.
+		- error: Exception raised by the first of its instances which failed to be disposed, or None.
+		"""
+		with self.__reload_lock__:
+			if self.__closed__:
+				return {}
+
+			self.__closed__ = True
+			container = self.__container__
+			self.__container__ = __ClosedContainer__(container)
+
+			return container.dispose(timeout, workers)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exceptionType, exception, traceback):
+		self.close()
+
+		return False
+
+	def module_import_times(self):
+		"""
+		Get dictionary of the time, in seconds, spent importing each plugin module.
+		"""
+		return self.__container__.module_import_times()
+
+	def get_component(self, identifier):
+		"""
+		Get component with specified identifier
+		"""
+		return self.__container__.get_component(identifier)
+
+	def provider(self, identifier):
+		"""
+		Get function resolving component with specified identifier, or None if the identifier is not found. The
+		declaration is looked up once, the function is bound to the singleton, or to the construction of the
+		component, so that calling it does not look up the declaration again. Its resolutions are not counted by the
+		instrumentation.
+
+		The function resolves the component of the configuration the Manager has when the function is returned, a new
+		function is required once the Manager is reloaded.
+		"""
+		return self.__container__.provider(identifier)
+
+	def provider_of_type(self, type, lifetime="all"):
+		"""
+		Get function returning the components which are instances of or inherits specified type, like
+		get_components_of_type. The components are looked up once, when the function is returned.
+
+		lifetime: Component lifetime filter, same as in get_components_of_type.
+		"""
+		return self.__container__.provider_of_type(type, lifetime)
+
+	def create_many(self, identifier, count):
+		"""
+		Get list of count instances of component with specified identifier, or None if the identifier is not found.
+		The declaration is looked up once and the arguments of the constructor are prepared once for all instances.
+		A singleton is returned count times.
+		"""
+		return self.__container__.create_many(identifier, count)
+
+	def get_components_of_type(self, type, lifetime="all"):
+		"""
+		Get components which are instances of or inherits specified type. Pooled components, which are acquired
+		from their pools, and scoped components, unless a scope is entered on the current thread, are left out.
+
+		Lifetime can be one of the following:
+		- all
+		- singleton
+		- <empty string>
+		"""
+		return self.__container__.get_components_of_type(type, lifetime)
+
+	def iter_components_of_type(self, type, lifetime="all", ordered=False, until=None):
+		"""
+		Iterate components which are instances of or inherits specified type. Singletons are yielded first, then
+		non singleton components, each of them constructed only when the iteration reaches it.
+
+		lifetime: Component lifetime filter, same as in get_components_of_type.
+		ordered: Whether components are yielded in order of their identifiers, within singletons and non singletons.
+		Otherwise the order is the order in which declarations were registered.
+		until: Optional predicate. The iteration stops after yielding the first component for which it returns True.
+		"""
+		return self.__container__.iter_components_of_type(type, lifetime, ordered, until)
+
+	def describe_components(self, type=None, tag=None, lifetime="all"):
+		"""
+		Get descriptors of components, without instantiating them, optionally filtered by type, tag and lifetime.
+		The descriptor of a selected component can then be instantiated with get_component.
+
+		Lifetime can be one of the following:
+		- all
+		- singleton
+		- <empty string>
+		"""
+		return self.__container__.describe_components(type, tag, lifetime)
+
+	def describe_component(self, identifier):
+		"""
+		Get descriptor of component with specified identifier, or None if the identifier is not found
+		"""
+		return self.__container__.describe_component(identifier)
+
+	def get_component_async(self, identifier):
+		"""
+		Get future of component with specified identifier, resolved with None if the identifier is not found.
+		Asynchronous initializers of the component and of the singletons it references are awaited, e.g.:
+
+		component = await manager.get_component_async(identifier)
+		"""
+		return self.__container__.get_component_async(identifier)
+
+	def get_components_of_type_async(self, type, lifetime="all"):
+		"""
+		Get future of list of components which are instances of or inherits specified type, same as
+		get_components_of_type. Asynchronous initializers of the components are awaited concurrently.
+		"""
+		return self.__container__.get_components_of_type_async(type, lifetime)
+
+	def initialize_async(self):
+		"""
+		Get future of initialization of eager singletons which could not be constructed when the Manager was created
+		because they have an asynchronous initializer or reference a component which has one. Independent
+		initializers run concurrently.
+		"""
+		return self.__container__.initialize_async()
+
+
+class ConfigurationWatcher(object):
+	"""
+	Polls a configuration file on a background thread and reloads a Manager when the file changes.
+	"""
+
+	def __init__(self, manager, filePath, interval=1.0, snapshotPath=None):
+		self.__manager__ = manager
+		self.__file_path__ = filePath
+		self.__interval__ = interval
+		self.__snapshot_path__ = snapshotPath
+		self.__source_key__ = Configuration.__source_key__(filePath)
+		self.__error__ = None
+		self.__stopped__ = threading.Event()
+		self.__thread__ = threading.Thread(target=self.__run__, name="ConfigurationWatcher")
+		self.__thread__.daemon = True
+
+	def __run__(self):
+		while not self.__stopped__.wait(self.__interval__):
+			self.poll()
+
+	def start(self):
+		self.__thread__.start()
+
+	def stop(self):
+		"""
+		Stop polling the configuration file.
+		"""
+		self.__stopped__.set()
+
+		if self.__thread__.is_alive() and threading.current_thread() is not self.__thread__:
+			self.__thread__.join()
+
+	def poll(self):
+		"""
+		Reload the Manager if the configuration file changed since it was last read. Returns True if it changed.
+		An error reading or applying the configuration leaves the Manager unchanged and is available from error.
+		"""
+		try:
+			sourceKey = Configuration.__source_key__(self.__file_path__)
+		except OSError:
+			# configuration file is being replaced
+			return False
+
+		if sourceKey == self.__source_key__:
+			return False
+
+		self.__source_key__ = sourceKey
+
+		try:
+			self.__manager__.reload(Configuration.read(self.__file_path__, self.__snapshot_path__))
+			self.__error__ = None
+		except Exception as error:
+			self.__error__ = error
+
+		return True
+
+	def error(self):
+		"""
+		Get error raised by the last reload, or None if it succeeded.
+		"""
+		return self.__error__
+
+
+class CompiledContainer(object):
+	"""
+	Base class of the containers generated by Manager.compile. The generated subclass constructs each component with
+	a function of its own and has the index of the components by type, so that components are resolved without
+	processing declarations.
+	"""
+
+	# records of the declarations, classes of the components and index by type, defined by the generated subclass
+	__declarations__ = ()
+	__classes__ = ()
+	__type_index__ = {}
+	__eager_singletons__ = ()
+
+	def __init__(self):
+		self.__lock__ = threading.RLock()
+		self.__singletons__ = {}
+		self.__factories__ = self.__compiled_factories__()
+		# identifiers of components of types which are not in the index, e.g. abstract base classes
+		self.__type_cache__ = {}
+		self.__descriptors__ = None
+
+		for identifier in self.__eager_singletons__:
+			self.__factories__[identifier]()
+
+	def __compiled_factories__(self):
+		"""
+		Get dictionary of identifier to function constructing the component, or returning the singleton.
+		"""
+		return {}
+
+	def __identifiers_of_type__(self, type):
+		"""
+		Get tuples of identifiers of singleton and non singleton components which are instances of specified type.
+		"""
+		# virtual subclasses of abstract base classes are not in the method resolution order of their classes
+		if not isinstance(type, abc.ABCMeta) and self.__type_index__.has_key(type):
+			return self.__type_index__[type]
+
+		cacheToken = __abc_cache_token__()
+		identifiers = self.__type_cache__.get(type)
+
+		if identifiers is None or identifiers[0] != cacheToken:
+			identifiers = (cacheToken, tuple(identifier for identifier, componentClass, singleton in self.__classes__
+			                                 if singleton and issubclass(componentClass, type)),
+			               tuple(identifier for identifier, componentClass, singleton in self.__classes__
+			                     if not singleton and issubclass(componentClass, type)))
+
+			self.__type_cache__[type] = identifiers
+
+		return identifiers[1:]
+
+	def __descriptor_table__(self):
+		"""
+		Get dictionary of identifier to descriptor of component, created on first use.
+		"""
+		if self.__descriptors__ is None:
+			descriptors = {}
+
+			for record, (identifier, componentClass, singleton) in zip(self.__declarations__, self.__classes__):
+				descriptor = ComponentDescriptor(ComponentDeclaration(*record))
+				descriptor.set_type(componentClass)
+
+				descriptors[identifier] = descriptor
+
+			self.__descriptors__ = descriptors
+
+		return self.__descriptors__
+
+	def get_component(self, identifier):
+		"""
+		See Manager.get_component
+		"""
+		component = self.__singletons__.get(identifier)
+
+		if component is None:
+			factory = self.__factories__.get(identifier)
+
+			if factory is not None:
+				component = factory()
 
 		return component
+
+	def provider(self, identifier):
+		"""
+		See Manager.provider
+		"""
+		return self.__factories__.get(identifier)
+
+	def provider_of_type(self, type, lifetime="all"):
+		"""
+		See Manager.provider_of_type
+		"""
+		singletons, components = self.__identifiers_of_type__(type)
+
+		if lifetime != "all" and lifetime != "any" and lifetime != "singleton":
+			singletons = ()
+
+		if lifetime == "singleton":
+			components = ()
+
+		factories = tuple(self.__factories__[identifier] for identifier in tuple(singletons) + tuple(components))
+
+		return lambda: [factory() for factory in factories]
+
+	def create_many(self, identifier, count):
+		"""
+		See Manager.create_many
+		"""
+		factory = self.__factories__.get(identifier)
+
+		if factory is None:
+			return None
+
+		return [factory() for index in xrange(count)]
+
+	def get_components_of_type(self, type, lifetime="all"):
+		"""
+		See Manager.get_components_of_type
+		"""
+		return list(self.iter_components_of_type(type, lifetime))
+
+	def iter_components_of_type(self, type, lifetime="all", ordered=False, until=None):
+		"""
+		See Manager.iter_components_of_type
+		"""
+		singletons, components = self.__identifiers_of_type__(type)
+
+		if lifetime != "all" and lifetime != "any" and lifetime != "singleton":
+			singletons = ()
+
+		if lifetime == "singleton":
+			components = ()
+
+		if ordered:
+			singletons = sorted(singletons)
+			components = sorted(components)
+
+		for identifier in tuple(singletons) + tuple(components):
+			component = self.__factories__[identifier]()
+
+			yield component
+
+			if until is not None and until(component):
+				return
+
+	def describe_components(self, type=None, tag=None, lifetime="all"):
+		"""
+		See Manager.describe_components
+		"""
+		descriptors = self.__descriptor_table__()
+
+		if type is not None:
+			singletons, components = self.__identifiers_of_type__(type)
+			selected = [descriptors[identifier] for identifier in singletons + components]
+		else:
+			selected = [descriptors[identifier] for identifier, componentClass, singleton in self.__classes__]
+
+		return [descriptor for descriptor in selected if (tag is None or tag in descriptor.tags())
+		        and (lifetime == "all" or lifetime == "any" or (descriptor.lifetime() == "singleton") ==
+		             (lifetime == "singleton"))]
+
+	def describe_component(self, identifier):
+		"""
+		See Manager.describe_component
+		"""
+		return self.__descriptor_table__().get(identifier)
@@ -1,7 +1,14 @@
 __author__ = 'ND'
 
+import os
+import sys
+import ast
+import json
+import shutil
+import tempfile
 import unittest
 import Declare
+import TestModel
 
 
 class ConfigurationTestCase(unittest.TestCase):
@@ -76,5 +83,339 @@ class ConfigurationTestCase(unittest.TestCase):
 		"""
 		self.assertTrue(self._configuration_["RemoveWordDefinitionTask"].lifetime() == "")
 
+	def test_component_specification_tags_and_metadata(self):
+		"""
+		check that specific component specification has correct tags and metadata
+		"""
+		declaration = self._configuration_["AddWordDefinitionTask"]
+
+		self.assertTrue(declaration.tags() == ("editing",) and declaration.metadata()["title"] == "Add word definition")
+
+	def test_component_specification_tags_non_declaration(self):
+		"""
+		check that specific component specification without tags and metadata has none
+		"""
+		declaration = self._configuration_["ListWordDefinitionsTask"]
+
+		self.assertTrue(declaration.tags() == () and declaration.metadata() == {})
+
+	def test_component_specifications_shared_values(self):
+		"""
+		check that declarations of a configuration file share equal module names and tags, and that init argument lists
+		are stored as tuples
+		"""
+		addTask = self._configuration_["AddWordDefinitionTask"]
+		removeTask = self._configuration_["RemoveWordDefinitionTask"]
+		declaration = Declare.ComponentDeclaration(u"AddWordDefinitionTask2", u"TestPlugins", u"AddWordDefinitionTask",
+		                                           [u"{$AddWordTaskRepeat}"])
+
+		self.assertTrue(addTask.module_name() is removeTask.module_name() and addTask.tags() is removeTask.tags()
+		                and addTask.init_args() == (u"{$AddWordTaskRepeat}",)
+		                and declaration.init_args() == (u"{$AddWordTaskRepeat}",))
+
+
+class ConfigurationSnapshotTestCase(unittest.TestCase):
+	"""
+	Test configuration snapshot
+	"""
+
+	def setUp(self):
+		"""
+		copy 'configuration.json' to a temporary directory
+		"""
+		self._directory_ = tempfile.mkdtemp()
+		self._file_path_ = os.path.join(self._directory_, "configuration.json")
+		self._snapshot_path_ = os.path.join(self._directory_, "configuration.snapshot")
+
+		shutil.copy("configuration.json", self._file_path_)
+
+	def tearDown(self):
+		shutil.rmtree(self._directory_)
+
+	def test_snapshot_written(self):
+		"""
+		check that snapshot is written when configuration is read
+		"""
+		Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		self.assertTrue(os.path.exists(self._snapshot_path_))
+
+	def test_snapshot_read(self):
+		"""
+		check that configuration is read from snapshot without parsing the configuration file
+		"""
+		Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		load = json.loads
+
+		def fail(*args, **kwargs):
+			self.fail("configuration file was parsed")
+
+		json.loads = fail
+
+		try:
+			configuration = Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+		finally:
+			json.loads = load
+
+		declaration = configuration["RemoveWordDefinitionTask"]
+
+		self.assertTrue(configuration.resources()["AddWordTaskRepeat"] == True and declaration.module_name() == "TestPlugins"
+		                and declaration.init_args() == {"repeat": "{$RemoveWordTaskRepeat}"}
+		                and declaration.tags() == ("editing",))
+
+	def test_stale_snapshot(self):
+		"""
+		check that configuration file is parsed again when it was modified after the snapshot was written
+		"""
+		Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		file = open(self._file_path_, "r")
+		configurationObject = json.load(file)
+		file.close()
+
+		configurationObject["resources"]["AddWordTaskRepeat"] = False
+
+		file = open(self._file_path_, "w")
+		json.dump(configurationObject, file)
+		file.close()
+
+		configuration = Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		self.assertTrue(configuration.resources()["AddWordTaskRepeat"] == False)
+
+	def test_modified_while_read(self):
+		"""
+		check that a snapshot written while the configuration file is modified is not used for the new content
+		"""
+		file = open(self._file_path_, "r")
+		configurationObject = json.load(file)
+		file.close()
+
+		configurationObject["resources"]["AddWordTaskRepeat"] = False
+		sourceKey = Declare.Configuration.__source_key__
+
+		def modify(filePath):
+			# the file is modified once, when it is read for the snapshot
+			Declare.Configuration.__source_key__ = staticmethod(sourceKey)
+
+			file = open(filePath, "w")
+			json.dump(configurationObject, file)
+			file.close()
+
+			return sourceKey(filePath)
+
+		Declare.Configuration.__source_key__ = staticmethod(modify)
+
+		try:
+			Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+		finally:
+			Declare.Configuration.__source_key__ = staticmethod(sourceKey)
+
+		configuration = Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		self.assertTrue(configuration.resources()["AddWordTaskRepeat"] == False)
+
+	def test_touched_file(self):
+		"""
+		check that snapshot is used when only the modification time of the configuration file changed, and that the
+		file is not hashed again once the snapshot records the new modification time
+		"""
+		Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		modified = os.stat(self._file_path_).st_mtime + 10
+		os.utime(self._file_path_, (modified, modified))
+
+		load = json.loads
+		sourceHash = Declare.Configuration.__source_hash__
+
+		def fail(*args, **kwargs):
+			self.fail("configuration file was parsed or hashed")
+
+		json.loads = fail
+
+		try:
+			Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+			Declare.Configuration.__source_hash__ = staticmethod(fail)
+			configuration = Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+		finally:
+			json.loads = load
+			Declare.Configuration.__source_hash__ = staticmethod(sourceHash)
+
+		self.assertTrue(configuration["AddWordDefinitionTask"] is not None)
+
+	def test_corrupt_snapshot(self):
+		"""
+		check that configuration file is parsed when snapshot is corrupt
+		"""
+		file = open(self._snapshot_path_, "wb")
+		file.write("corrupt")
+		file.close()
+
+		configuration = Declare.Configuration.read(self._file_path_, self._snapshot_path_)
+
+		self.assertTrue(configuration["AddWordDefinitionTask"] is not None)
+
+
+class ConfigurationDiscoveryTestCase(unittest.TestCase):
+	"""
+	Test discovery of plugin classes
+	"""
+
+	_modules_ = {
+		"__init__.py": "from .tasks import ListTask\n",
+		"tasks.py": "import TestModel\n"
+		            "from TestModel import UserTask\n\n"
+		            "class ListTask(UserTask):\n"
+		            "\tcan_repeat = False\n\n"
+		            "\tdef __init__(self):\n"
+		            "\t\tsuper(ListTask, self).__init__('l', 'List')\n\n"
+		            "\tdef begin(self, *arguments):\n"
+		            "\t\treturn arguments\n\n"
+		            "class PartialTask(TestModel.UserTask):\n"
+		            "\tcan_repeat = True\n",
+		"helpers.py": "class Helper(object):\n"
+		              "\tpass\n",
+		"broken.py": "class Broken(:\n"
+	}
+
+	_subpackage_modules_ = {
+		"__init__.py": "",
+		"sorting.py": "from .. import ListTask\n\n"
+		              "class SortedListTask(ListTask):\n"
+		              "\tpass\n\n"
+		              "class _PrivateTask(ListTask):\n"
+		              "\tpass\n"
+	}
+
+	_packages_ = 0
+
+	def setUp(self):
+		"""
+		write a plugin package to a temporary directory
+		"""
+		ConfigurationDiscoveryTestCase._packages_ += 1
+
+		self._directory_ = tempfile.mkdtemp()
+		self._package_ = "DiscoveredPlugins%d" % ConfigurationDiscoveryTestCase._packages_
+		self._index_path_ = os.path.join(self._directory_, "plugins.index")
+
+		os.makedirs(os.path.join(self._directory_, self._package_, "sub"))
+
+		for name, source in self._modules_.items():
+			self._write_(os.path.join(self._package_, name), source)
+
+		for name, source in self._subpackage_modules_.items():
+			self._write_(os.path.join(self._package_, "sub", name), source)
+
+		sys.path.insert(0, self._directory_)
+
+	def tearDown(self):
+		sys.path.remove(self._directory_)
+		shutil.rmtree(self._directory_)
+
+	def _write_(self, path, source):
+		file = open(os.path.join(self._directory_, path), "w")
+		file.write(source)
+		file.close()
+
+	def _discover_(self):
+		return Declare.Configuration.discover([self._directory_], TestModel.UserTask, self._index_path_)
+
+	def test_concrete_subclasses(self):
+		"""
+		check that concrete subclasses of base class are discovered, through imported names, without importing them
+		"""
+		configuration = self._discover_()
+
+		self.assertEqual(sorted([("ListTask", self._package_ + ".tasks"), ("SortedListTask", self._package_ + ".sub.sorting")]),
+		                 sorted((declaration.identifier(), declaration.module_name()) for declaration in configuration.plugins()))
+		self.assertTrue(configuration["ListTask"].lazy())
+		self.assertFalse(self._package_ in sys.modules)
+
+	def test_resolution(self):
+		"""
+		check that only the module of the resolved component is imported
+		"""
+		manager = Declare.Manager(self._discover_())
+
+		self.assertEqual("l", manager.get_component("ListTask").key())
+		self.assertTrue(self._package_ + ".tasks" in sys.modules)
+		self.assertFalse(self._package_ + ".sub.sorting" in sys.modules)
+
+	def test_index_read(self):
+		"""
+		check that modules are not parsed again when they did not change since the index was written
+		"""
+		self._discover_()
+
+		self.assertTrue(os.path.exists(self._index_path_))
+
+		parse = ast.parse
+
+		def fail(*args, **kwargs):
+			self.fail("module was parsed")
+
+		ast.parse = fail
+
+		try:
+			configuration = self._discover_()
+		finally:
+			ast.parse = parse
+
+		self.assertTrue(configuration["SortedListTask"] is not None)
+
+	def test_stale_index(self):
+		"""
+		check that modules which changed after the index was written are parsed again
+		"""
+		self._discover_()
+		self._write_(os.path.join(self._package_, "helpers.py"), "from .tasks import ListTask\n\n"
+		                                                         "class Helper(ListTask):\n"
+		                                                         "\tpass\n\n"
+		                                                         "class OtherHelper(object):\n"
+		                                                         "\tpass\n")
+
+		configuration = self._discover_()
+
+		self.assertTrue(configuration["Helper"] is not None)
+
+	def test_configuration_file(self):
+		"""
+		check that components of the discovery section are declared, unless they are declared explicitly
+		"""
+		filePath = os.path.join(self._directory_, "configuration.json")
+		snapshotPath = os.path.join(self._directory_, "configuration.snapshot")
+
+		file = open(filePath, "w")
+		json.dump({"component_specifications": {"ListTask": {"class": "SortedListTask", "module": self._package_ + ".sub.sorting"}},
+		           "discovery": [{"paths": ["."], "base": "TestModel.UserTask", "index": "plugins.index", "tags": ["discovered"]}]},
+		          file)
+		file.close()
+
+		for attempt in range(2):
+			configuration = Declare.Configuration.read(filePath, snapshotPath)
+
+			self.assertEqual("SortedListTask", configuration["ListTask"].class_name())
+			self.assertEqual(("discovered",), configuration["SortedListTask"].tags())
+			self.assertTrue(os.path.exists(self._index_path_))
+
+
+	def test_configuration_file_without_declarations(self):
+		"""
+		check that a configuration file can declare its components by discovery only
+		"""
+		filePath = os.path.join(self._directory_, "configuration.json")
+
+		file = open(filePath, "w")
+		json.dump({"discovery": [{"paths": ["."], "base": "TestModel.UserTask"}]}, file)
+		file.close()
+
+		configuration = Declare.Configuration.read(filePath)
+
+		self.assertEqual("ListTask", configuration["ListTask"].class_name())
+		self.assertTrue(configuration["SortedListTask"] is not None)
+
 if __name__ == '__main__':
 	unittest.main()
@@ -1,8 +1,40 @@
 __author__ = 'ND'
 
+import os
+import sys
+import abc
+import imp
+import json
+import time
+import shutil
+import decimal
+import tempfile
+import json.decoder
+import itertools
+import threading
 import unittest
 import Declare
-from TestModel import UserTask
+import TestPlugins
+from TestModel import UserTask, Searchable
+
+__compiled_modules__ = itertools.count()
+
+
+def compile_manager(manager):
+	"""
+	Compile configuration of manager into a module and create container of the module
+	"""
+	directory = tempfile.mkdtemp()
+
+	try:
+		filePath = os.path.join(directory, "CompiledContainer.py")
+
+		manager.compile(filePath)
+		module = imp.load_source("CompiledContainer%d" % next(__compiled_modules__), filePath)
+	finally:
+		shutil.rmtree(directory)
+
+	return module.Container()
 
 
 class ManagerTests(unittest.TestCase):
@@ -50,6 +82,58 @@ class ManagerTests(unittest.TestCase):
 
 		self.assertTrue(not (addWordTask is None or listWordsTask is None or removeWordTask is None))
 
+	def test_iter_components_of_type(self):
+		"""
+		check that iterating components of type yields singletons first, then the other components
+		"""
+		tasks = [task.__task_name__ for task in self._manager_.iter_components_of_type(UserTask, ordered=True)]
+
+		self.assertTrue(tasks == ["ListWordDefinitionsTask", "AddWordDefinitionTask", "RemoveWordDefinitionTask"])
+
+	def test_iter_components_of_type_until(self):
+		"""
+		check that iterating components of type stops at the first component accepted by the predicate
+		"""
+		tasks = list(self._manager_.iter_components_of_type(UserTask, "", True, lambda task: task.repeats()))
+
+		self.assertTrue(len(tasks) == 1 and tasks[0].__task_name__ == "AddWordDefinitionTask")
+
+	def test_describe_components_by_tag(self):
+		"""
+		check that components can be described by tag
+		"""
+		descriptors = self._manager_.describe_components(tag="editing")
+
+		identifiers = [descriptor.identifier() for descriptor in descriptors]
+
+		self.assertTrue(len(identifiers) == 2 and "AddWordDefinitionTask" in identifiers
+		                and "RemoveWordDefinitionTask" in identifiers)
+
+	def test_describe_components_by_type_and_lifetime(self):
+		"""
+		check that components can be described by type and lifetime
+		"""
+		descriptors = self._manager_.describe_components(UserTask, lifetime="singleton")
+
+		self.assertTrue(len(descriptors) == 1 and descriptors[0].identifier() == "ListWordDefinitionsTask"
+		                and descriptors[0].type() is TestPlugins.ListWordDefinitionsTask)
+
+	def test_describe_component(self):
+		"""
+		check that component descriptor has declared module, class, lifetime and metadata
+		"""
+		descriptor = self._manager_.describe_component("AddWordDefinitionTask")
+
+		self.assertTrue(descriptor.module_name() == "TestPlugins" and descriptor.class_name() == "AddWordDefinitionTask"
+		                and descriptor.lifetime() == "" and descriptor.metadata()["title"] == "Add word definition")
+
+	def test_component_class_identity(self):
+		"""
+		check that component classes are the classes of the already imported plugin module
+		"""
+		self.assertTrue(isinstance(self._manager_.get_component("AddWordDefinitionTask"),
+		                           TestPlugins.AddWordDefinitionTask))
+
 	def test_component_init_argument_correctness(self):
 		"""
 		check that components declared with init args has correct init args
@@ -62,5 +146,1796 @@ class ManagerTests(unittest.TestCase):
 	def tearDown(self):
 		del(self._manager_)
 
+
+class CompiledManagerTests(ManagerTests):
+	"""
+	Declare.Manager test scenarios against compiled container
+	"""
+
+	def setUp(self):
+		"""
+		read configuration and compile manager
+		"""
+		configuration = Declare.Configuration.read("configuration.json")
+		self._manager_ = compile_manager(Declare.Manager(configuration))
+
+
+class ManagerArgumentTests(unittest.TestCase):
+	"""
+	Declare.Manager init argument resolution scenarios
+	"""
+
+	def create_manager(self, declarations, resources=None):
+		return Declare.Manager(Declare.Configuration(resources if resources is not None else {}, declarations))
+
+	def test_reference_to_singleton(self):
+		"""
+		check that reference to a singleton component resolves to the singleton instance
+		"""
+		manager = self.create_manager([
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"])])
+
+		task = manager.get_component(u"LookupTask")
+
+		self.assertTrue(task.repository is manager.get_component(u"Repository"))
+
+	def test_reference_to_non_singleton(self):
+		"""
+		check that reference to a non singleton component resolves to a new instance on each construction
+		"""
+		manager = self.create_manager([
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+			                             {u"repository": u"{Repository}", u"repeat": u"{$Repeat}"}),
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository")],
+			{u"Repeat": True})
+
+		first = manager.get_component(u"LookupTask")
+		second = manager.get_component(u"LookupTask")
+
+		self.assertTrue(first.repository is not second.repository and first.repeats() == True)
+
+	def test_none_resource(self):
+		"""
+		check that {$None} resolves to None
+		"""
+		manager = self.create_manager([
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", [u"{$None}"])])
+
+		self.assertTrue(manager.get_component(u"Repository").definitions == {})
+
+	def test_unknown_resource(self):
+		"""
+		check that reference to an undeclared resource is reported when the manager is created
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", [u"{$Missing}"])])
+
+	def test_missing_init_arguments(self):
+		"""
+		check that declaration without required init arguments is reported when the manager is created
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, [
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask")])
+
+
+class CompiledManagerArgumentTests(ManagerArgumentTests):
+	"""
+	Declare.Manager init argument resolution scenarios against compiled container
+	"""
+
+	def create_manager(self, declarations, resources=None):
+		return compile_manager(ManagerArgumentTests.create_manager(self, declarations, resources))
+
+	def test_keyword_argument_names(self):
+		"""
+		check that keyword arguments which are not Python identifiers are passed to the constructor
+		"""
+		manager = self.create_manager([
+			Declare.ComponentDeclaration(u"Settings", "__builtin__", "dict", {u"lambda": 1, u"repeat": [u"{$None}"],
+			                                                                 u"search-limit": {u"size": 2.5}})])
+
+		self.assertTrue(manager.get_component(u"Settings") == {"lambda": 1, "repeat": [u"{$None}"],
+		                                                       "search-limit": {u"size": 2.5}})
+
+	def test_non_literal_resource(self):
+		"""
+		check that resource which is not a literal can not be compiled
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository",
+			                             [u"{$Definitions}"])], {u"Definitions": object()})
+
+	def test_asynchronous_initializer(self):
+		"""
+		check that component with asynchronous initializer can not be compiled
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "AsyncWordDefinitionRepository",
+			                             lifetime="singleton", lazy=True, asyncInit="load")])
+
+
+class ManagerDependencyTests(unittest.TestCase):
+	"""
+	Declare.Manager component dependency scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+	def create_manager(self, declarations, workers=1):
+		return Declare.Manager(Declare.Configuration({}, declarations), workers=workers)
+
+	def test_singleton_references_singleton(self):
+		"""
+		check that singletons are constructed after the singletons they reference, regardless of declaration order
+		"""
+		manager = self.create_manager([
+			Declare.ComponentDeclaration(u"A", "TestPlugins", "LookupWordDefinitionTask", [u"{B}"], "singleton"),
+			Declare.ComponentDeclaration(u"B", "TestPlugins", "LookupWordDefinitionTask", [u"{C}"], "singleton"),
+			Declare.ComponentDeclaration(u"C", "TestPlugins", "CountedWordDefinitionRepository", lifetime="singleton")])
+
+		a = manager.get_component(u"A")
+
+		self.assertTrue(a.repository is manager.get_component(u"B")
+		                and a.repository.repository is manager.get_component(u"C"))
+
+	def test_circular_reference(self):
+		"""
+		check that circular references are reported with the path of the cycle
+		"""
+		try:
+			self.create_manager([
+				Declare.ComponentDeclaration(u"A", "TestPlugins", "LookupWordDefinitionTask", [u"{B}"]),
+				Declare.ComponentDeclaration(u"B", "TestPlugins", "LookupWordDefinitionTask", [u"{A}"])])
+		except Declare.ComponentSpecificationError, error:
+			self.assertTrue("A -> B -> A" in str(error))
+		else:
+			self.fail("circular reference was not reported")
+
+	def test_unknown_reference(self):
+		"""
+		check that reference to an undeclared component is reported when the manager is created
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, [
+			Declare.ComponentDeclaration(u"A", "TestPlugins", "LookupWordDefinitionTask", [u"{Missing}"])])
+
+	def test_parallel_construction(self):
+		"""
+		check that singletons constructed by multiple workers are constructed once, after their references
+		"""
+		declarations = [Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository",
+		                                             lifetime="singleton")]
+
+		for index in range(8):
+			declarations.append(Declare.ComponentDeclaration(u"Task%d" % index, "TestPlugins",
+				"LookupWordDefinitionTask", [u"{Repository%d}" % index], "singleton"))
+			declarations.append(Declare.ComponentDeclaration(u"Repository%d" % index, "TestPlugins",
+				"SlowWordDefinitionRepository", lifetime="singleton"))
+
+		manager = self.create_manager(declarations, 4)
+
+		self.assertTrue(TestPlugins.CountedWordDefinitionRepository.instances == 9 and
+		                all(manager.get_component(u"Task%d" % index).repository is
+		                    manager.get_component(u"Repository%d" % index) for index in range(8)))
+
+	def test_parallel_construction_error(self):
+		"""
+		check that error raised by a singleton constructed by a worker is raised when the manager is created
+		"""
+		self.assertRaises(decimal.InvalidOperation, self.create_manager, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository",
+			                             lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Number", "decimal", "Decimal", [u"not a number"], "singleton")], 4)
+
+
+class CompiledManagerDependencyTests(ManagerDependencyTests):
+	"""
+	Declare.Manager component dependency scenarios against compiled container
+	"""
+
+	def create_manager(self, declarations, workers=1):
+		manager = ManagerDependencyTests.create_manager(self, declarations, workers)
+
+		# only count instances constructed by the compiled container
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+		return compile_manager(manager)
+
+
+class ManagerReloadTests(unittest.TestCase):
+	"""
+	Declare.Manager configuration reload scenarios
+	"""
+
+	def setUp(self):
+		self._manager_ = Declare.Manager(self.create_configuration())
+
+	def create_configuration(self, resources=None, declarations=()):
+		return Declare.Configuration(resources if resources is not None else {u"Repeat": True}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+			                             [u"{Repository}", u"{$Repeat}"], "singleton"),
+			Declare.ComponentDeclaration(u"AddTask", "TestPlugins", "AddWordDefinitionTask", [u"{$Repeat}"],
+			                             "singleton")] + list(declarations))
+
+	def test_reload_unchanged(self):
+		"""
+		check that singletons of unchanged declarations are kept
+		"""
+		repository = self._manager_.get_component(u"Repository")
+		lookupTask = self._manager_.get_component(u"LookupTask")
+
+		changed = self._manager_.reload(self.create_configuration())
+
+		self.assertTrue(len(changed) == 0 and self._manager_.get_component(u"Repository") is repository
+		                and self._manager_.get_component(u"LookupTask") is lookupTask)
+
+	def test_reload_changed_resource(self):
+		"""
+		check that declarations referencing a changed resource are processed again
+		"""
+		repository = self._manager_.get_component(u"Repository")
+
+		changed = self._manager_.reload(self.create_configuration({u"Repeat": False}))
+
+		lookupTask = self._manager_.get_component(u"LookupTask")
+
+		self.assertTrue(changed == frozenset([u"LookupTask", u"AddTask"]) and lookupTask.repeats() == False
+		                and lookupTask.repository is repository)
+
+	def test_reload_changed_dependency(self):
+		"""
+		check that declarations referencing a changed declaration are processed again
+		"""
+		configuration = self.create_configuration()
+		configuration = Declare.Configuration(configuration.resources(), [declaration for declaration
+			in configuration.plugins() if declaration.identifier() != u"Repository"] + [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton")])
+
+		changed = self._manager_.reload(configuration)
+
+		self.assertTrue(changed == frozenset([u"Repository", u"LookupTask"]) and isinstance(
+			self._manager_.get_component(u"LookupTask").repository, TestPlugins.CountedWordDefinitionRepository))
+
+	def test_reload_added_and_removed(self):
+		"""
+		check that added declarations can be resolved and removed declarations can not
+		"""
+		self._manager_.reload(self.create_configuration(declarations=[
+			Declare.ComponentDeclaration(u"RemoveTask", "TestPlugins", "RemoveWordDefinitionTask")]))
+
+		added = self._manager_.get_component(u"RemoveTask")
+
+		self._manager_.reload(self.create_configuration())
+
+		self.assertTrue(added is not None and self._manager_.get_component(u"RemoveTask") is None
+		                and len(self._manager_.get_components_of_type(UserTask)) == 2)
+
+	def test_reload_error(self):
+		"""
+		check that the previous configuration is kept when the new configuration can not be applied
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self._manager_.reload, self.create_configuration(
+			declarations=[Declare.ComponentDeclaration(u"RemoveTask", "TestPlugins", "RemoveWordDefinitionTask",
+			                                           [u"{Missing}"])]))
+
+		self.assertTrue(self._manager_.get_component(u"LookupTask") is not None)
+
+	def test_watch(self):
+		"""
+		check that manager watching a configuration file is reloaded when the file changes
+		"""
+		directory = tempfile.mkdtemp()
+		filePath = os.path.join(directory, "configuration.json")
+
+		try:
+			shutil.copy("configuration.json", filePath)
+
+			manager = Declare.Manager(Declare.Configuration.read(filePath))
+			watcher = manager.watch(filePath, 0.01)
+
+			try:
+				file = open(filePath, "r")
+				configurationObject = json.load(file)
+				file.close()
+
+				configurationObject["resources"]["AddWordTaskRepeat"] = False
+
+				file = open(filePath, "w")
+				json.dump(configurationObject, file)
+				file.close()
+
+				timeout = time.time() + 5
+
+				while manager.get_component("AddWordDefinitionTask").repeats() and time.time() < timeout:
+					time.sleep(0.01)
+			finally:
+				watcher.stop()
+
+			self.assertTrue(manager.get_component("AddWordDefinitionTask").repeats() == False
+			                and watcher.error() is None)
+		finally:
+			shutil.rmtree(directory)
+
+	def test_reload_failed(self):
+		"""
+		check that a failed reload leaves the components of the previous configuration as they are
+		"""
+		def create_configuration(declarations=()):
+			return Declare.Configuration({}, [
+				Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository",
+				                             lifetime="singleton", lazy=True),
+				Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+				                             [u"{Repository}"])] + list(declarations))
+
+		manager = Declare.Manager(create_configuration())
+
+		self.assertRaises(Declare.ComponentError, manager.reload, create_configuration([
+			Declare.ComponentDeclaration(u"Broken", "TestPlugins", "MissingPlugin", [u"{LookupTask}"])]))
+
+		self.assertTrue(manager.get_component(u"LookupTask").repository is manager.get_component(u"Repository"))
+
+
+class ManagerPoolTests(unittest.TestCase):
+	"""
+	Declare.Manager pooled component scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionParser.instances = 0
+
+	def create_manager(self, **options):
+		lifetimeOptions = {u"min": 2, u"max": 3, u"reset": u"clear", u"block": False}
+		lifetimeOptions.update(options)
+
+		return Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Parser", "TestPlugins", "WordDefinitionParser", lifetime="pooled",
+			                             lifetimeOptions=lifetimeOptions)]))
+
+	def test_pool_filled(self):
+		"""
+		check that pool is filled to its minimum size when the manager is created
+		"""
+		manager = self.create_manager()
+
+		stats = manager.pool_stats()[u"Parser"]
+
+		self.assertTrue(TestPlugins.WordDefinitionParser.instances == 2 and stats["size"] == 2
+		                and stats["idle"] == 2)
+
+	def test_released_instance_reused(self):
+		"""
+		check that released instance is reset and acquired again
+		"""
+		manager = self.create_manager(min=0)
+
+		first = manager.acquire(u"Parser")
+		first.parse(u"word: definition")
+		manager.release(u"Parser", first)
+
+		second = manager.acquire(u"Parser")
+		stats = manager.pool_stats()[u"Parser"]
+
+		self.assertTrue(first is second and second.buffer == [] and second.resets == 1
+		                and stats["acquisitions"] == 2 and stats["hits"] == 1 and stats["hit_rate"] == 0.5)
+
+	def test_pooled_context(self):
+		"""
+		check that instance acquired by context manager is released on exit
+		"""
+		manager = self.create_manager()
+
+		with manager.pooled(u"Parser") as parser:
+			word, definition = parser.parse(u"word: definition")
+			idle = manager.pool_stats()[u"Parser"]["idle"]
+
+		self.assertTrue(word == u"word" and definition == u"definition" and idle == 1
+		                and manager.pool_stats()[u"Parser"]["idle"] == 2)
+
+	def test_exhausted_pool(self):
+		"""
+		check that acquiring from exhausted pool fails fast when the pool does not block
+		"""
+		manager = self.create_manager()
+
+		for index in range(3):
+			manager.acquire(u"Parser")
+
+		self.assertRaises(Declare.ComponentError, manager.acquire, u"Parser")
+
+	def test_exhausted_pool_blocks(self):
+		"""
+		check that acquiring from exhausted blocking pool waits for an instance to be released
+		"""
+		manager = self.create_manager(min=0, max=1, block=True, timeout=5.0)
+		parser = manager.acquire(u"Parser")
+
+		timer = threading.Timer(0.02, manager.release, [u"Parser", parser])
+		timer.start()
+
+		acquired = manager.acquire(u"Parser")
+		timer.join()
+
+		stats = manager.pool_stats()[u"Parser"]
+
+		self.assertTrue(acquired is parser and stats["waits"] == 1 and stats["wait_time"] > 0)
+
+	def test_exhausted_pool_timeout(self):
+		"""
+		check that acquiring from exhausted blocking pool fails once the timeout expires
+		"""
+		manager = self.create_manager(min=0, max=1, block=True, timeout=0.01)
+		manager.acquire(u"Parser")
+
+		self.assertRaises(Declare.ComponentError, manager.acquire, u"Parser")
+
+	def test_release_unknown_instance(self):
+		"""
+		check that releasing an instance which was not acquired from the pool raises an error
+		"""
+		manager = self.create_manager()
+
+		self.assertRaises(Declare.ComponentError, manager.release, u"Parser", TestPlugins.WordDefinitionParser())
+
+	def test_get_pooled_component(self):
+		"""
+		check that pooled component can not be resolved without acquiring it
+		"""
+		self.assertRaises(Declare.ComponentError, self.create_manager().get_component, u"Parser")
+
+	def test_reference_to_pooled_component(self):
+		"""
+		check that reference to pooled component is reported when the manager is created
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Parser", "TestPlugins", "WordDefinitionParser", lifetime="pooled"),
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", [u"{Parser}"])]))
+
+	def test_invalid_pool_options(self):
+		"""
+		check that unknown pool option, invalid pool size and timeout are reported when the manager is created
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, size=2)
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, max=1)
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, max=u"3")
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, min=u"2")
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, timeout=u"1")
+		self.assertRaises(Declare.ComponentSpecificationError, self.create_manager, timeout=-1)
+
+	def test_components_of_type(self):
+		"""
+		check that queries of components by type leave pooled components out
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Lookup", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"],
+			                             lifetime="pooled"),
+			Declare.ComponentDeclaration(u"Add", "TestPlugins", "AddWordDefinitionTask")]))
+
+		self.assertEqual([TestPlugins.AddWordDefinitionTask],
+		                 [component.__class__ for component in manager.get_components_of_type(UserTask)])
+		self.assertEqual([TestPlugins.AddWordDefinitionTask],
+		                 [component.__class__ for component in manager.iter_components_of_type(UserTask)])
+		self.assertEqual([TestPlugins.AddWordDefinitionTask],
+		                 [component.__class__ for component in manager.provider_of_type(UserTask)()])
+		self.assertEqual([u"Add", u"Lookup"],
+		                 sorted(descriptor.identifier() for descriptor in manager.describe_components(UserTask)))
+
+
+class ManagerLazySingletonTests(unittest.TestCase):
+	"""
+	Declare.Manager lazy singleton scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+	def create_manager(self, lazy, repositoryLazy=None):
+		return Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton", lazy=repositoryLazy),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"],
+			                             lifetime="singleton")]), lazy)
+
+	def constructed(self):
+		return TestPlugins.CountedWordDefinitionRepository.instances
+
+	def test_lazy_singleton_not_constructed(self):
+		"""
+		check that lazy singletons are not constructed when the manager is created
+		"""
+		self.create_manager(True)
+
+		self.assertTrue(self.constructed() == 0)
+
+	def test_lazy_singleton_constructed_once(self):
+		"""
+		check that lazy singleton is constructed on first use and reused afterwards
+		"""
+		manager = self.create_manager(True)
+
+		repository = manager.get_component(u"Repository")
+
+		self.assertTrue(manager.get_component(u"Repository") is repository and self.constructed() == 1)
+
+	def test_lazy_singleton_by_reference(self):
+		"""
+		check that lazy singleton is constructed when a component referencing it is constructed
+		"""
+		manager = self.create_manager(True)
+
+		task = manager.get_component(u"LookupTask")
+
+		self.assertTrue(task.repository is manager.get_component(u"Repository") and self.constructed() == 1)
+
+	def test_lazy_singleton_by_type(self):
+		"""
+		check that type query constructs matching lazy singletons only
+		"""
+		manager = self.create_manager(True)
+
+		tasks = manager.get_components_of_type(UserTask, "singleton")
+
+		self.assertTrue(len(tasks) == 1 and tasks[0].repository is not None and self.constructed() == 1)
+
+	def test_declaration_overrides_manager(self):
+		"""
+		check that declaration lazy setting overrides manager lazy setting
+		"""
+		self.create_manager(True, False)
+
+		self.assertTrue(self.constructed() == 1)
+
+	def test_iter_lazy_components_of_type(self):
+		"""
+		check that iterating components of type constructs lazy singletons only when they are reached
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton"),
+			Declare.ComponentDeclaration(u"OtherRepository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton")]), True)
+
+		components = manager.iter_components_of_type(TestPlugins.WordDefinitionRepository, ordered=True)
+
+		next(components)
+
+		self.assertTrue(self.constructed() == 1)
+
+	def test_describe_lazy_components_by_tag(self):
+		"""
+		check that describing components by tag does not process lazy declarations
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Missing", "MissingTestPlugins", "MissingTask", tags=[u"missing"])]), True)
+
+		descriptors = manager.describe_components(tag=u"missing")
+
+		self.assertTrue(len(descriptors) == 1 and descriptors[0].type() is None)
+
+	def test_lazy_singleton_registered_concurrently(self):
+		"""
+		check that a lazy singleton is resolved when another thread registers it while it is looked up
+		"""
+		manager = self.create_manager(True)
+		container = manager.__container__
+		registered = []
+
+		class PendingDeclarations(dict):
+			def has_key(self, identifier):
+				# the declaration is registered by another thread just before it is looked up as pending
+				if dict.__contains__(self, identifier) and not registered:
+					registered.append(identifier)
+					container.__processPendingDeclaration__(identifier)
+
+				return dict.__contains__(self, identifier)
+
+			__contains__ = has_key
+
+		container.__pending_declarations__ = PendingDeclarations(container.__pending_declarations__)
+
+		self.assertTrue(manager.get_component(u"Repository") is not None and registered == [u"Repository"])
+
+
+class ManagerConcurrencyTests(unittest.TestCase):
+	"""
+	Declare.Manager concurrent resolution scenarios
+	"""
+
+	THREADS = 16
+
+	def setUp(self):
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+	def resolve_concurrently(self, resolve):
+		started = threading.Event()
+		results = []
+
+		def run():
+			started.wait()
+			results.append(resolve())
+
+		threads = [threading.Thread(target=run) for index in range(self.THREADS)]
+
+		for thread in threads:
+			thread.start()
+
+		started.set()
+
+		for thread in threads:
+			thread.join()
+
+		return results
+
+	def test_lazy_singleton_constructed_once(self):
+		"""
+		check that lazy singleton resolved by many threads at once is constructed exactly once
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository",
+			                             lifetime="singleton")]), True)
+
+		repositories = self.resolve_concurrently(lambda: manager.get_component(u"Repository"))
+
+		self.assertTrue(len(repositories) == self.THREADS and TestPlugins.CountedWordDefinitionRepository.instances == 1
+		                and all(repository is repositories[0] for repository in repositories))
+
+	def test_referenced_lazy_singleton_constructed_once(self):
+		"""
+		check that lazy singleton referenced by components constructed by many threads is constructed exactly once
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository",
+			                             lifetime="singleton"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+			                             [u"{Repository}"])]), True)
+
+		tasks = self.resolve_concurrently(lambda: manager.get_components_of_type(Searchable)[0])
+
+		self.assertTrue(len(tasks) == self.THREADS and TestPlugins.CountedWordDefinitionRepository.instances == 1
+		                and all(task.repository is tasks[0].repository for task in tasks))
+
+	def test_lazy_pool_acquired_while_singleton_constructed(self):
+		"""
+		check that a lazy pool is acquired while another thread constructs a singleton its instances reference, and
+		which references a lazy declaration
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Merger", "TestPlugins", "WordDefinitionMerger",
+			                             [u"{Repository}", u"{Definitions}"], lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository"),
+			Declare.ComponentDeclaration(u"Definitions", "TestPlugins", "WordDefinitionRepository"),
+			Declare.ComponentDeclaration(u"Connection", "TestPlugins", "WordDefinitionConnection", [u"{Merger}"],
+			                             lifetime="pooled", lifetimeOptions={"min": 1})]), True)
+		manager.get_component(u"Repository")
+
+		delay = TestPlugins.SlowWordDefinitionRepository.delay
+		# the singleton is constructed until the pool is acquired
+		TestPlugins.SlowWordDefinitionRepository.delay = 0.2
+		results = []
+
+		try:
+			threads = [threading.Thread(target=lambda: results.append(manager.get_component(u"Merger"))),
+			           threading.Thread(target=lambda: results.append(manager.acquire(u"Connection")))]
+
+			for thread in threads:
+				thread.daemon = True
+				thread.start()
+				time.sleep(0.05)
+
+			for thread in threads:
+				thread.join(5.0)
+		finally:
+			TestPlugins.SlowWordDefinitionRepository.delay = delay
+
+		self.assertEqual(2, len(results))
+
+
+@unittest.skipIf(Declare.asyncio is None, "neither asyncio nor trollius is available")
+class ManagerAsyncTests(unittest.TestCase):
+	"""
+	Declare.Manager asynchronous resolution scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+		self._loop_ = Declare.asyncio.new_event_loop()
+		Declare.asyncio.set_event_loop(self._loop_)
+
+		self._manager_ = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "AsyncWordDefinitionRepository",
+			                             lifetime="singleton", asyncInit=u"load"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"])
+		]))
+
+	def tearDown(self):
+		self._loop_.close()
+		Declare.asyncio.set_event_loop(None)
+
+	def test_singleton_async(self):
+		"""
+		check that singleton with asynchronous initializer is initialized and then available synchronously
+		"""
+		repository = self._loop_.run_until_complete(self._manager_.get_component_async(u"Repository"))
+
+		self.assertTrue(repository.loaded and self._manager_.get_component(u"Repository") is repository)
+
+	def test_singleton_async_required(self):
+		"""
+		check that singleton with asynchronous initializer can not be resolved synchronously before initialization
+		"""
+		self.assertRaises(Declare.ComponentError, self._manager_.get_component, u"Repository")
+
+	def test_singleton_async_shared(self):
+		"""
+		check that concurrent asynchronous resolutions of a singleton share one construction
+		"""
+		repositories = self._loop_.run_until_complete(Declare.asyncio.gather(
+			self._manager_.get_component_async(u"Repository"), self._manager_.get_component_async(u"Repository")))
+
+		self.assertTrue(repositories[0] is repositories[1]
+		                and TestPlugins.CountedWordDefinitionRepository.instances == 1)
+
+	def test_reference_async(self):
+		"""
+		check that singleton with asynchronous initializer is initialized before a component referencing it
+		"""
+		task = self._loop_.run_until_complete(self._manager_.get_component_async(u"LookupTask"))
+
+		self.assertTrue(task.repository.loaded)
+
+	def test_components_of_type_async(self):
+		"""
+		check that components of type are resolved asynchronously
+		"""
+		repositories = self._loop_.run_until_complete(
+			self._manager_.get_components_of_type_async(TestPlugins.WordDefinitionRepository))
+
+		self.assertTrue(len(repositories) == 1 and repositories[0].loaded)
+
+	def test_initialize_async(self):
+		"""
+		check that eager singletons with asynchronous initializer are initialized by initialize_async
+		"""
+		self._loop_.run_until_complete(self._manager_.initialize_async())
+
+		self.assertTrue(self._manager_.get_component(u"Repository").loaded)
+
+	def test_non_singleton_async_reference(self):
+		"""
+		check that reference to non singleton with asynchronous initializer is reported
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "AsyncWordDefinitionRepository",
+			                             asyncInit=u"load"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+			                             [u"{Repository}"])]))
+
+
+class ManagerAsyncRequirementTests(unittest.TestCase):
+	"""
+	Declare.Manager asynchronous resolution requirements, which are checked on every Python version
+	"""
+
+	def test_trollius_fallback(self):
+		"""
+		check that trollius is used for asynchronous resolution on Python 2, where asyncio is not available
+		"""
+		if sys.version_info[0] > 2:
+			self.skipTest("asyncio is available")
+
+		try:
+			import trollius
+		except ImportError:
+			self.skipTest("trollius is not installed")
+
+		self.assertTrue(Declare.asyncio is trollius)
+
+	def test_requires_asyncio(self):
+		"""
+		check that asynchronous resolution without asyncio or trollius raises ComponentError
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository",
+			                             lifetime="singleton")]))
+		asyncio = Declare.asyncio
+		Declare.asyncio = None
+
+		try:
+			self.assertRaises(Declare.ComponentError, manager.get_component_async, u"Repository")
+			self.assertRaises(Declare.ComponentError, manager.initialize_async)
+		finally:
+			Declare.asyncio = asyncio
+
+
+class ManagerTypeIndexTests(unittest.TestCase):
+	"""
+	Declare.Manager component by type scenarios
+	"""
+
+	def setUp(self):
+		self._manager_ = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"SortedListTask", "TestPlugins", "SortedListWordDefinitionsTask",
+			                             lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask",
+			                             [u"{Repository}"])]))
+
+	def test_components_of_indirect_base_type(self):
+		"""
+		check that components are found by a base type which is not a direct base of their class
+		"""
+		tasks = self._manager_.get_components_of_type(UserTask, "singleton")
+
+		self.assertTrue(len(tasks) == 1 and tasks[0].__task_name__ == "SortedListWordDefinitionsTask")
+
+	def test_components_of_virtual_base_type(self):
+		"""
+		check that components are found by an abstract base class their class is registered with
+		"""
+		tasks = self._manager_.get_components_of_type(Searchable)
+
+		self.assertTrue(len(tasks) == 1 and isinstance(tasks[0], TestPlugins.LookupWordDefinitionTask))
+
+	def test_components_of_type_after_registration(self):
+		"""
+		check that cached result of type query reflects a later virtual subclass registration
+		"""
+		class Storage(object):
+			__metaclass__ = abc.ABCMeta
+
+		before = self._manager_.get_components_of_type(Storage)
+
+		Storage.register(TestPlugins.WordDefinitionRepository)
+
+		after = self._manager_.get_components_of_type(Storage)
+
+		self.assertTrue(len(before) == 0 and len(after) == 1)
+
+	def test_components_of_type_new_instances(self):
+		"""
+		check that repeated type queries construct new non singleton instances
+		"""
+		first = self._manager_.get_components_of_type(TestPlugins.WordDefinitionRepository, "")
+		second = self._manager_.get_components_of_type(TestPlugins.WordDefinitionRepository, "")
+
+		self.assertTrue(len(first) == 1 and len(second) == 1 and first[0] is not second[0])
+
+
+class CompiledManagerTypeIndexTests(ManagerTypeIndexTests):
+	"""
+	Declare.Manager component by type scenarios against compiled container
+	"""
+
+	def setUp(self):
+		ManagerTypeIndexTests.setUp(self)
+
+		self._manager_ = compile_manager(self._manager_)
+
+
+class ManagerModuleLoadingTests(unittest.TestCase):
+	"""
+	Declare.Manager plugin module loading scenarios
+	"""
+
+	def test_dotted_module_name(self):
+		"""
+		check that component class can be found in a module of a package
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Decoder", "json.decoder", "JSONDecoder")]))
+
+		self.assertTrue(isinstance(manager.get_component(u"Decoder"), json.decoder.JSONDecoder))
+
+	def test_lazy_declaration_module_not_imported(self):
+		"""
+		check that module of a lazy declaration is only imported when the declaration is resolved
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Missing", "MissingTestPlugins", "MissingTask")]), True)
+
+		self.assertRaises(ImportError, manager.get_component, u"Missing")
+
+	def test_module_import_times(self):
+		"""
+		check that import time is recorded for modules imported by the manager only
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Decoder", "json.decoder", "JSONDecoder"),
+			Declare.ComponentDeclaration(u"Packer", "xdrlib", "Packer")]))
+
+		importTimes = manager.module_import_times()
+
+		self.assertTrue(not importTimes.has_key("json.decoder") and importTimes.has_key("xdrlib"))
+
+
+class ManagerScopeTests(unittest.TestCase):
+	"""
+	Declare.Manager scoped component scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionSession.closed = []
+
+		self.manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="scoped",
+			                             lifetimeOptions={u"dispose": u"close"}),
+			Declare.ComponentDeclaration(u"ChildSession", "TestPlugins", "WordDefinitionSession",
+			                             [u"{Session}"], lifetime="scoped", lifetimeOptions={u"dispose": u"close"}),
+			Declare.ComponentDeclaration(u"Task", "TestPlugins", "WordDefinitionSession", [u"{ChildSession}"])]))
+
+	def test_instance_shared_in_scope(self):
+		"""
+		check that scoped component is constructed once per scope, including when it is referenced
+		"""
+		with self.manager.scope():
+			session = self.manager.get_component(u"Session")
+			task = self.manager.get_component(u"Task")
+
+			self.assertTrue(session is self.manager.get_component(u"Session") and task.parent.parent is session
+			                and task is not self.manager.get_component(u"Task"))
+
+	def test_new_instance_in_other_scope(self):
+		"""
+		check that each scope has its own instance, including nested scopes
+		"""
+		with self.manager.scope():
+			first = self.manager.get_component(u"Session")
+
+			with self.manager.scope():
+				nested = self.manager.get_component(u"Session")
+
+			self.assertTrue(first is self.manager.get_component(u"Session"))
+
+		with self.manager.scope():
+			second = self.manager.get_component(u"Session")
+
+		self.assertTrue(first is not nested and first is not second)
+
+	def test_disposed_in_reverse_order(self):
+		"""
+		check that scoped instances are disposed in reverse order of construction when the scope exits
+		"""
+		with self.manager.scope():
+			child = self.manager.get_component(u"ChildSession")
+			closed = list(TestPlugins.WordDefinitionSession.closed)
+
+		self.assertEqual([], closed)
+		self.assertEqual([child, child.parent], TestPlugins.WordDefinitionSession.closed)
+
+	def test_disposed_by_close(self):
+		"""
+		check that scoped instances without a dispose option are disposed by their close method, unless the option
+		is null
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="scoped"),
+			Declare.ComponentDeclaration(u"Kept", "TestPlugins", "WordDefinitionSession", lifetime="scoped",
+			                             lifetimeOptions={u"dispose": None})]))
+
+		with manager.scope():
+			session = manager.get_component(u"Session")
+			manager.get_component(u"Kept")
+
+		self.assertEqual([session], TestPlugins.WordDefinitionSession.closed)
+
+	def test_disposed_on_error(self):
+		"""
+		check that scoped instances are disposed when the scope exits with an error
+		"""
+		try:
+			with self.manager.scope():
+				session = self.manager.get_component(u"Session")
+				raise ValueError()
+		except ValueError:
+			pass
+
+		self.assertEqual([session], TestPlugins.WordDefinitionSession.closed)
+
+	def test_outside_scope(self):
+		"""
+		check that resolving scoped component, directly or through a reference, outside a scope fails
+		"""
+		self.assertRaises(Declare.ComponentError, self.manager.get_component, u"Session")
+		self.assertRaises(Declare.ComponentError, self.manager.get_component, u"Task")
+
+	def test_scope_shared_by_threads(self):
+		"""
+		check that scope entered by several threads shares its instances and is disposed when the last exits
+		"""
+		scope = self.manager.scope()
+		sessions = []
+
+		def resolve():
+			with scope:
+				sessions.append(self.manager.get_component(u"Session"))
+
+		with scope:
+			thread = threading.Thread(target=resolve)
+			thread.start()
+			thread.join()
+
+			session = self.manager.get_component(u"Session")
+			closed = list(TestPlugins.WordDefinitionSession.closed)
+
+		self.assertTrue(sessions == [session] and closed == [])
+		self.assertEqual([session], TestPlugins.WordDefinitionSession.closed)
+
+	def test_singleton_referencing_scoped(self):
+		"""
+		check that singleton referencing scoped component, directly or indirectly, is rejected
+		"""
+		for reference in [u"{Session}", u"{Task}"]:
+			self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+				Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="scoped"),
+				Declare.ComponentDeclaration(u"Task", "TestPlugins", "WordDefinitionSession", [u"{Session}"]),
+				Declare.ComponentDeclaration(u"Shared", "TestPlugins", "WordDefinitionSession", [reference],
+				                             lifetime="singleton")]))
+
+	def test_unknown_option(self):
+		"""
+		check that unknown scoped lifetime option is rejected
+		"""
+		self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="scoped",
+			                             lifetimeOptions={u"max": 1})]))
+
+	def test_components_of_type(self):
+		"""
+		check that queries of components by type leave scoped components out outside of a scope
+		"""
+		manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="scoped"),
+			Declare.ComponentDeclaration(u"Other", "TestPlugins", "WordDefinitionSession")]))
+		provider = manager.provider_of_type(TestPlugins.WordDefinitionSession)
+
+		self.assertEqual(1, len(manager.get_components_of_type(TestPlugins.WordDefinitionSession)))
+		self.assertEqual(1, len(list(manager.iter_components_of_type(TestPlugins.WordDefinitionSession))))
+		self.assertEqual(1, len(provider()))
+
+		with manager.scope():
+			session = manager.get_component(u"Session")
+
+			self.assertTrue(session in manager.get_components_of_type(TestPlugins.WordDefinitionSession))
+			self.assertTrue(session in provider())
+
+
+class ManagerGraphTests(unittest.TestCase):
+	"""
+	Declare.Manager per graph component scenarios
+	"""
+
+	def create_manager(self, lifetime=""):
+		return Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="per_graph"),
+			Declare.ComponentDeclaration(u"First", "TestPlugins", "WordDefinitionSession", [u"{Session}"]),
+			Declare.ComponentDeclaration(u"Second", "TestPlugins", "WordDefinitionSession", [u"{Session}"]),
+			Declare.ComponentDeclaration(u"Merger", "TestPlugins", "WordDefinitionMerger",
+			                             [u"{First}", u"{Second}"], lifetime=lifetime)]))
+
+	def test_shared_in_graph(self):
+		"""
+		check that per graph component is constructed once per resolved graph
+		"""
+		manager = self.create_manager()
+
+		merger = manager.get_component(u"Merger")
+		other = manager.get_component(u"Merger")
+
+		self.assertTrue(merger.first.parent is merger.second.parent and merger.first is not merger.second
+		                and other.first.parent is not merger.first.parent)
+
+	def test_resolved_directly(self):
+		"""
+		check that per graph component resolved directly is constructed on each resolution
+		"""
+		manager = self.create_manager()
+
+		self.assertTrue(manager.get_component(u"Session") is not manager.get_component(u"Session")
+		                and manager.get_component(u"First").parent is not manager.get_component(u"First").parent)
+
+	def test_shared_in_singleton_graph(self):
+		"""
+		check that per graph component is shared by the graph of a singleton
+		"""
+		merger = self.create_manager(u"singleton").get_component(u"Merger")
+
+		self.assertTrue(merger.first.parent is merger.second.parent)
+
+	def test_nesting_too_deep(self):
+		"""
+		check that references nested deeper than the recursion limit allows are reported with their path
+		"""
+		declarations = [Declare.ComponentDeclaration(u"Session0", "TestPlugins", "WordDefinitionSession")]
+
+		for index in range(1, sys.getrecursionlimit()):
+			declarations.append(Declare.ComponentDeclaration(u"Session%d" % index, "TestPlugins",
+			                                                 "WordDefinitionSession", [u"{Session%d}" % (index - 1)]))
+
+		try:
+			Declare.Manager(Declare.Configuration({}, declarations))
+		except Declare.ComponentSpecificationError as error:
+			self.assertTrue(u"Session1 -> Session0" in str(error))
+		else:
+			self.fail("nesting was not reported")
+
+	def test_transient_chain(self):
+		"""
+		check that chains of transient components, whose resolution takes few stack frames, are nested deeper than
+		other chains
+		"""
+		declarations = [Declare.ComponentDeclaration(u"Session0", "TestPlugins", "WordDefinitionSession")]
+
+		for index in range(1, sys.getrecursionlimit() // 3):
+			declarations.append(Declare.ComponentDeclaration(u"Session%d" % index, "TestPlugins",
+			                                                 "WordDefinitionSession", [u"{Session%d}" % (index - 1)]))
+
+		manager = Declare.Manager(Declare.Configuration({}, declarations))
+
+		self.assertTrue(manager.get_component(declarations[-1].identifier()).parent is not None)
+		self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager,
+		                  Declare.Configuration({}, declarations), True)
+
+	def test_eager_singleton_chain(self):
+		"""
+		check that references to eager singletons, which are constructed in dependency order, are not nested
+		"""
+		declarations = [Declare.ComponentDeclaration(u"Repository0", "TestPlugins", "WordDefinitionRepository",
+		                                             lifetime="singleton")]
+
+		for index in range(1, sys.getrecursionlimit()):
+			declarations.append(Declare.ComponentDeclaration(u"Repository%d" % index, "TestPlugins",
+			                                                 "WordDefinitionRepository",
+			                                                 [u"{Repository%d}" % (index - 1)], lifetime="singleton"))
+
+		manager = Declare.Manager(Declare.Configuration({}, declarations))
+
+		self.assertTrue(manager.get_component(u"Repository2").definitions is manager.get_component(u"Repository1"))
+		self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager,
+		                  Declare.Configuration({}, declarations), True)
+
+
+class ManagerCacheTests(unittest.TestCase):
+	"""
+	Declare.Manager cached component scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionTable.instances = 0
+		TestPlugins.WordDefinitionTable.failing = False
+
+	def create_configuration(self, **options):
+		lifetimeOptions = {u"ttl": 60}
+		lifetimeOptions.update(options)
+
+		return Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable", lifetime="cached",
+			                             lifetimeOptions=lifetimeOptions),
+			Declare.ComponentDeclaration(u"OtherTable", "TestPlugins", "WordDefinitionTable", lifetime="cached",
+			                             lifetimeOptions={u"ttl": 60})])
+
+	def wait_for_refresh(self, manager, count=1):
+		for attempt in range(200):
+			if manager.cache_stats()[u"Table"]["refreshes"] + manager.cache_stats()[u"Table"]["refresh_failures"] \
+					>= count:
+				return
+
+			time.sleep(0.01)
+
+		self.fail("instance was not refreshed")
+
+	def test_instance_cached(self):
+		"""
+		check that cached instance is shared until it expires
+		"""
+		manager = Declare.Manager(self.create_configuration())
+
+		table = manager.get_component(u"Table")
+		stats = manager.cache_stats()[u"Table"]
+
+		self.assertTrue(table is manager.get_component(u"Table") and TestPlugins.WordDefinitionTable.instances == 1)
+		self.assertTrue(stats["misses"] == 1 and stats["hits"] == 0 and stats["cached"])
+		self.assertEqual(1, manager.cache_stats()[u"Table"]["hits"])
+
+	def test_expired_instance_refreshed(self):
+		"""
+		check that expired instance is returned while it is refreshed in the background
+		"""
+		manager = Declare.Manager(self.create_configuration(ttl=0.01))
+
+		table = manager.get_component(u"Table")
+		time.sleep(0.02)
+		stale = manager.get_component(u"Table")
+		self.wait_for_refresh(manager)
+		stats = manager.cache_stats()[u"Table"]
+
+		self.assertTrue(stale is table and manager.get_component(u"Table") is not table
+		                and stats["stale_hits"] == 1 and stats["misses"] == 1)
+
+	def test_stale_instance_not_used(self):
+		"""
+		check that instance is constructed on resolution once it has been expired for longer than the stale time
+		"""
+		manager = Declare.Manager(self.create_configuration(ttl=0.01, stale=0))
+
+		table = manager.get_component(u"Table")
+		time.sleep(0.02)
+
+		self.assertTrue(manager.get_component(u"Table") is not table
+		                and manager.cache_stats()[u"Table"]["misses"] == 2)
+
+	def test_failed_refresh(self):
+		"""
+		check that expired instance is used until refreshing it succeeds
+		"""
+		manager = Declare.Manager(self.create_configuration(ttl=0.01))
+
+		table = manager.get_component(u"Table")
+		TestPlugins.WordDefinitionTable.failing = True
+		time.sleep(0.02)
+		manager.get_component(u"Table")
+		self.wait_for_refresh(manager)
+		stats = manager.cache_stats()[u"Table"]
+
+		self.assertTrue(manager.get_component(u"Table") is table and stats["refresh_failures"] == 1
+		                and stats["refreshes"] == 0)
+
+	def test_least_recently_used_evicted(self):
+		"""
+		check that least recently used instance is evicted when the cache is full
+		"""
+		manager = Declare.Manager(self.create_configuration(), cacheSize=1)
+
+		table = manager.get_component(u"Table")
+		manager.get_component(u"OtherTable")
+		stats = manager.cache_stats()
+
+		self.assertTrue(stats[u"Table"]["evictions"] == 1 and not stats[u"Table"]["cached"]
+		                and stats[u"OtherTable"]["cached"] and manager.get_component(u"Table") is not table)
+
+	def test_clear_cache(self):
+		"""
+		check that clearing the cache evicts all instances
+		"""
+		manager = Declare.Manager(self.create_configuration())
+
+		table = manager.get_component(u"Table")
+		manager.get_component(u"OtherTable")
+
+		self.assertTrue(manager.clear_cache() == 2 and manager.get_component(u"Table") is not table)
+
+	def test_kept_on_reload(self):
+		"""
+		check that cached instance of a declaration which did not change is kept when the configuration is reloaded
+		"""
+		manager = Declare.Manager(self.create_configuration())
+
+		table = manager.get_component(u"Table")
+		other = manager.get_component(u"OtherTable")
+		manager.reload(self.create_configuration(ttl=30))
+
+		self.assertTrue(manager.get_component(u"OtherTable") is other and manager.get_component(u"Table") is not table)
+
+	def test_invalid_times(self):
+		"""
+		check that declaration without positive ttl or with negative stale time is rejected
+		"""
+		for options in [{u"ttl": 0}, {u"ttl": u"60"}, {u"ttl": 60, u"stale": -1}, {u"ttl": 60, u"size": 1}]:
+			self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+				Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable", lifetime="cached",
+				                             lifetimeOptions=options)]))
+
+
+class ManagerLazyReferenceTests(unittest.TestCase):
+	"""
+	Declare.Manager lazy reference scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+	def create_manager(self, lifetime="", lazy=False):
+		return Declare.Manager(Declare.Configuration({u"Definitions": {u"word": u"definition"}}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository",
+			                             [u"{$Definitions}"], lifetime=lifetime),
+			Declare.ComponentDeclaration(u"Task", "TestPlugins", "LookupWordDefinitionTask", [u"{~Repository}"])]),
+			lazy=lazy)
+
+	def test_resolved_on_first_use(self):
+		"""
+		check that component referenced lazily is constructed on first use of the proxy
+		"""
+		manager = self.create_manager()
+
+		task = manager.get_component(u"Task")
+		instances = TestPlugins.CountedWordDefinitionRepository.instances
+
+		self.assertTrue(instances == 0 and task.repository.definitions == {u"word": u"definition"}
+		                and isinstance(task.repository, TestPlugins.WordDefinitionRepository)
+		                and task.repository.definitions is task.repository.definitions
+		                and TestPlugins.CountedWordDefinitionRepository.instances == 1)
+
+	def test_lazy_singleton(self):
+		"""
+		check that lazy singleton referenced lazily is constructed on first use of the proxy
+		"""
+		manager = self.create_manager(u"singleton", lazy=True)
+
+		task = manager.get_component(u"Task")
+		instances = TestPlugins.CountedWordDefinitionRepository.instances
+		task.repository.definitions = {}
+
+		self.assertTrue(instances == 0 and manager.get_component(u"Repository").definitions == {}
+		                and TestPlugins.CountedWordDefinitionRepository.instances == 1)
+
+	def test_singleton(self):
+		"""
+		check that proxy of singleton forwards to the singleton
+		"""
+		manager = self.create_manager(u"singleton")
+		repository = manager.get_component(u"Task").repository
+
+		self.assertTrue(repository.definitions is manager.get_component(u"Repository").definitions
+		                and repository == manager.get_component(u"Repository")
+		                and TestPlugins.CountedWordDefinitionRepository.instances == 1)
+
+	def test_first_use_by_threads(self):
+		"""
+		check that component referenced lazily is resolved once when the proxy is first used by several threads
+		"""
+		task = self.create_manager().get_component(u"Task")
+		definitions = []
+
+		def use():
+			definitions.append(task.repository.definitions)
+
+		threads = [threading.Thread(target=use) for index in range(4)]
+
+		for thread in threads:
+			thread.start()
+
+		for thread in threads:
+			thread.join()
+
+		self.assertTrue(TestPlugins.CountedWordDefinitionRepository.instances == 1 and len(definitions) == 4
+		                and all(value is definitions[0] for value in definitions))
+
+
+class CompiledManagerLazyReferenceTests(ManagerLazyReferenceTests):
+	"""
+	Declare.Manager lazy reference scenarios against compiled container
+	"""
+
+	def create_manager(self, lifetime="", lazy=False):
+		manager = compile_manager(ManagerLazyReferenceTests.create_manager(self, lifetime, True))
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+		return manager if lazy else manager.__class__()
+
+
+class ManagerProcessTests(unittest.TestCase):
+	"""
+	Declare.Manager per process component and warmup scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionTable.instances = 0
+		TestPlugins.WordDefinitionTable.failing = False
+		TestPlugins.CountedWordDefinitionRepository.instances = 0
+
+		self.manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable", lifetime="per_process"),
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", [u"{Table}"]),
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton")]), lazy=True)
+
+	def test_shared_in_process(self):
+		"""
+		check that per process component is constructed once in a process
+		"""
+		table = self.manager.get_component(u"Table")
+
+		self.assertTrue(self.manager.get_component(u"Session").parent is table
+		                and TestPlugins.WordDefinitionTable.instances == 1)
+
+	@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+	def test_constructed_in_forked_process(self):
+		"""
+		check that per process component constructed before a fork is constructed again in the forked process
+		"""
+		table = self.manager.get_component(u"Table")
+		reader, writer = os.pipe()
+		processId = os.fork()
+
+		if processId == 0:
+			try:
+				child = self.manager.get_component(u"Table")
+				os.write(writer, b"1" if child is not table and self.manager.get_component(u"Table") is child
+				         else b"0")
+			finally:
+				os._exit(0)
+
+		os.close(writer)
+		result = os.read(reader, 1)
+		os.close(reader)
+		os.waitpid(processId, 0)
+
+		self.assertTrue(result == b"1" and self.manager.get_component(u"Table") is table)
+
+	def test_warmup(self):
+		"""
+		check that warmup constructs singletons and not per process components
+		"""
+		constructed = self.manager.warmup()
+
+		self.assertTrue(constructed == [u"Repository"] and TestPlugins.CountedWordDefinitionRepository.instances == 1
+		                and TestPlugins.WordDefinitionTable.instances == 0 and self.manager.warmup() == [])
+
+	def test_singleton_referencing_per_process(self):
+		"""
+		check that singleton referencing per process component, directly or indirectly, is rejected
+		"""
+		for reference in [u"{Table}", u"{Session}"]:
+			self.assertRaises(Declare.ComponentSpecificationError, Declare.Manager, Declare.Configuration({}, [
+				Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable", lifetime="per_process"),
+				Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", [u"{Table}"]),
+				Declare.ComponentDeclaration(u"Shared", "TestPlugins", "WordDefinitionSession", [reference],
+				                             lifetime="singleton")]))
+
+
+class ManagerChildTests(unittest.TestCase):
+	"""
+	Declare.Manager child manager scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionTable.instances = 0
+		TestPlugins.WordDefinitionTable.failing = False
+
+		self.manager = Declare.Manager(Declare.Configuration({u"Definitions": {u"word": u"definition"}}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository",
+			                             [u"{$Definitions}"], lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Lookup", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"]),
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Merger", "TestPlugins", "WordDefinitionMerger", [u"{Table}", u"{Lookup}"])]))
+
+	def test_overridden_resource(self):
+		child = self.manager.child(Declare.Configuration({u"Definitions": {u"other": u"definition"}}, []))
+
+		self.assertEqual([u"Lookup", u"Merger", u"Repository"],
+		                 sorted(declaration.identifier() for declaration in child.configuration().plugins()))
+		self.assertEqual({u"other": u"definition"}, child.get_component(u"Repository").definitions)
+		self.assertIs(child.get_component(u"Repository"), child.get_component(u"Merger").second.repository)
+		self.assertIs(self.manager.get_component(u"Table"), child.get_component(u"Table"))
+		self.assertIs(self.manager.get_component(u"Table"), child.get_component(u"Merger").first)
+		self.assertEqual({u"word": u"definition"}, self.manager.get_component(u"Repository").definitions)
+		self.assertEqual(1, TestPlugins.WordDefinitionTable.instances)
+
+	def test_unchanged_resource(self):
+		child = self.manager.child(Declare.Configuration({u"Definitions": {u"word": u"definition"}}, []))
+
+		self.assertEqual([], list(child.configuration().plugins()))
+		self.assertIs(self.manager.get_component(u"Repository"), child.get_component(u"Repository"))
+		self.assertIsInstance(child.get_component(u"Lookup"), TestPlugins.LookupWordDefinitionTask)
+
+	def test_overridden_declaration(self):
+		child = self.manager.child(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionParser", lifetime="singleton")]))
+
+		self.assertEqual([u"Merger", u"Table"],
+		                 sorted(declaration.identifier() for declaration in child.configuration().plugins()))
+		self.assertIsInstance(child.get_component(u"Merger").first, TestPlugins.WordDefinitionParser)
+		self.assertIsInstance(self.manager.get_component(u"Merger").first, TestPlugins.WordDefinitionTable)
+		self.assertIs(self.manager.get_component(u"Repository"), child.get_component(u"Merger").second.repository)
+
+	def test_components_of_type(self):
+		child = self.manager.child(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "CountedWordDefinitionRepository",
+			                             lifetime="singleton")]))
+
+		repositories = child.get_components_of_type(TestPlugins.WordDefinitionRepository)
+
+		self.assertEqual(1, len(repositories))
+		self.assertIs(child.get_component(u"Repository"), repositories[0])
+		self.assertEqual([child.get_component(u"Repository")],
+		                 list(child.iter_components_of_type(TestPlugins.WordDefinitionRepository)))
+		self.assertEqual([self.manager.get_component(u"Table")],
+		                 child.get_components_of_type(TestPlugins.WordDefinitionTable))
+		self.assertEqual(sorted(descriptor.identifier() for descriptor in self.manager.describe_components()),
+		                 sorted(descriptor.identifier() for descriptor in child.describe_components()))
+		self.assertIs(TestPlugins.CountedWordDefinitionRepository, child.describe_component(u"Repository").type())
+		self.assertIs(self.manager.describe_component(u"Table"), child.describe_component(u"Table"))
+
+	def test_nested_child(self):
+		child = self.manager.child(Declare.Configuration({u"Definitions": {u"other": u"definition"}}, []))
+		nested = child.child(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionParser", lifetime="singleton")]))
+
+		self.assertIs(child, nested.parent())
+		self.assertIs(child.get_component(u"Repository"), nested.get_component(u"Repository"))
+		self.assertEqual({u"other": u"definition"}, nested.get_component(u"Merger").second.repository.definitions)
+		self.assertIsInstance(nested.get_component(u"Merger").first, TestPlugins.WordDefinitionParser)
+
+	def test_reload(self):
+		child = self.manager.child(Declare.Configuration({u"Definitions": {u"other": u"definition"}}, []))
+		repository = child.get_component(u"Repository")
+
+		self.assertEqual(set(), child.reload(Declare.Configuration({u"Definitions": {u"other": u"definition"}}, [])))
+		self.assertIs(repository, child.get_component(u"Repository"))
+
+		child.reload(Declare.Configuration({}, []))
+
+		self.assertIs(self.manager.get_component(u"Repository"), child.get_component(u"Repository"))
+
+	def test_compile(self):
+		child = self.manager.child(Declare.Configuration({}, []))
+
+		self.assertRaises(Declare.ComponentError, child.compile, os.path.join(tempfile.gettempdir(), "Child.py"))
+
+
+class ManagerCloseTests(unittest.TestCase):
+	"""
+	Declare.Manager close scenarios
+	"""
+
+	def setUp(self):
+		TestPlugins.WordDefinitionConnection.closed = []
+		TestPlugins.WordDefinitionConnection.delay = 0
+		TestPlugins.WordDefinitionConnection.failing = False
+		TestPlugins.WordDefinitionSession.closed = []
+
+		self.manager = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Connection", "TestPlugins", "WordDefinitionConnection", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Lookup", "TestPlugins", "WordDefinitionMerger", [u"{Connection}", u"{Connection}"]),
+			Declare.ComponentDeclaration(u"Client", "TestPlugins", "WordDefinitionConnection", [u"{Lookup}"],
+			                             lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Other", "TestPlugins", "WordDefinitionConnection", lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Session", "TestPlugins", "WordDefinitionSession", lifetime="singleton",
+			                             lifetimeOptions={"dispose": None}),
+			Declare.ComponentDeclaration(u"Pooled", "TestPlugins", "WordDefinitionConnection", lifetime="pooled",
+			                             lifetimeOptions={"min": 2}),
+			Declare.ComponentDeclaration(u"Cached", "TestPlugins", "WordDefinitionConnection", lifetime="cached",
+			                             lifetimeOptions={"ttl": 60})]))
+
+	def test_reverse_dependency_order(self):
+		client = self.manager.get_component(u"Client")
+		connection = self.manager.get_component(u"Connection")
+		cached = self.manager.get_component(u"Cached")
+		pooled = self.manager.acquire(u"Pooled")
+
+		report = self.manager.close()
+
+		self.assertEqual([u"Cached", u"Client", u"Connection", u"Other", u"Pooled"], sorted(report))
+		self.assertEqual(set(["disposed"]), set(result["status"] for result in report.values()))
+		self.assertTrue(TestPlugins.WordDefinitionConnection.closed.index(client) <
+		                TestPlugins.WordDefinitionConnection.closed.index(connection))
+		self.assertTrue(cached in TestPlugins.WordDefinitionConnection.closed)
+		# only idle pooled instances are disposed
+		self.assertFalse(pooled in TestPlugins.WordDefinitionConnection.closed)
+		self.assertEqual(5, len(TestPlugins.WordDefinitionConnection.closed))
+		self.assertEqual([], TestPlugins.WordDefinitionSession.closed)
+
+	def test_concurrent_disposal(self):
+		TestPlugins.WordDefinitionConnection.delay = 0.1
+
+		started = time.time()
+		report = self.manager.close(workers=4)
+
+		# Connection is disposed after Client, Other and the pooled instances concurrently with them
+		self.assertTrue(time.time() - started < 0.35)
+		self.assertTrue(report[u"Other"]["seconds"] >= 0.1)
+
+	def test_timeout(self):
+		TestPlugins.WordDefinitionConnection.delay = 0.2
+
+		started = time.time()
+		report = self.manager.close(timeout=0.02)
+
+		self.assertTrue(time.time() - started < 0.15)
+		self.assertEqual(set(["timed_out"]), set(result["status"] for result in report.values()))
+
+		# disposals which timed out still complete
+		while len(TestPlugins.WordDefinitionConnection.closed) < 5 and time.time() - started < 5:
+			time.sleep(0.01)
+
+		self.assertEqual(5, len(TestPlugins.WordDefinitionConnection.closed))
+
+	def test_failure(self):
+		TestPlugins.WordDefinitionConnection.failing = True
+
+		report = self.manager.close()
+
+		self.assertEqual(u"failed", report[u"Client"]["status"])
+		self.assertIsInstance(report[u"Connection"]["error"], ValueError)
+
+	def test_context_manager(self):
+		with self.manager as manager:
+			connection = manager.get_component(u"Connection")
+
+		self.assertTrue(connection in TestPlugins.WordDefinitionConnection.closed)
+		self.assertEqual({}, self.manager.close())
+
+	def test_instrumentation(self):
+		instrumentation = Declare.Instrumentation()
+		disposed = []
+
+		instrumentation.subscribe("dispose", lambda identifier, seconds: disposed.append(identifier))
+
+		Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Connection", "TestPlugins", "WordDefinitionConnection",
+			                             lifetime="singleton")]), instrumentation=instrumentation).close()
+
+		self.assertEqual([u"Connection"], disposed)
+
+	def test_child(self):
+		child = self.manager.child(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Other", "TestPlugins", "WordDefinitionConnection", lifetime="singleton")]))
+		other = child.get_component(u"Other")
+
+		report = child.close()
+
+		self.assertEqual([u"Other"], list(report))
+		self.assertTrue(other in TestPlugins.WordDefinitionConnection.closed)
+		self.assertFalse(self.manager.get_component(u"Other") in TestPlugins.WordDefinitionConnection.closed)
+
+	def test_closed(self):
+		self.manager.close()
+
+		self.assertRaises(Declare.ComponentError, self.manager.get_component, u"Connection")
+		self.assertRaises(Declare.ComponentError, self.manager.get_components_of_type,
+		                  TestPlugins.WordDefinitionConnection)
+		self.assertRaises(Declare.ComponentError, self.manager.provider, u"Connection")
+		self.assertRaises(Declare.ComponentError, self.manager.acquire, u"Pooled")
+		self.assertRaises(Declare.ComponentError, self.manager.reload, self.manager.configuration())
+		self.assertRaises(Declare.ComponentError, self.manager.child, Declare.Configuration({}, []))
+		# declarations are still described
+		self.assertTrue(self.manager.describe_component(u"Connection") is not None)
+		self.assertEqual({}, self.manager.close())
+
+
+class ManagerProviderTests(unittest.TestCase):
+	"""
+	Declare.Manager provider and bulk creation scenarios
+	"""
+
+	def create_manager(self):
+		return Declare.Manager(Declare.Configuration({u"Definitions": {u"word": u"definition"}}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "WordDefinitionRepository",
+			                             [u"{$Definitions}"], lifetime="singleton"),
+			Declare.ComponentDeclaration(u"Lookup", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"]),
+			Declare.ComponentDeclaration(u"Table", "TestPlugins", "WordDefinitionTable"),
+			Declare.ComponentDeclaration(u"Merger", "TestPlugins", "WordDefinitionMerger",
+			                             {"first": u"{Table}", "second": u"{Lookup}"})]))
+
+	def setUp(self):
+		TestPlugins.WordDefinitionTable.failing = False
+
+		self.manager = self.create_manager()
+
+	def test_singleton_provider(self):
+		provider = self.manager.provider(u"Repository")
+
+		self.assertIs(self.manager.get_component(u"Repository"), provider())
+		self.assertIs(provider(), provider())
+
+	def test_component_provider(self):
+		provider = self.manager.provider(u"Merger")
+		first = provider()
+		second = provider()
+
+		self.assertIsInstance(first, TestPlugins.WordDefinitionMerger)
+		self.assertIsNot(first, second)
+		self.assertIsNot(first.first, second.first)
+		self.assertIs(self.manager.get_component(u"Repository"), first.second.repository)
+
+	def test_unknown_provider(self):
+		self.assertIsNone(self.manager.provider(u"Unknown"))
+		self.assertIsNone(self.manager.create_many(u"Unknown", 2))
+
+	def test_provider_of_type(self):
+		provider = self.manager.provider_of_type(TestPlugins.WordDefinitionRepository)
+
+		self.assertEqual([self.manager.get_component(u"Repository")], provider())
+		self.assertEqual(1, len(self.manager.provider_of_type(UserTask, "")()))
+		self.assertEqual([], self.manager.provider_of_type(UserTask, "singleton")())
+
+	def test_create_many(self):
+		mergers = self.manager.create_many(u"Merger", 3)
+
+		self.assertEqual(3, len(mergers))
+		self.assertEqual(3, len(set(id(merger) for merger in mergers)))
+		self.assertEqual(3, len(set(id(merger.first) for merger in mergers)))
+		self.assertEqual(set([id(self.manager.get_component(u"Repository"))]),
+		                 set(id(merger.second.repository) for merger in mergers))
+		self.assertEqual([self.manager.get_component(u"Repository")] * 2, self.manager.create_many(u"Repository", 2))
+		self.assertEqual([], self.manager.create_many(u"Table", 0))
+
+
+class CompiledManagerProviderTests(ManagerProviderTests):
+	"""
+	Declare.Manager provider and bulk creation scenarios against compiled container
+	"""
+
+	def create_manager(self):
+		return compile_manager(ManagerProviderTests.create_manager(self))
+
+
+class ManagerInstrumentationTests(unittest.TestCase):
+	"""
+	Declare.Manager instrumentation scenarios
+	"""
+
+	def setUp(self):
+		self._instrumentation_ = Declare.Instrumentation()
+		self._manager_ = Declare.Manager(Declare.Configuration({}, [
+			Declare.ComponentDeclaration(u"Repository", "TestPlugins", "SlowWordDefinitionRepository"),
+			Declare.ComponentDeclaration(u"LookupTask", "TestPlugins", "LookupWordDefinitionTask", [u"{Repository}"]),
+			Declare.ComponentDeclaration(u"AddTask", "TestPlugins", "AddWordDefinitionTask", lifetime="singleton")]),
+			instrumentation=self._instrumentation_)
+
+	def test_not_instrumented(self):
+		"""
+		check that manager created without instrumentation has none
+		"""
+		self.assertTrue(Declare.Manager(Declare.Configuration({}, [])).instrumentation() is None
+		                and self._manager_.instrumentation() is self._instrumentation_)
+
+	def test_resolution_counters(self):
+		"""
+		check that resolutions, singleton hits and constructions are counted
+		"""
+		self._manager_.get_component(u"AddTask")
+		self._manager_.get_component(u"AddTask")
+		self._manager_.get_component(u"LookupTask")
+
+		stats = self._instrumentation_.stats()
+
+		self.assertTrue(stats[u"AddTask"]["resolutions"] == 2 and stats[u"AddTask"]["singleton_hits"] == 2
+		                and stats[u"AddTask"]["constructions"] == 1 and stats[u"LookupTask"]["resolutions"] == 1
+		                and stats[u"Repository"]["resolutions"] == 0 and stats[u"Repository"]["constructions"] == 1)
+
+	def test_construction_time_excludes_references(self):
+		"""
+		check that time spent constructing a referenced component is only recorded for that component
+		"""
+		self._manager_.get_component(u"LookupTask")
+
+		stats = self._instrumentation_.stats()
+
+		self.assertTrue(stats[u"Repository"]["construction_time"] >= 0.01
+		                and stats[u"Repository"]["max_construction_time"] >= 0.01
+		                and stats[u"LookupTask"]["construction_time"] < 0.01
+		                and stats[u"LookupTask"]["resolution_time"] < 0.01
+		                and stats[u"LookupTask"]["process_time"] > 0)
+
+	def test_events(self):
+		"""
+		check that subscribers are notified of events
+		"""
+		events = []
+
+		self._instrumentation_.subscribe("construct", lambda identifier, seconds: events.append(identifier))
+		self._manager_.get_component(u"LookupTask")
+
+		self.assertTrue(events == [u"Repository", u"LookupTask"])
+
+	def test_unknown_event(self):
+		"""
+		check that subscribing to an unknown event raises an error
+		"""
+		self.assertRaises(Declare.ComponentError, self._instrumentation_.subscribe, "unknown", lambda *arguments: None)
+
+	def test_critical_chain(self):
+		"""
+		check that the chain of references along which most time was spent is reported
+		"""
+		self._manager_.get_component(u"LookupTask")
+
+		self.assertTrue([identifier for identifier, seconds in self._instrumentation_.critical_chain()]
+		                == [u"LookupTask", u"Repository"])
+
 if __name__ == '__main__':
 	unittest.main()
@@ -33,3 +33,7 @@ class UserTask(object) :
 	def begin(self, *arguments):
 		return
 
+
+class Searchable(object) :
+	__metaclass__ = abc.ABCMeta
+
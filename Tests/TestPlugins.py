@@ -1,6 +1,15 @@
 __author__ = 'ND'
 
-from TestModel import UserTask
+import time
+from TestModel import UserTask, Searchable
+
+try:
+	import asyncio
+except ImportError:
+	try:
+		import trollius as asyncio
+	except ImportError:
+		asyncio = None
 
 class ListWordDefinitionsTask(UserTask) :
 
@@ -62,3 +71,140 @@ class RemoveWordDefinitionTask(UserTask) :
 			else :
 				print "\"" + wordToDelete + "\"", "is not defined"
 
+
+class WordDefinitionRepository(object) :
+
+	def __init__(self, definitions = None) :
+		self.definitions = definitions if definitions is not None else {}
+
+
+class LookupWordDefinitionTask(UserTask) :
+
+	__task_name__ = "LookupWordDefinitionTask"
+
+	def __init__(self, repository, repeat = False) :
+		super(LookupWordDefinitionTask, self).__init__("f", "Find word definition", repeat)
+		self.repository = repository
+
+	def can_repeat(self):
+		return True
+
+	def begin(self, wordDefinitions, *arguments) :
+		word = raw_input("Word : ")
+
+		if self.repository.definitions.has_key(word) :
+			print word, ": ", self.repository.definitions[word]
+
+Searchable.register(LookupWordDefinitionTask)
+
+
+class SortedListWordDefinitionsTask(ListWordDefinitionsTask) :
+
+	__task_name__ = "SortedListWordDefinitionsTask"
+
+	def begin(self, wordDefinitions, *arguments) :
+		for word in sorted(wordDefinitions.keys()) :
+			print word, ": ", wordDefinitions[word]
+
+
+class CountedWordDefinitionRepository(WordDefinitionRepository) :
+
+	instances = 0
+
+	def __init__(self, definitions = None) :
+		super(CountedWordDefinitionRepository, self).__init__(definitions)
+		CountedWordDefinitionRepository.instances += 1
+
+
+class SlowWordDefinitionRepository(CountedWordDefinitionRepository) :
+
+	delay = 0.01
+
+	def __init__(self, definitions = None) :
+		time.sleep(SlowWordDefinitionRepository.delay)
+		super(SlowWordDefinitionRepository, self).__init__(definitions)
+
+
+class AsyncWordDefinitionRepository(CountedWordDefinitionRepository) :
+
+	loaded = False
+
+	def load(self) :
+		loading = asyncio.ensure_future(asyncio.sleep(0.01))
+		loading.add_done_callback(self.loaded_callback)
+
+		return loading
+
+	def loaded_callback(self, loading) :
+		self.loaded = True
+
+
+class WordDefinitionParser(object) :
+
+	instances = 0
+
+	def __init__(self) :
+		WordDefinitionParser.instances += 1
+		self.buffer = []
+		self.resets = 0
+
+	def parse(self, text) :
+		self.buffer.extend(text.split(":", 1))
+
+		return self.buffer[0].strip(), self.buffer[-1].strip()
+
+	def clear(self) :
+		del self.buffer[:]
+		self.resets += 1
+
+
+
+class WordDefinitionSession(object) :
+
+	closed = []
+
+	def __init__(self, parent=None) :
+		self.parent = parent
+
+	def close(self) :
+		WordDefinitionSession.closed.append(self)
+
+
+
+class WordDefinitionMerger(object) :
+
+	def __init__(self, first, second) :
+		self.first = first
+		self.second = second
+
+
+
+class WordDefinitionTable(object) :
+
+	instances = 0
+	failing = False
+
+	def __init__(self) :
+		if WordDefinitionTable.failing :
+			raise ValueError("table is not available")
+
+		WordDefinitionTable.instances += 1
+
+
+
+class WordDefinitionConnection(object) :
+
+	closed = []
+	delay = 0
+	failing = False
+
+	def __init__(self, repository=None) :
+		self.repository = repository
+
+	def close(self) :
+		time.sleep(WordDefinitionConnection.delay)
+
+		if WordDefinitionConnection.failing :
+			raise ValueError("connection can not be closed")
+
+		WordDefinitionConnection.closed.append(self)